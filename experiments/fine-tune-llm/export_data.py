@@ -11,8 +11,15 @@ import argparse
 import json
 import re
 import sqlite3
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+from tbta_tokenizer import tokenize
+
+# Word-level tags: uppercase category, e.g. N-1A1SDAnK3NN........
+WORD_TAG_RE = re.compile(r'[A-Z]-[^\s~]')
+
 # Well-audited books from TBTA
 TARGET_BOOKS = [
     'Genesis', 'Joshua', 'Ruth', '1_Samuel', '2_Samuel',
@@ -43,12 +50,13 @@ def parse_tbta_tags(analyzed_verse: str) -> list[dict]:
     """Parse TBTA AnalyzedVerse into structured word list."""
     words = []
     
-    # Pattern to match word entries: ~\wd followed by tag and lexical unit
-    pattern = r'~\\wd\s*~\\tg([A-Z]-[^\s~]+)\s*~\\lu([^~]+)'
-    
-    for match in re.finditer(pattern, analyzed_verse):
-        tag = match.group(1).strip()
-        lexical_unit = match.group(2).strip()
+    for token in tokenize(analyzed_verse):
+        # Word-level entries only: uppercase category tag with ~\lu text
+        if not token.tag or not token.constituent or not WORD_TAG_RE.match(token.tag):
+            continue
+        
+        tag = token.tag.split()[0]
+        lexical_unit = token.constituent
         
         # Extract part of speech from tag (first letter after the initial code)
         pos_map = {'N': 'Noun', 'V': 'Verb', 'A': 'Adjective', 'D': 'Adverb',
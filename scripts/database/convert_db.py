@@ -11,7 +11,7 @@ Input:
   - databases/original/Ontology.sqlite (concepts table)
 
 Output:
-  - databases/verses.sqlite (verses with node_ids)
+  - databases/verses.sqlite (verses with their node id ranges)
   - databases/nodes.sqlite (normalized nodes with concept_id)
   - databases/niv.sqlite (NIV translations)
   - databases/concepts.sqlite (Ontology concepts)
@@ -20,16 +20,36 @@ Output:
 Usage:
     python scripts/convert_db.py
     python scripts/convert_db.py --source-dir /path/to/databases
+    python scripts/convert_db.py --workers 16
+    python scripts/convert_db.py --incremental   # only re-parse changed books
+    python scripts/convert_db.py --parquet databases/parquet   # also export Parquet (needs pyarrow)
 """
 
 import argparse
+import hashlib
 import json
+import os
 import re
+import shutil
 import sqlite3
 import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from decode_analysis import (ASPECT, DEGREE, MOOD, NUMBER_SYSTEM, PARTICIPANT_TRACKING, PERSON_SYSTEM,
+                             POLARITY, check_documented_tags, decode_features)
+from tbta_tokenizer import tokenize
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
 # Book table name to USFM 3.0 mapping
 BOOK_TO_USFM = {
     "Genesis": "GEN", "Exodus": "EXO", "Leviticus": "LEV", "Numbers": "NUM", "Deuteronomy": "DEU",
@@ -53,9 +73,11 @@ BOOK_TO_USFM = {
 
 class Config:
     """Configuration for database paths."""
-    def __init__(self, source_dir: Path, output_dir: Path):
+    def __init__(self, source_dir: Path, output_dir: Path, vacuum: bool = False, incremental: bool = False):
         self.source_dir = source_dir
         self.output_dir = output_dir
+        self.vacuum = vacuum  # VACUUM each database after a bulk build
+        self.incremental = incremental  # Only rebuild what changed since the last run
         
         # Source databases
         self.bible_db = source_dir / "Bible.sqlite"
@@ -115,21 +137,13 @@ def parse_analyzed_verse(analyzed_verse: str) -> List[Dict]:
         return []
     
     nodes = []
-    word_sections = analyzed_verse.split('~\\wd')
     
-    for section in word_sections:
-        if not section.strip() or '~\\lu' not in section:
-            continue
-        
-        # Extract tag and constituent
-        tag_match = re.search(r'~\\tg\s+([^~]+?)~\\lu', section)
-        constituent_match = re.search(r'~\\lu\s+([^~]+)', section)
-        
-        if not tag_match or not constituent_match:
+    for token in tokenize(analyzed_verse):
+        if not token.tag or not token.constituent:
             continue
         
-        tag = tag_match.group(1).strip()
-        constituent = constituent_match.group(1).strip().rstrip('()')
+        tag = token.tag
+        constituent = token.constituent.rstrip('()')
         
         # Skip structural markers and empty content
         if not constituent or constituent in {'{', '}', '(', ')', '[', ']', '|', '.', ',', ';', ':', '!', '?', '-'}:
@@ -182,43 +196,278 @@ def parse_analyzed_verse(analyzed_verse: str) -> List[Dict]:
     return nodes
 
 
-def match_node_to_concept(cursor: sqlite3.Cursor, stem: str, part_of_speech: str, sense: str = None) -> Optional[int]:
-    """Match a node to a concept by stem, part_of_speech, and sense."""
-    # Try exact match with sense first
-    if sense:
-        cursor.execute(
-            "SELECT id FROM concepts WHERE stem = ? AND part_of_speech = ? AND sense = ?",
-            (stem, part_of_speech, sense)
+# Decoded feature columns of nodes: column -> (decode_features() key, code table).
+# Values are stored as small integers; the feature_values table maps them back.
+NODE_FEATURES = {
+    'number': ('Number', NUMBER_SYSTEM),
+    'person': ('Person', PERSON_SYSTEM),
+    'participant_tracking': ('Participant Tracking', PARTICIPANT_TRACKING),
+    'aspect': ('Aspect', ASPECT),
+    'mood': ('Mood', MOOD),
+    'polarity': ('Polarity', POLARITY),
+    'degree': ('Degree', DEGREE),
+}
+
+# Value ids follow code table order, so they are the same in every build
+FEATURE_VALUE_IDS = {
+    column: {label: value_id for value_id, label in enumerate(table.values(), 1)}
+    for column, (_, table) in NODE_FEATURES.items()
+}
+FEATURE_LABELS = {
+    column: {value_id: label for label, value_id in ids.items()}
+    for column, ids in FEATURE_VALUE_IDS.items()
+}
+
+
+def encode_features(category: Optional[str], feature_codes: Optional[str]) -> Tuple[Optional[int], ...]:
+    """Feature value ids of a node in NODE_FEATURES order (None where not set)."""
+    features = decode_features(category, feature_codes)
+    return tuple(FEATURE_VALUE_IDS[column].get(features.get(key))
+                 for column, (key, _) in NODE_FEATURES.items())
+
+
+# SQLite's built-in LOWER() only folds ASCII letters
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def _sqlite_lower(text: str) -> str:
+    """Lowercase text the same way SQLite's LOWER() does."""
+    return text.translate(_ASCII_LOWER)
+
+
+class ConceptResolver:
+    """
+    Matches nodes to concepts from an in-memory copy of concepts.sqlite.
+
+    A node's (stem, part_of_speech, sense) is tried against the concepts in
+    this order, and the first rule that matches wins:
+
+        1. exact stem, part of speech and sense (only when the node has a sense)
+        2. exact stem and part of speech
+        3. stem compared case-insensitively (ASCII only, like SQLite's LOWER())
+           and exact part of speech
+        4. stem compared case-insensitively, any part of speech
+
+    When several concepts match a rule, the first in table order is used.
+    Resolved (stem, pos, sense) keys are kept in an LRU cache.
+    """
+
+    def __init__(self, concepts_db: Path, cache_size: int = 65536):
+        self.by_stem_pos_sense: Dict[Tuple[str, str, str], int] = {}
+        self.by_stem_pos: Dict[Tuple[str, str], int] = {}
+        self.by_lower_stem_pos: Dict[Tuple[str, str], int] = {}
+        self.by_lower_stem: Dict[str, int] = {}
+
+        self.cache: OrderedDict = OrderedDict()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+
+        conn = sqlite3.connect(concepts_db)
+        rows = conn.execute(
+            "SELECT id, stem, part_of_speech, sense FROM concepts ORDER BY rowid"
+        ).fetchall()
+        conn.close()
+        self.concept_count = len(rows)
+
+        # setdefault keeps the first row per key, matching fetchone() order
+        for cid, stem, pos, sense in rows:
+            if stem is None:
+                continue
+            lower_stem = _sqlite_lower(stem)
+            self.by_lower_stem.setdefault(lower_stem, cid)
+            if pos is None:
+                continue
+            self.by_stem_pos.setdefault((stem, pos), cid)
+            self.by_lower_stem_pos.setdefault((lower_stem, pos), cid)
+            if sense is not None:
+                self.by_stem_pos_sense.setdefault((stem, pos, sense), cid)
+
+    def resolve(self, stem: str, part_of_speech: str, sense: str = None) -> Optional[int]:
+        """Resolve a node to a concept_id using the rules above (None if nothing matches)."""
+        key = (stem, part_of_speech, sense)
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        self.misses += 1
+        concept_id = self._lookup(stem, part_of_speech, sense)
+
+        self.cache[key] = concept_id
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return concept_id
+
+    def _lookup(self, stem: str, part_of_speech: str, sense: str = None) -> Optional[int]:
+        if sense:
+            key = (stem, part_of_speech, sense)
+            if key in self.by_stem_pos_sense:
+                return self.by_stem_pos_sense[key]
+
+        key = (stem, part_of_speech)
+        if key in self.by_stem_pos:
+            return self.by_stem_pos[key]
+
+        lower_stem = _sqlite_lower(stem)
+        key = (lower_stem, part_of_speech)
+        if key in self.by_lower_stem_pos:
+            return self.by_lower_stem_pos[key]
+
+        return self.by_lower_stem.get(lower_stem)
+
+
+# ============================================================
+# BULK BUILD
+# ============================================================
+
+BULK_CACHE_SIZE_KB = 512 * 1024  # page cache for bulk builds (512 MB)
+
+
+@contextmanager
+def bulk_build(target: Path, vacuum: bool = False, seed: Optional[Path] = None):
+    """
+    Open a connection for building a database from scratch.
+    
+    Writes go to a temporary file next to the target with journaling and
+    syncing disabled. On success the file is analyzed (and optionally
+    vacuumed) and atomically renamed over the target; on failure it is
+    removed, so readers never see a partial database. Create indexes after
+    loading the data.
+    
+    With seed, the temporary file starts as a copy of that database, which is
+    how incremental runs update a database in place.
+    """
+    with bulk_build_all([target], vacuum, [seed]) as (conn,):
+        yield conn
+
+
+@contextmanager
+def bulk_build_all(targets: List[Path], vacuum: bool = False, seeds: Optional[List[Optional[Path]]] = None):
+    """
+    bulk_build() for databases that must be replaced together.
+    
+    Yields one connection per target. Every temporary file is committed,
+    analyzed and vacuumed before any of them is renamed, and the renames
+    happen in targets order, so a failure while finishing one database
+    leaves all the targets untouched. Put the database holding the
+    manifest last.
+    """
+    seeds = seeds or [None] * len(targets)
+    tmp_paths = [target.with_name(target.name + ".tmp") for target in targets]
+    conns = []
+    try:
+        for tmp_path, seed in zip(tmp_paths, seeds):
+            if tmp_path.exists():
+                tmp_path.unlink()
+            if seed:
+                shutil.copyfile(seed, tmp_path)
+            
+            conn = sqlite3.connect(tmp_path)
+            conns.append(conn)
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute(f"PRAGMA cache_size = -{BULK_CACHE_SIZE_KB}")
+            conn.execute("PRAGMA temp_store = MEMORY")
+            conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+        
+        yield conns
+        for conn in conns:
+            conn.commit()
+            conn.execute("ANALYZE")
+            conn.commit()
+            if vacuum:
+                conn.execute("VACUUM")
+            conn.close()
+    except BaseException:
+        for conn in conns:
+            conn.close()
+        for tmp_path in tmp_paths:
+            tmp_path.unlink(missing_ok=True)
+        raise
+    
+    for tmp_path, target in zip(tmp_paths, targets):
+        os.replace(tmp_path, target)
+
+
+# ============================================================
+# SOURCE MANIFESTS
+# ============================================================
+#
+# Each output database records hashes of the inputs it was built from in a
+# `manifest` table, so --incremental runs can skip or narrow rebuilds:
+#   concepts.sqlite: ontology, strongs_tsv
+#   niv.sqlite:      niv
+#   verses.sqlite:   book:<table> per Bible.sqlite table, concepts
+
+def hash_file(path: Path) -> Optional[str]:
+    """SHA-256 of a file's contents, or None if it doesn't exist."""
+    if not path.exists():
+        return None
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_book_tables(bible_db: Path, tables: List[str]) -> Dict[str, str]:
+    """SHA-256 of each convertible book table's (Reference, Verse, AnalyzedVerse) rows."""
+    hashes = {}
+    conn = sqlite3.connect(bible_db)
+    for table_name in tables:
+        if table_name not in BOOK_TO_USFM:
+            continue
+        h = hashlib.sha256()
+        try:
+            for row in conn.execute(f"SELECT Reference, Verse, AnalyzedVerse FROM [{table_name}] ORDER BY rowid"):
+                h.update(json.dumps(row, ensure_ascii=False).encode('utf-8'))
+                h.update(b'\n')
+        except sqlite3.OperationalError:
+            continue
+        hashes[table_name] = h.hexdigest()
+    conn.close()
+    return hashes
+
+
+def hash_concept_keys(concepts_db: Optional[Path]) -> str:
+    """SHA-256 of the concept columns used for node matching ('none' without concepts)."""
+    if not concepts_db:
+        return 'none'
+    h = hashlib.sha256()
+    conn = sqlite3.connect(concepts_db)
+    for row in conn.execute("SELECT id, stem, part_of_speech, sense FROM concepts ORDER BY rowid"):
+        h.update(json.dumps(row, ensure_ascii=False).encode('utf-8'))
+        h.update(b'\n')
+    conn.close()
+    return h.hexdigest()
+
+
+def read_manifest(db_path: Path) -> Dict[str, str]:
+    """Read a database's manifest (empty if the database or table is missing)."""
+    if not db_path.exists():
+        return {}
+    conn = sqlite3.connect(db_path)
+    try:
+        return dict(conn.execute("SELECT source, content_hash FROM manifest"))
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+
+
+def write_manifest(conn: sqlite3.Connection, entries: Dict[str, Optional[str]]):
+    """Create/update the manifest table (entries with a None hash are removed)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS manifest (
+            source TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL
         )
-        row = cursor.fetchone()
-        if row:
-            return row[0]
-    
-    # Try without sense
-    cursor.execute(
-        "SELECT id FROM concepts WHERE stem = ? AND part_of_speech = ?",
-        (stem, part_of_speech)
-    )
-    row = cursor.fetchone()
-    if row:
-        return row[0]
-    
-    # Try case-insensitive
-    cursor.execute(
-        "SELECT id FROM concepts WHERE LOWER(stem) = LOWER(?) AND part_of_speech = ?",
-        (stem, part_of_speech)
-    )
-    row = cursor.fetchone()
-    if row:
-        return row[0]
-    
-    # Try without part of speech
-    cursor.execute(
-        "SELECT id FROM concepts WHERE LOWER(stem) = LOWER(?)",
-        (stem,)
-    )
-    row = cursor.fetchone()
-    return row[0] if row else None
+    ''')
+    conn.executemany("DELETE FROM manifest WHERE source = ?",
+                     [(source,) for source, h in entries.items() if h is None])
+    conn.executemany("INSERT OR REPLACE INTO manifest VALUES (?, ?)",
+                     [(source, h) for source, h in entries.items() if h is not None])
 
 
 # ============================================================
@@ -233,68 +482,67 @@ def create_concepts_db(cfg: Config):
         print(f"  ⚠ Ontology database not found: {cfg.ontology_db}")
         return False
     
-    if cfg.concepts_db.exists():
-        cfg.concepts_db.unlink()
+    sources = {
+        'ontology': hash_file(cfg.ontology_db),
+        'strongs_tsv': hash_file(cfg.strongs_mappings_tsv),
+    }
+    if cfg.incremental and read_manifest(cfg.concepts_db) == {k: v for k, v in sources.items() if v}:
+        print("  ✓ Ontology and Strong's mappings unchanged, keeping concepts.sqlite")
+        return True
     
-    # Connect to source and target
+    # Read from Concepts table
     src_conn = sqlite3.connect(cfg.ontology_db)
-    tgt_conn = sqlite3.connect(cfg.concepts_db)
-    
-    src_cur = src_conn.cursor()
-    tgt_cur = tgt_conn.cursor()
-    
-    # Create schema (id is not unique in Ontology - same stem can have multiple senses)
-    tgt_cur.execute('''
-        CREATE TABLE concepts (
-            id INTEGER,
-            stem TEXT,
-            sense TEXT,
-            part_of_speech TEXT,
-            gloss TEXT,
-            brief_gloss TEXT,
-            occurrences INTEGER,
-            categorization TEXT,
-            curated_examples TEXT,
-            level INTEGER,
-            note TEXT,
-            strongs_mappings JSON
-        )
-    ''')
-    
-    # Try to copy from Concepts table
     try:
-        src_cur.execute('''
+        rows = src_conn.execute('''
             SELECT id, stem, sense, part_of_speech, gloss, brief_gloss, 
                    occurrences, categorization, curated_examples, level, note
             FROM Concepts
-        ''')
-        rows = src_cur.fetchall()
-        # Add NULL for strongs_mappings column
-        rows_with_null = [row + (None,) for row in rows]
-        tgt_cur.executemany('''
-            INSERT INTO concepts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', rows_with_null)
-        print(f"  ✓ Copied {len(rows):,} concepts")
+        ''').fetchall()
     except sqlite3.OperationalError as e:
         print(f"  ⚠ Error reading Concepts table: {e}")
-        src_conn.close()
-        tgt_conn.close()
         return False
+    finally:
+        src_conn.close()
     
-    # Create indexes
-    tgt_cur.execute("CREATE INDEX idx_concept_stem ON concepts(stem)")
-    tgt_cur.execute("CREATE INDEX idx_concept_pos ON concepts(part_of_speech)")
-    tgt_cur.execute("CREATE INDEX idx_concept_stem_pos ON concepts(stem, part_of_speech)")
-    
-    tgt_conn.commit()
-    src_conn.close()
-    tgt_conn.close()
+    with bulk_build(cfg.concepts_db, cfg.vacuum) as tgt_conn:
+        # Create schema (id is not unique in Ontology - same stem can have multiple senses)
+        tgt_conn.execute('''
+            CREATE TABLE concepts (
+                id INTEGER,
+                stem TEXT,
+                sense TEXT,
+                part_of_speech TEXT,
+                gloss TEXT,
+                brief_gloss TEXT,
+                occurrences INTEGER,
+                categorization TEXT,
+                curated_examples TEXT,
+                level INTEGER,
+                note TEXT,
+                strongs_mappings JSON
+            )
+        ''')
+        
+        # Add NULL for strongs_mappings column
+        tgt_conn.executemany('''
+            INSERT INTO concepts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (row + (None,) for row in rows))
+        print(f"  ✓ Copied {len(rows):,} concepts")
+        
+        apply_strongs_mappings(cfg, tgt_conn)
+        
+        # Create indexes
+        tgt_conn.execute("CREATE INDEX idx_concept_stem ON concepts(stem)")
+        tgt_conn.execute("CREATE INDEX idx_concept_pos ON concepts(part_of_speech)")
+        tgt_conn.execute("CREATE INDEX idx_concept_stem_pos ON concepts(stem, part_of_speech)")
+        
+        write_manifest(tgt_conn, sources)
     
     return True
 
 
-def apply_strongs_mappings(cfg: Config):
-    """Apply strongs mappings from TSV to concepts.sqlite."""
+def apply_strongs_mappings(cfg: Config, conn: sqlite3.Connection):
+    """Apply strongs mappings from TSV to the concepts table being built."""
     print("  Applying strongs mappings...")
     
     if not cfg.strongs_mappings_tsv.exists():
@@ -303,10 +551,7 @@ def apply_strongs_mappings(cfg: Config):
     
     import csv
     
-    conn = sqlite3.connect(cfg.concepts_db)
-    cur = conn.cursor()
-    
-    updated = 0
+    updates = []
     with open(cfg.strongs_mappings_tsv, 'r') as f:
         reader = csv.DictReader(f, delimiter='\t')
         for row in reader:
@@ -320,17 +565,11 @@ def apply_strongs_mappings(cfg: Config):
             if not strongs_list:
                 continue
             
-            strongs_json = json.dumps(strongs_list)
-            cur.execute(
-                'UPDATE concepts SET strongs_mappings = ? WHERE id = ?',
-                (strongs_json, cid)
-            )
-            updated += 1
+            updates.append((json.dumps(strongs_list), cid))
     
-    conn.commit()
-    conn.close()
+    conn.executemany('UPDATE concepts SET strongs_mappings = ? WHERE id = ?', updates)
     
-    print(f"  ✓ Applied strongs mappings to {updated:,} concepts")
+    print(f"  ✓ Applied strongs mappings to {len(updates):,} concepts")
     return True
 
 
@@ -342,26 +581,13 @@ def create_niv_db(cfg: Config):
         print(f"  ⚠ NIV database not found: {cfg.niv_db}")
         return False
     
-    if cfg.niv_output_db.exists():
-        cfg.niv_output_db.unlink()
+    sources = {'niv': hash_file(cfg.niv_db)}
+    if cfg.incremental and read_manifest(cfg.niv_output_db) == sources:
+        print("  ✓ NIV source unchanged, keeping niv.sqlite")
+        return True
     
     src_conn = sqlite3.connect(cfg.niv_db)
-    tgt_conn = sqlite3.connect(cfg.niv_output_db)
-    
     src_cur = src_conn.cursor()
-    tgt_cur = tgt_conn.cursor()
-    
-    # Create schema
-    tgt_cur.execute('''
-        CREATE TABLE niv (
-            reference TEXT PRIMARY KEY,
-            book CHAR(3) NOT NULL,
-            chapter INTEGER NOT NULL,
-            verse INTEGER NOT NULL,
-            text TEXT
-        )
-    ''')
-    tgt_cur.execute("CREATE INDEX idx_niv_book ON niv(book, chapter, verse)")
     
     # Get all book tables
     src_cur.execute("""
@@ -372,180 +598,411 @@ def create_niv_db(cfg: Config):
     tables = [row[0] for row in src_cur.fetchall()]
     
     total = 0
-    for table_name in tables:
-        usfm_code = BOOK_TO_USFM.get(table_name)
-        if not usfm_code:
-            continue
+    with bulk_build(cfg.niv_output_db, cfg.vacuum) as tgt_conn:
+        # Create schema
+        tgt_conn.execute('''
+            CREATE TABLE niv (
+                reference TEXT PRIMARY KEY,
+                book CHAR(3) NOT NULL,
+                chapter INTEGER NOT NULL,
+                verse INTEGER NOT NULL,
+                text TEXT
+            )
+        ''')
         
-        try:
-            src_cur.execute(f"SELECT Reference, Verse FROM [{table_name}]")
-            for reference, verse_text in src_cur.fetchall():
+        for table_name in tables:
+            usfm_code = BOOK_TO_USFM.get(table_name)
+            if not usfm_code:
+                continue
+            
+            try:
+                src_cur.execute(f"SELECT Reference, Verse FROM [{table_name}]")
+                rows = src_cur.fetchall()
+            except sqlite3.OperationalError:
+                continue
+            
+            batch = []
+            for reference, verse_text in rows:
                 chapter, verse = parse_chapter_verse(reference)
                 if chapter and verse:
                     ref_id = f"{usfm_code}-{chapter:03d}-{verse:03d}"
-                    tgt_cur.execute(
-                        "INSERT OR IGNORE INTO niv VALUES (?, ?, ?, ?, ?)",
-                        (ref_id, usfm_code, chapter, verse, verse_text)
-                    )
-                    total += 1
-        except sqlite3.OperationalError:
-            continue
+                    batch.append((ref_id, usfm_code, chapter, verse, verse_text))
+            
+            tgt_conn.executemany("INSERT OR IGNORE INTO niv VALUES (?, ?, ?, ?, ?)", batch)
+            total += len(batch)
+        
+        tgt_conn.execute("CREATE INDEX idx_niv_book ON niv(book, chapter, verse)")
+        write_manifest(tgt_conn, sources)
     
-    tgt_conn.commit()
     src_conn.close()
-    tgt_conn.close()
     
     print(f"  ✓ Copied {total:,} NIV verses")
     return True
 
 
-def create_nodes_and_verses_db(cfg: Config):
-    """Create nodes.sqlite and verses.sqlite from Bible.sqlite."""
-    print("\n[3/5] Creating nodes.sqlite and verses.sqlite...")
+# Per-process state for book conversion (set by _init_book_worker)
+_worker_bible_db: Optional[Path] = None
+_worker_resolver: Optional[ConceptResolver] = None
+
+
+def _init_book_worker(bible_db: Path, concepts_db: Optional[Path]):
+    """Initialize a conversion process: remember the source and load concepts once."""
+    global _worker_bible_db, _worker_resolver
+    _worker_bible_db = bible_db
+    _worker_resolver = ConceptResolver(concepts_db) if concepts_db else None
+
+
+def convert_book(table_name: str) -> Optional[Dict]:
+    """
+    Parse one book table and resolve its concepts.
     
-    if not cfg.bible_db.exists():
-        print(f"  ✗ Bible database not found: {cfg.bible_db}")
-        return False
+    Returns a dict with the book's verses (each carrying its parsed node rows,
+    without node_ids) plus counters, or None if the table can't be read.
+    Node ids are assigned later by the single writer so that output does not
+    depend on how books were scheduled.
+    """
+    usfm_code = BOOK_TO_USFM.get(table_name)
+    if not usfm_code:
+        return None
     
-    # Remove existing
-    for db in [cfg.nodes_db, cfg.verses_db]:
-        if db.exists():
-            db.unlink()
+    src_conn = sqlite3.connect(_worker_bible_db)
+    try:
+        rows = src_conn.execute(f"SELECT Reference, Verse, AnalyzedVerse FROM [{table_name}]").fetchall()
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        src_conn.close()
     
-    # Connect to source
-    src_conn = sqlite3.connect(cfg.bible_db)
-    src_cur = src_conn.cursor()
+    resolver = _worker_resolver
+    hits_before = resolver.hits if resolver else 0
+    misses_before = resolver.misses if resolver else 0
     
-    # Connect to concepts for matching
-    concepts_conn = None
-    concepts_cur = None
-    if cfg.concepts_db.exists():
-        concepts_conn = sqlite3.connect(cfg.concepts_db)
-        concepts_cur = concepts_conn.cursor()
+    verses = []
+    verses_with_analysis = 0
+    for reference, verse_text, analyzed_verse in rows:
+        chapter, verse_num = parse_chapter_verse(reference)
+        if not chapter or not verse_num:
+            continue
+        
+        # Parse nodes from AnalyzedVerse
+        node_rows = []
+        if analyzed_verse:
+            verses_with_analysis += 1
+            for node in parse_analyzed_verse(analyzed_verse):
+                # Match to concept
+                concept_id = None
+                if resolver and node['part_of_speech']:
+                    concept_id = resolver.resolve(
+                        node['stem'],
+                        node['part_of_speech'],
+                        node['sense']
+                    )
+                node_rows.append((
+                    node['category'],
+                    node['content'],
+                    node['stem'],
+                    node['sense'],
+                    node['part_of_speech'],
+                    node['feature_codes'],
+                    concept_id
+                ) + encode_features(node['category'], node['feature_codes']))
+        
+        ref_id = f"{usfm_code}-{chapter:03d}-{verse_num:03d}"
+        verses.append((ref_id, usfm_code, chapter, verse_num, verse_text, node_rows))
+    
+    return {
+        'table_name': table_name,
+        'row_count': len(rows),
+        'verses': verses,
+        'verses_with_analysis': verses_with_analysis,
+        'cache_hits': (resolver.hits - hits_before) if resolver else 0,
+        'cache_misses': (resolver.misses - misses_before) if resolver else 0,
+    }
+
+
+# Layout of nodes.sqlite/verses.sqlite, recorded in the verses manifest;
+# --incremental falls back to a full build when it changes.
+NODE_SCHEMA_VERSION = "5"
+
+# Each verse's nodes have consecutive ids, so verse_ranges stores
+# (first_node_id, node_count). The verses view adds the node_ids JSON array
+# for queries written against json_each(v.node_ids).
+VERSES_VIEW_SQL = '''
+    CREATE VIEW verses AS
+    SELECT
+        reference, book, chapter, verse, verse_text, first_node_id, node_count,
+        (WITH RECURSIVE ids(node_id) AS (
+            SELECT first_node_id WHERE node_count > 0
+            UNION ALL
+            SELECT node_id + 1 FROM ids WHERE node_id + 1 < first_node_id + node_count
+        ) SELECT json_group_array(node_id) FROM ids) AS node_ids
+    FROM verse_ranges
+'''
+
+
+class NodeVerseWriter:
+    """
+    Writes converted books into nodes/verses databases.
     
-    # Create target databases
-    nodes_conn = sqlite3.connect(cfg.nodes_db)
-    verses_conn = sqlite3.connect(cfg.verses_db)
-    
-    nodes_cur = nodes_conn.cursor()
-    verses_cur = verses_conn.cursor()
-    
-    # Create schemas
-    nodes_cur.execute('''
-        CREATE TABLE nodes (
-            node_id INTEGER PRIMARY KEY,
-            category CHAR(1),
-            content TEXT,
-            stem TEXT,
-            sense CHAR(1),
-            part_of_speech TEXT,
-            feature_codes TEXT,
-            concept_id INTEGER
-        )
-    ''')
+    Node ids are assigned sequentially in the order books are written, so a
+    given sequence of books always produces the same ids.
+    """
     
-    verses_cur.execute('''
-        CREATE TABLE verses (
-            reference TEXT PRIMARY KEY,
-            book CHAR(3) NOT NULL,
-            chapter INTEGER NOT NULL,
-            verse INTEGER NOT NULL,
-            verse_text TEXT,
-            node_ids JSON NOT NULL
-        )
-    ''')
-    verses_cur.execute("CREATE INDEX idx_verses_book ON verses(book, chapter, verse)")
+    def __init__(self, nodes_conn: sqlite3.Connection, verses_conn: sqlite3.Connection, next_node_id: int = 1):
+        self.nodes_conn = nodes_conn
+        self.verses_conn = verses_conn
+        self.next_node_id = next_node_id
+        
+        self.total_verses = 0
+        self.total_nodes = 0
+        self.verses_with_analysis = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    def write(self, result: Dict):
+        """Bulk-insert one book's verses and nodes."""
+        node_batch = []
+        verse_batch = []
+        for ref_id, usfm_code, chapter, verse_num, verse_text, node_rows in result['verses']:
+            first_node_id = self.next_node_id
+            node_batch.extend(
+                (first_node_id + position, usfm_code, chapter, verse_num, position) + row
+                for position, row in enumerate(node_rows)
+            )
+            verse_batch.append((ref_id, usfm_code, chapter, verse_num, verse_text, first_node_id, len(node_rows)))
+            self.next_node_id += len(node_rows)
+        
+        self.nodes_conn.executemany('''
+            INSERT INTO nodes (node_id, book, chapter, verse, position,
+                               category, content, stem, sense, part_of_speech, feature_codes, concept_id,
+                               number, person, participant_tracking, aspect, mood, polarity, degree)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', node_batch)
+        self.verses_conn.executemany('''
+            INSERT INTO verse_ranges (reference, book, chapter, verse, verse_text, first_node_id, node_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', verse_batch)
+        
+        self.total_verses += len(verse_batch)
+        self.total_nodes += len(node_batch)
+        self.verses_with_analysis += result['verses_with_analysis']
+        self.cache_hits += result['cache_hits']
+        self.cache_misses += result['cache_misses']
+        
+        # Progress
+        print(f"  Processed {result['table_name']}: {result['row_count']} verses")
+    
+    def print_totals(self, with_concepts: bool):
+        print(f"  ✓ Created {self.total_verses:,} verses ({self.verses_with_analysis:,} with AnalyzedVerse)")
+        print(f"  ✓ Created {self.total_nodes:,} nodes")
+        if with_concepts:
+            total = self.cache_hits + self.cache_misses
+            rate = 100 * self.cache_hits / total if total else 0.0
+            print(f"  ✓ Concept resolver: {self.cache_hits:,} cache hits, {self.cache_misses:,} misses ({rate:.1f}% hit rate)")
+
+
+def convert_books(cfg: Config, tables: List[str], concepts_db: Optional[Path], workers: int):
+    """
+    Yield convert_book() results in table order.
+    
+    With workers > 1, books are parsed and resolved in a process pool; results
+    still arrive in table order, so output is identical to a serial run.
+    """
+    if workers > 1:
+        print(f"  Using {workers} worker processes")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_book_worker,
+                                 initargs=(cfg.bible_db, concepts_db)) as pool:
+            # map() yields in submission order, keeping node_ids deterministic
+            for result in pool.map(convert_book, tables):
+                if result:
+                    yield result
+    else:
+        _init_book_worker(cfg.bible_db, concepts_db)
+        for table_name in tables:
+            result = convert_book(table_name)
+            if result:
+                yield result
+
+
+def create_nodes_and_verses_db(cfg: Config, workers: int = 1):
+    """
+    Create nodes.sqlite and verses.sqlite from Bible.sqlite.
+    
+    With cfg.incremental and an existing manifest, only books whose source
+    rows changed are re-parsed (see update_nodes_and_verses_db).
+    """
+    print("\n[3/5] Creating nodes.sqlite and verses.sqlite...")
+    
+    if not cfg.bible_db.exists():
+        print(f"  ✗ Bible database not found: {cfg.bible_db}")
+        return False
+    
+    # The feature columns are only as right as the decoder's positions
+    problems = check_documented_tags()
+    if problems:
+        for problem in problems:
+            print(f"  ✗ Feature decoding: {problem}")
+        return False
     
     # Get all book tables
-    src_cur.execute("""
+    src_conn = sqlite3.connect(cfg.bible_db)
+    tables = [row[0] for row in src_conn.execute("""
         SELECT name FROM sqlite_master 
         WHERE type='table' AND name != 'Version'
         ORDER BY name
-    """)
-    tables = [row[0] for row in src_cur.fetchall()]
+    """)]
+    src_conn.close()
     
-    total_verses = 0
-    total_nodes = 0
-    verses_with_analysis = 0
+    concepts_db = cfg.concepts_db if cfg.concepts_db.exists() else None
+    if concepts_db:
+        print(f"  Matching nodes against {concepts_db.name}")
     
-    for table_name in tables:
-        usfm_code = BOOK_TO_USFM.get(table_name)
-        if not usfm_code:
-            continue
+    book_hashes = hash_book_tables(cfg.bible_db, tables)
+    concepts_hash = hash_concept_keys(concepts_db)
+    
+    if cfg.incremental:
+        manifest = read_manifest(cfg.verses_db) if cfg.nodes_db.exists() else {}
+        if manifest.get('schema') == NODE_SCHEMA_VERSION:
+            return update_nodes_and_verses_db(cfg, manifest, book_hashes, concepts_db, concepts_hash, workers)
+        if manifest:
+            print("  Database layout changed, doing a full build")
+        else:
+            print("  No manifest in verses.sqlite, doing a full build")
+    
+    # Create target databases
+    # verses.sqlite holds the manifest, so it is renamed into place last
+    with bulk_build_all([cfg.nodes_db, cfg.verses_db], cfg.vacuum) as (nodes_conn, verses_conn):
+        # Create schemas. Nodes are clustered by verse, so a verse's or a
+        # chapter's nodes are one range scan; node_id = first_node_id + position.
+        nodes_conn.execute('''
+            CREATE TABLE nodes (
+                node_id INTEGER NOT NULL UNIQUE,
+                book CHAR(3) NOT NULL,
+                chapter INTEGER NOT NULL,
+                verse INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                category CHAR(1),
+                content TEXT,
+                stem TEXT,
+                sense CHAR(1),
+                part_of_speech TEXT,
+                feature_codes TEXT,
+                concept_id INTEGER,
+                number INTEGER,
+                person INTEGER,
+                participant_tracking INTEGER,
+                aspect INTEGER,
+                mood INTEGER,
+                polarity INTEGER,
+                degree INTEGER,
+                PRIMARY KEY (book, chapter, verse, position)
+            ) WITHOUT ROWID
+        ''')
+        nodes_conn.execute('''
+            CREATE TABLE feature_values (
+                feature TEXT NOT NULL,
+                value_id INTEGER NOT NULL,
+                code TEXT NOT NULL,
+                label TEXT NOT NULL,
+                PRIMARY KEY (feature, value_id)
+            ) WITHOUT ROWID
+        ''')
+        nodes_conn.executemany(
+            "INSERT INTO feature_values VALUES (?, ?, ?, ?)",
+            [(column, FEATURE_VALUE_IDS[column][label], code, label)
+             for column, (_, table) in NODE_FEATURES.items() for code, label in table.items()]
+        )
         
-        try:
-            src_cur.execute(f"SELECT Reference, Verse, AnalyzedVerse FROM [{table_name}]")
-            rows = src_cur.fetchall()
-        except sqlite3.OperationalError:
-            continue
+        verses_conn.execute('''
+            CREATE TABLE verse_ranges (
+                reference TEXT PRIMARY KEY,
+                book CHAR(3) NOT NULL,
+                chapter INTEGER NOT NULL,
+                verse INTEGER NOT NULL,
+                verse_text TEXT,
+                first_node_id INTEGER NOT NULL,
+                node_count INTEGER NOT NULL
+            )
+        ''')
+        verses_conn.execute(VERSES_VIEW_SQL)
         
-        for reference, verse_text, analyzed_verse in rows:
-            chapter, verse_num = parse_chapter_verse(reference)
-            if not chapter or not verse_num:
-                continue
-            
-            total_verses += 1
-            
-            # Parse nodes from AnalyzedVerse
-            node_ids = []
-            if analyzed_verse:
-                verses_with_analysis += 1
-                parsed_nodes = parse_analyzed_verse(analyzed_verse)
-                
-                for node in parsed_nodes:
-                    # Match to concept
-                    concept_id = None
-                    if concepts_cur and node['part_of_speech']:
-                        concept_id = match_node_to_concept(
-                            concepts_cur,
-                            node['stem'],
-                            node['part_of_speech'],
-                            node['sense']
-                        )
-                    
-                    # Insert node
-                    nodes_cur.execute('''
-                        INSERT INTO nodes (category, content, stem, sense, part_of_speech, feature_codes, concept_id)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        node['category'],
-                        node['content'],
-                        node['stem'],
-                        node['sense'],
-                        node['part_of_speech'],
-                        node['feature_codes'],
-                        concept_id
-                    ))
-                    node_ids.append(nodes_cur.lastrowid)
-                    total_nodes += 1
-            
-            # Insert verse
-            ref_id = f"{usfm_code}-{chapter:03d}-{verse_num:03d}"
-            verses_cur.execute('''
-                INSERT INTO verses (reference, book, chapter, verse, verse_text, node_ids)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (ref_id, usfm_code, chapter, verse_num, verse_text, json.dumps(node_ids)))
+        writer = NodeVerseWriter(nodes_conn, verses_conn)
+        for result in convert_books(cfg, tables, concepts_db, workers):
+            writer.write(result)
         
-        # Progress
-        print(f"  Processed {table_name}: {len(rows)} verses")
+        # Create indexes
+        verses_conn.execute("CREATE INDEX idx_verses_book ON verse_ranges(book, chapter, verse)")
+        verses_conn.execute("CREATE INDEX idx_verses_first_node ON verse_ranges(first_node_id)")
+        nodes_conn.execute("CREATE INDEX idx_nodes_noun_features ON nodes(category, number, person, participant_tracking)")
+        nodes_conn.execute("CREATE INDEX idx_nodes_verb_features ON nodes(category, aspect, mood, polarity)")
+        nodes_conn.execute("CREATE INDEX idx_nodes_degree ON nodes(category, degree)")
+        nodes_conn.execute("CREATE INDEX idx_nodes_stem ON nodes(stem)")
+        nodes_conn.execute("CREATE INDEX idx_nodes_concept ON nodes(concept_id)")
+        
+        manifest = {f"book:{table_name}": h for table_name, h in book_hashes.items()}
+        manifest['concepts'] = concepts_hash
+        manifest['schema'] = NODE_SCHEMA_VERSION
+        write_manifest(verses_conn, manifest)
+    
+    writer.print_totals(concepts_db is not None)
+    return True
+
+
+def update_nodes_and_verses_db(cfg: Config, manifest: Dict[str, str], book_hashes: Dict[str, str],
+                               concepts_db: Optional[Path], concepts_hash: str, workers: int = 1):
+    """
+    Incrementally update nodes.sqlite and verses.sqlite.
     
-    # Create indexes
-    nodes_cur.execute("CREATE INDEX idx_nodes_category ON nodes(category)")
-    nodes_cur.execute("CREATE INDEX idx_nodes_stem ON nodes(stem)")
-    nodes_cur.execute("CREATE INDEX idx_nodes_concept ON nodes(concept_id)")
+    Books whose source hash changed are deleted and re-inserted (their nodes
+    get new ids after the current maximum); books that disappeared are
+    deleted. If concepts.sqlite changed, concept_ids of all nodes are
+    re-resolved without re-parsing.
+    """
+    old_books = {source[len("book:"):]: h for source, h in manifest.items() if source.startswith("book:")}
+    changed = [t for t, h in book_hashes.items() if old_books.get(t) != h]
+    removed = [t for t in old_books if t not in book_hashes]
+    concepts_changed = manifest.get('concepts') != concepts_hash
+    
+    if not changed and not removed and not concepts_changed:
+        print("  ✓ Sources unchanged, keeping nodes.sqlite and verses.sqlite")
+        return True
     
-    # Commit and close
-    nodes_conn.commit()
-    verses_conn.commit()
+    print(f"  {len(changed)} changed, {len(removed)} removed book(s)"
+          f"{', concepts changed' if concepts_changed else ''}")
     
-    nodes_conn.close()
-    verses_conn.close()
-    src_conn.close()
-    if concepts_conn:
-        concepts_conn.close()
+    with bulk_build_all([cfg.nodes_db, cfg.verses_db], cfg.vacuum,
+                        seeds=[cfg.nodes_db, cfg.verses_db]) as (nodes_conn, verses_conn):
+        # Drop old rows of changed and removed books
+        for table_name in changed + removed:
+            usfm_code = BOOK_TO_USFM[table_name]
+            nodes_conn.execute("DELETE FROM nodes WHERE book = ?", (usfm_code,))
+            verses_conn.execute("DELETE FROM verse_ranges WHERE book = ?", (usfm_code,))
+        
+        # Re-parse changed books
+        max_id = nodes_conn.execute("SELECT MAX(node_id) FROM nodes").fetchone()[0]
+        writer = NodeVerseWriter(nodes_conn, verses_conn, next_node_id=(max_id or 0) + 1)
+        for result in convert_books(cfg, sorted(changed), concepts_db, workers):
+            writer.write(result)
+        
+        # Re-resolve concept ids of existing nodes
+        if concepts_changed:
+            resolver = ConceptResolver(concepts_db) if concepts_db else None
+            updates = []
+            for node_id, stem, pos, sense, concept_id in nodes_conn.execute(
+                    "SELECT node_id, stem, part_of_speech, sense, concept_id FROM nodes"):
+                new_id = resolver.resolve(stem, pos, sense) if resolver and pos else None
+                if new_id != concept_id:
+                    updates.append((new_id, node_id))
+            nodes_conn.executemany("UPDATE nodes SET concept_id = ? WHERE node_id = ?", updates)
+            print(f"  ✓ Re-resolved concepts: {len(updates):,} nodes changed")
+        
+        entries = {f"book:{t}": book_hashes[t] for t in changed}
+        entries.update({f"book:{t}": None for t in removed})
+        entries['concepts'] = concepts_hash
+        write_manifest(verses_conn, entries)
     
-    print(f"  ✓ Created {total_verses:,} verses ({verses_with_analysis:,} with AnalyzedVerse)")
-    print(f"  ✓ Created {total_nodes:,} nodes")
+    if changed:
+        writer.print_totals(concepts_db is not None)
     return True
 
 
@@ -556,32 +1013,21 @@ def create_strongs_db(cfg: Config):
     if not cfg.biblevec_db.exists():
         print(f"  ⚠ BibleVec database not found: {cfg.biblevec_db}")
         print("  Creating empty strongs table instead...")
-        if cfg.strongs_db.exists():
-            cfg.strongs_db.unlink()
-        conn = sqlite3.connect(cfg.strongs_db)
-        cur = conn.cursor()
-        cur.execute('''
-            CREATE TABLE strongs (
-                strongs_number TEXT PRIMARY KEY,
-                language TEXT,
-                lemma TEXT,
-                definition TEXT,
-                derivation TEXT
-            )
-        ''')
-        conn.commit()
-        conn.close()
+        with bulk_build(cfg.strongs_db, cfg.vacuum) as conn:
+            conn.execute('''
+                CREATE TABLE strongs (
+                    strongs_number TEXT PRIMARY KEY,
+                    language TEXT,
+                    lemma TEXT,
+                    definition TEXT,
+                    derivation TEXT
+                )
+            ''')
         return True
     
-    if cfg.strongs_db.exists():
-        cfg.strongs_db.unlink()
-    
     # Copy strongs table from BibleVec
     src_conn = sqlite3.connect(cfg.biblevec_db)
-    tgt_conn = sqlite3.connect(cfg.strongs_db)
-    
     src_cur = src_conn.cursor()
-    tgt_cur = tgt_conn.cursor()
     
     # Get schema from source
     src_cur.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='strongs'")
@@ -589,12 +1035,8 @@ def create_strongs_db(cfg: Config):
     if not schema:
         print("  ⚠ strongs table not found in BibleVec.sqlite")
         src_conn.close()
-        tgt_conn.close()
         return False
     
-    # Create table and copy data
-    tgt_cur.execute(schema[0])
-    
     src_cur.execute("SELECT * FROM strongs")
     rows = src_cur.fetchall()
     
@@ -602,17 +1044,129 @@ def create_strongs_db(cfg: Config):
     src_cur.execute("PRAGMA table_info(strongs)")
     col_count = len(src_cur.fetchall())
     placeholders = ",".join(["?"] * col_count)
-    
-    tgt_cur.executemany(f"INSERT INTO strongs VALUES ({placeholders})", rows)
-    
-    tgt_conn.commit()
     src_conn.close()
-    tgt_conn.close()
+    
+    # Create table and copy data
+    with bulk_build(cfg.strongs_db, cfg.vacuum) as tgt_conn:
+        tgt_conn.execute(schema[0])
+        tgt_conn.executemany(f"INSERT INTO strongs VALUES ({placeholders})", rows)
     
     print(f"  ✓ Copied {len(rows):,} Strong's entries from BibleVec.sqlite")
     return True
 
 
+# ============================================================
+# PARQUET EXPORT
+# ============================================================
+
+
+def parquet_schemas():
+    """Explicit schemas, so every book partition has the same column types."""
+    verses = pa.schema([
+        ('reference', pa.string()),
+        ('chapter', pa.int32()),
+        ('verse', pa.int32()),
+        ('verse_text', pa.string()),
+        ('first_node_id', pa.int64()),
+        ('node_count', pa.int32()),
+    ])
+    nodes = pa.schema([
+        ('node_id', pa.int64()),
+        ('chapter', pa.int32()),
+        ('verse', pa.int32()),
+        ('position', pa.int32()),
+        ('category', pa.string()),
+        ('content', pa.string()),
+        ('stem', pa.string()),
+        ('sense', pa.string()),
+        ('part_of_speech', pa.string()),
+        ('feature_codes', pa.string()),
+        ('concept_id', pa.int64()),
+    ] + [(column, pa.string()) for column in NODE_FEATURES])
+    return verses, nodes
+
+
+def rows_to_table(rows: List[tuple], schema) -> 'pa.Table':
+    """Build a table from row tuples in schema column order."""
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    return pa.Table.from_arrays([pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                                schema=schema)
+
+
+def export_parquet(cfg: Config, parquet_dir: Path) -> bool:
+    """
+    Export verses, nodes (with decoded features) and concepts as Parquet.
+    
+    verses/ and nodes/ are hive-partitioned by book (book=GEN/part-0.parquet);
+    concepts.parquet is a single file. The export is written next to
+    parquet_dir and renamed into place once complete.
+    """
+    print("\n[5/5] Exporting Parquet...")
+    
+    if pa is None:
+        print("  ✗ pyarrow not installed")
+        print("  Install with: pip install pyarrow")
+        return False
+    if not cfg.verses_db.exists() or not cfg.nodes_db.exists():
+        print("  ✗ verses.sqlite / nodes.sqlite not found")
+        return False
+    
+    verses_schema, nodes_schema = parquet_schemas()
+    tmp_dir = parquet_dir.with_name(parquet_dir.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    
+    try:
+        conn = sqlite3.connect(cfg.verses_db)
+        conn.execute("ATTACH DATABASE ? AS n", (str(cfg.nodes_db),))
+        books = [row[0] for row in conn.execute("SELECT DISTINCT book FROM verse_ranges ORDER BY book")]
+        
+        total_nodes = 0
+        for book in books:
+            verse_rows = conn.execute('''
+                SELECT reference, chapter, verse, verse_text, first_node_id, node_count
+                FROM verse_ranges WHERE book = ? ORDER BY chapter, verse
+            ''', (book,)).fetchall()
+            
+            node_rows = []
+            for row in conn.execute('''
+                SELECT node_id, chapter, verse, position, category, content, stem, sense,
+                       part_of_speech, feature_codes, concept_id, number, person, participant_tracking, aspect, mood, polarity, degree
+                FROM n.nodes WHERE book = ? ORDER BY chapter, verse, position
+            ''', (book,)):
+                # Feature value ids -> labels
+                labels = tuple(FEATURE_LABELS[column].get(value_id)
+                               for column, value_id in zip(NODE_FEATURES, row[11:]))
+                node_rows.append(row[:11] + labels)
+            
+            for name, rows, schema in [("verses", verse_rows, verses_schema), ("nodes", node_rows, nodes_schema)]:
+                partition = tmp_dir / name / f"book={book}"
+                partition.mkdir(parents=True)
+                pq.write_table(rows_to_table(rows, schema), partition / "part-0.parquet")
+            total_nodes += len(node_rows)
+        conn.close()
+        
+        if cfg.concepts_db.exists():
+            conn = sqlite3.connect(cfg.concepts_db)
+            cursor = conn.execute("SELECT * FROM concepts ORDER BY id")
+            names = [col[0] for col in cursor.description]
+            rows = cursor.fetchall()
+            conn.close()
+            pq.write_table(pa.table({name: list(col) for name, col in zip(names, zip(*rows))} if rows
+                                    else {name: [] for name in names}),
+                           tmp_dir / "concepts.parquet")
+        
+        if parquet_dir.exists():
+            shutil.rmtree(parquet_dir)
+        tmp_dir.rename(parquet_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    
+    print(f"  ✓ Exported {len(books)} books, {total_nodes:,} nodes to {parquet_dir}")
+    return True
+
+
 def print_summary(cfg: Config):
     """Print summary of created databases."""
     print("\n" + "=" * 60)
@@ -649,8 +1203,8 @@ def print_summary(cfg: Config):
         n.nodes.content AS word,
         c.concepts.gloss AS meaning
     FROM verses v
-    JOIN json_each(v.node_ids) AS je
-    JOIN n.nodes ON n.nodes.node_id = je.value
+    JOIN n.nodes ON n.nodes.book = v.book
+        AND n.nodes.chapter = v.chapter AND n.nodes.verse = v.verse
     LEFT JOIN c.concepts ON c.concepts.id = n.nodes.concept_id
     LEFT JOIN niv.niv ON niv.niv.book = v.book 
         AND niv.niv.chapter = v.chapter 
@@ -672,10 +1226,18 @@ def main():
                         help="Directory containing source databases")
     parser.add_argument("--output-dir", type=Path, default=default_output,
                         help="Output directory for converted databases")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parse books in N worker processes (default: 1, serial)")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="VACUUM each database after building (smaller files, slower build)")
+    parser.add_argument("--parquet", type=Path, metavar="DIR",
+                        help="Also export verses/nodes/concepts as Parquet (partitioned by book) to DIR")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only rebuild what changed since the last run (uses the manifest tables)")
     args = parser.parse_args()
     
     # Create config
-    cfg = Config(args.source_dir, args.output_dir)
+    cfg = Config(args.source_dir, args.output_dir, vacuum=args.vacuum, incremental=args.incremental)
     
     print("=" * 60)
     print("TBTA Database Converter")
@@ -704,10 +1266,11 @@ def main():
     
     # Run conversions
     create_concepts_db(cfg)
-    apply_strongs_mappings(cfg)
     create_niv_db(cfg)
-    create_nodes_and_verses_db(cfg)
+    create_nodes_and_verses_db(cfg, workers=args.workers)
     create_strongs_db(cfg)
+    if args.parquet:
+        export_parquet(cfg, args.parquet)
     
     # Summary
     print_summary(cfg)
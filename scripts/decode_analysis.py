@@ -23,12 +23,14 @@ Usage:
 
 import argparse
 import json
-import re
 import sqlite3
 import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from tbta_db import get_corpus
+from tbta_tokenizer import tokenize
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_DIR = SCRIPT_DIR.parent
@@ -107,6 +109,64 @@ SEMANTIC_ROLE = {
     'N': 'Not Applicable',
 }
 
+# Verb aspect
+ASPECT = {
+    'I': 'Imperfective',
+    'C': 'Completive',
+    'r': 'Inceptive',
+    'U': 'Unmarked',
+}
+
+# Verb mood
+MOOD = {
+    'I': 'Indicative',
+}
+
+# Verb polarity
+POLARITY = {
+    'N': 'Negative',
+    'A': 'Affirmative',
+}
+
+# Verb degree
+DEGREE = {
+    'N': 'No Degree',
+    'C': 'Comparative',
+    'S': 'Superlative',
+    'I': 'Intensified',
+}
+
+# Character positions in a word's feature codes (the part after "N-"/"V-").
+# Nouns follow research/features/proximity-system/TBTA.md:
+#   {complexity}{sense}{index}{Number}{ParticipantTracking}{Polarity}{Proximity}
+#   {Future}{Person}{SurfaceRealization}{ParticipantStatus}
+NOUN_LIST_INDEX_POSITION = 2
+NOUN_FEATURE_POSITIONS = {
+    'Number': (3, NUMBER_SYSTEM),
+    'Participant Tracking': (4, PARTICIPANT_TRACKING),
+    'Polarity': (5, POLARITY),
+    'Person': (8, PERSON_SYSTEM),
+}
+
+# Verbs: {complexity}{sense}{Time}{Aspect}{Mood}{Reflexivity}{Polarity}{Degree}.
+# Time, Aspect and Mood as in research/tbta-source/data-structure.md; Polarity
+# comes after Reflexivity, since GEN 1:1 "create" (V-1ArUINAN...) is Affirmative.
+VERB_FEATURE_POSITIONS = {
+    'Aspect': (3, ASPECT),
+    'Mood': (4, MOOD),
+    'Polarity': (6, POLARITY),
+    'Degree': (7, DEGREE),
+}
+
+# Documented word tags and the values they must decode to
+# (GEN 1:1 in research/tbta-source/data-structure.md)
+DOCUMENTED_TAGS = [
+    ('N', '1A1SDAnK3NN........',
+     {'Number': 'Singular', 'Person': 'Third', 'Participant Tracking': 'Routine', 'NounListIndex': '1'}),
+    ('V', '1ArUINAN...........',
+     {'Mood': 'Indicative', 'Polarity': 'Affirmative'}),
+]
+
 
 class TBTAParser:
     """Parser for TBTA AnalyzedVerse encoding."""
@@ -136,20 +196,11 @@ class TBTAParser:
     def _tokenize(self, text: str) -> List[tuple]:
         """Tokenize AnalyzedVerse into (type, value) pairs."""
         tokens = []
-        parts = text.split('~\\wd')
         
-        for part in parts:
-            if not part.strip():
-                continue
-            
-            tag_match = re.search(r'~\\tg\s+([^\s~]+)', part)
-            lu_match = re.search(r'~\\lu\s+([^~]*)', part)
-            
-            tag = tag_match.group(1) if tag_match else ''
-            constituent = lu_match.group(1).strip() if lu_match else ''
-            
-            if tag or constituent:
-                tokens.append(('element', {'tag': tag, 'constituent': constituent}))
+        for token in tokenize(text):
+            # Only the first word of the tag carries feature codes
+            tag = token.tag.split()[0] if token.tag else ''
+            tokens.append(('element', {'tag': tag, 'constituent': token.constituent or ''}))
         
         return tokens
     
@@ -296,16 +347,16 @@ class TBTAParser:
         """Decode word feature code."""
         result = {'Code': code}
         
-        if len(code) >= 1:
-            part = code[0]
+        part = code[:1]
+        if part:
             result['Part'] = PART_TYPES.get(part, part)
         
-        if part == 'N' and len(code) >= 10:
-            result.update(self._decode_noun(code))
-        elif part == 'V' and len(code) >= 10:
-            result.update(self._decode_verb(code))
-        elif part == 'A':
-            result.update(self._decode_adjective(code))
+        # Feature positions count from after the "N-"/"V-" prefix
+        features = code[2:] if code[1:2] == '-' else ''
+        if part == 'N':
+            result.update(self._decode_noun(features))
+        elif part == 'V':
+            result.update(self._decode_positions(features, VERB_FEATURE_POSITIONS))
         elif part == 'C':
             result['Part'] = 'Conjunction'
         elif part == 'P':
@@ -313,73 +364,57 @@ class TBTAParser:
         
         return result
     
-    def _decode_noun(self, code: str) -> Dict[str, Any]:
+    def _decode_noun(self, features: str) -> Dict[str, Any]:
         """Decode noun feature positions."""
-        result = {}
-        
-        if len(code) >= 3 and code[2] in NUMBER_SYSTEM:
-            result['Number'] = NUMBER_SYSTEM[code[2]]
-        
-        if len(code) >= 6 and code[5] in PARTICIPANT_TRACKING:
-            result['Participant Tracking'] = PARTICIPANT_TRACKING[code[5]]
+        result = self._decode_positions(features, NOUN_FEATURE_POSITIONS)
         
-        if len(code) >= 11 and code[10] in PERSON_SYSTEM:
-            result['Person'] = PERSON_SYSTEM[code[10]]
-        
-        if len(code) >= 5:
-            idx = code[4]
+        if len(features) > NOUN_LIST_INDEX_POSITION:
+            idx = features[NOUN_LIST_INDEX_POSITION]
             if idx not in ['.', 'N']:
                 result['NounListIndex'] = idx
         
         return result
     
-    def _decode_verb(self, code: str) -> Dict[str, Any]:
-        """Decode verb feature positions."""
-        result = {}
-        
-        if len(code) >= 5:
-            aspect = code[4]
-            aspect_map = {
-                'I': 'Imperfective',
-                'C': 'Completive',
-                'r': 'Inceptive',
-                'U': 'Unmarked',
-            }
-            if aspect in aspect_map:
-                result['Aspect'] = aspect_map[aspect]
-        
-        if len(code) >= 6:
-            mood = code[5]
-            if mood == 'I':
-                result['Mood'] = 'Indicative'
-        
-        if len(code) >= 7:
-            pol = code[6]
-            if pol == 'N':
-                result['Polarity'] = 'Negative'
-            elif pol == 'A':
-                result['Polarity'] = 'Affirmative'
-        
-        return result
-    
-    def _decode_adjective(self, code: str) -> Dict[str, Any]:
-        """Decode adjective feature positions."""
+    def _decode_positions(self, features: str, positions: Dict[str, tuple]) -> Dict[str, Any]:
+        """Decode the (position, code table) features present in a feature string."""
         result = {}
         
-        if len(code) >= 4:
-            degree = code[3]
-            degree_map = {
-                'N': 'No Degree',
-                'C': 'Comparative',
-                'S': 'Superlative',
-                'I': 'Intensified',
-            }
-            if degree in degree_map:
-                result['Degree'] = degree_map[degree]
+        for name, (position, table) in positions.items():
+            if position < len(features) and features[position] in table:
+                result[name] = table[features[position]]
         
         return result
 
 
+_word_decoder = TBTAParser()
+
+
+def decode_features(category: Optional[str], feature_codes: Optional[str]) -> Dict[str, Any]:
+    """
+    Decode a word node's feature_codes, as stored in nodes.sqlite.
+    
+    Returns named features, e.g. {'Number': 'Singular', 'Person': 'Third'}.
+    Phrase- and clause-level nodes (lowercase category) decode to {}.
+    """
+    if not category or not category.isupper():
+        return {}
+    result = _word_decoder._decode_word(f"{category}-{feature_codes or ''}")
+    result.pop('Code', None)
+    result.pop('Part', None)
+    return result
+
+
+def check_documented_tags() -> List[str]:
+    """Differences between decode_features() and DOCUMENTED_TAGS (empty if none)."""
+    problems = []
+    for category, feature_codes, expected in DOCUMENTED_TAGS:
+        decoded = decode_features(category, feature_codes)
+        for name, value in expected.items():
+            if decoded.get(name) != value:
+                problems.append(f"{category}-{feature_codes}: {name} is {decoded.get(name)!r}, documented as {value!r}")
+    return problems
+
+
 def parse_reference(reference: str) -> tuple:
     """Parse verse reference like 'GEN 1:1' or 'GEN.1.1'."""
     ref = reference.replace(':', '.').replace(' ', '.')
@@ -400,13 +435,26 @@ def get_verse_from_db(book: str, chapter: int, verse: int, db_path: Path) -> Opt
     if not db_path.exists():
         return None
     
+    # verses.sqlite from convert_db: shared read-only connection
+    if db_path.name == "verses.sqlite":
+        row = get_corpus(db_path.parent).get_verse(book, chapter, verse)
+        if row:
+            return {
+                'book': row['book'],
+                'chapter': row['chapter'],
+                'verse': row['verse'],
+                'text': row['text'],
+                'first_node_id': row['first_node_id'],
+                'node_count': row['node_count']
+            }
+    
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     # Try verses.sqlite format
     try:
         cursor.execute("""
-            SELECT book, chapter, verse, verse_text, node_ids
+            SELECT book, chapter, verse, verse_text, first_node_id, node_count
             FROM verses
             WHERE book = ? AND chapter = ? AND verse = ?
         """, (book, chapter, verse))
@@ -418,7 +466,8 @@ def get_verse_from_db(book: str, chapter: int, verse: int, db_path: Path) -> Opt
                 'chapter': row[1],
                 'verse': row[2],
                 'text': row[3],
-                'node_ids': json.loads(row[4]) if row[4] else []
+                'first_node_id': row[4],
+                'node_count': row[5]
             }
     except sqlite3.OperationalError:
         pass
@@ -448,36 +497,11 @@ def get_verse_from_db(book: str, chapter: int, verse: int, db_path: Path) -> Opt
     return None
 
 
-def get_nodes_from_db(node_ids: List[int], nodes_db: Path) -> List[Dict]:
-    """Get node data from nodes.sqlite."""
-    if not node_ids or not nodes_db.exists():
+def get_nodes_from_db(book: str, chapter: int, verse: int, nodes_db: Path) -> List[Dict]:
+    """Get a verse's nodes, in word order, from nodes.sqlite."""
+    if not nodes_db.exists():
         return []
-    
-    conn = sqlite3.connect(nodes_db)
-    cursor = conn.cursor()
-    
-    placeholders = ",".join("?" * len(node_ids))
-    cursor.execute(f"""
-        SELECT node_id, category, content, stem, sense, part_of_speech, feature_codes, concept_id
-        FROM nodes
-        WHERE node_id IN ({placeholders})
-    """, node_ids)
-    
-    nodes = []
-    for row in cursor.fetchall():
-        nodes.append({
-            'node_id': row[0],
-            'category': row[1],
-            'content': row[2],
-            'stem': row[3],
-            'sense': row[4],
-            'part_of_speech': row[5],
-            'feature_codes': row[6],
-            'concept_id': row[7]
-        })
-    
-    conn.close()
-    return nodes
+    return get_corpus(nodes_db.parent).get_nodes(book, chapter, verse)
 
 
 def main():
@@ -540,10 +564,9 @@ def main():
         result['structure'] = tbta_parser.parse(analyzed)
     
     # Get nodes if available
-    node_ids = verse_data.get('node_ids', [])
-    if node_ids:
+    if verse_data.get('node_count'):
         nodes_db = DB_DIR / "nodes.sqlite"
-        nodes = get_nodes_from_db(node_ids, nodes_db)
+        nodes = get_nodes_from_db(verse_data['book'], verse_data['chapter'], verse_data['verse'], nodes_db)
         if nodes:
             result['nodes'] = nodes
     
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Per-field concept vectors and fused word-level search.
+
+Besides concept_vectors (stem, gloss, categorization and examples blended
+into one text), create_embeddings.py writes one vec0 table per field to
+concept_vectors.sqlite:
+
+    concept_stem_vectors     The stem alone
+    concept_gloss_vectors    The gloss
+    concept_example_vectors  The curated examples
+
+A single word sits far from a long blended text even when it is the
+concept's stem, so word lookups against concept_vectors are fuzzy.
+FusedConceptIndex loads the field tables into memory once and scores every
+query against all three fields in one matrix pass, combining the per-field
+distances as a weighted mean over every field. A field a concept lacks
+counts at the distance to an unrelated (orthogonal) vector, so concepts
+with only a stem do not outrank ones whose gloss and examples also match.
+Distances are in legacy int8 units, like quantization.knn().
+
+The same class serves databases built before the field tables existed:
+given tables={"concept": "concept_vectors"} it is a plain in-memory L2
+search over the blended vectors. Either way, all the words of a verse are
+scored in one batched matrix product instead of one vec0 query each.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from quantization import Quantizer, float32_to_int8
+
+CONCEPT_FIELDS = {
+    "stem": "concept_stem_vectors",
+    "gloss": "concept_gloss_vectors",
+    "examples": "concept_example_vectors",
+}
+
+DEFAULT_FIELD_WEIGHTS = {"stem": 0.5, "gloss": 0.3, "examples": 0.2}
+MISSING_FIELD_NORM = 127.0   # Missing fields score as an orthogonal vector of this legacy norm
+
+
+def has_field_vectors(db) -> bool:
+    """Whether a concept vector database has the per-field tables."""
+    tables = {name for (name,) in db.cursor().execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return all(table in tables for table in CONCEPT_FIELDS.values())
+
+
+class FusedConceptIndex:
+    """In-memory per-field concept vectors, searched together."""
+
+    def __init__(self, db, quantizer: Optional[Quantizer] = None,
+                 weights: Optional[Dict[str, float]] = None,
+                 tables: Optional[Dict[str, str]] = None):
+        quantizer = quantizer or Quantizer.load(db)
+        self.tables = dict(tables or CONCEPT_FIELDS)
+        self.weights = dict(weights or {field: DEFAULT_FIELD_WEIGHTS.get(field, 1.0) for field in self.tables})
+
+        field_rows = {
+            field: list(db.cursor().execute(
+                f"SELECT concept_id, stem, {quantizer.legacy_column} FROM {table}"
+            ))
+            for field, table in self.tables.items()
+        }
+
+        # One entry per (concept_id, stem), whichever fields it has
+        entries = sorted({(cid, stem) for rows in field_rows.values() for cid, stem, _ in rows},
+                         key=lambda entry: (entry[0], entry[1] or ""))
+        index = {entry: i for i, entry in enumerate(entries)}
+        self.entries: List[Tuple[int, str]] = entries
+
+        dims = next((len(blob) for rows in field_rows.values() for _, _, blob in rows), 0)
+        self.vectors: Dict[str, np.ndarray] = {}
+        self.present: Dict[str, np.ndarray] = {}
+        for field, rows in field_rows.items():
+            vectors = np.zeros((len(entries), dims), dtype=np.float32)
+            present = np.zeros(len(entries), dtype=bool)
+            if rows:
+                positions = [index[(cid, stem)] for cid, stem, _ in rows]
+                vectors[positions] = quantizer.legacy_vectors([bytes(blob) for _, _, blob in rows], dims)
+                present[positions] = True
+            self.vectors[field] = vectors
+            self.present[field] = present
+        self.norms = {field: np.einsum("ij,ij->i", v, v) for field, v in self.vectors.items()}
+        self._allowed = None     # Last allowed collection passed to search, and
+        self._excluded = None    # the mask of entries it excludes
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def distances(self, queries: np.ndarray) -> np.ndarray:
+        """(queries, concepts) fused distances for float query embeddings."""
+        query_int8 = float32_to_int8(np.atleast_2d(queries)).astype(np.float32)
+        query_norms = np.einsum("ij,ij->i", query_int8, query_int8)[:, None]
+
+        missing = np.sqrt(query_norms + MISSING_FIELD_NORM ** 2)
+
+        total = np.zeros((len(query_int8), len(self.entries)), dtype=np.float32)
+        weight = 0.0
+        for field, vectors in self.vectors.items():
+            w = self.weights.get(field, 0.0)
+            if not w:
+                continue
+            squared = query_norms + self.norms[field][None, :] - 2.0 * (query_int8 @ vectors.T)
+            total += w * np.where(self.present[field][None, :], np.sqrt(np.maximum(squared, 0.0)), missing)
+            weight += w
+        if not weight:
+            return np.full_like(total, np.inf)
+        return total / weight
+
+    def search(self, queries: np.ndarray, limit: int,
+               allowed: Optional[Sequence[int]] = None) -> List[List[Tuple[int, str, float]]]:
+        """
+        Closest (concept_id, stem, distance) tuples for each query, closest first.
+
+        queries may be one embedding or a (n, dims) batch; all are scored
+        in one pass. allowed restricts results to those concept ids (its
+        mask is reused while the same collection is passed).
+        """
+        distances = self.distances(queries)
+        if allowed is not None:
+            if allowed is not self._allowed:
+                allowed_ids = set(allowed)
+                self._excluded = np.array([cid not in allowed_ids for cid, _ in self.entries], dtype=bool)
+                self._allowed = allowed
+            distances[:, self._excluded] = np.inf
+        results = []
+        for row in distances:
+            order = np.argsort(row, kind="stable")[:limit]
+            results.append([(*self.entries[i], float(row[i])) for i in order if np.isfinite(row[i])])
+        return results
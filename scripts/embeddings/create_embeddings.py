@@ -18,7 +18,7 @@ Output:
 
 Requirements:
   pip install sentence-transformers sqlite-vec apsw numpy pyyaml tqdm
-  pip install openai  # for OpenAI embeddings
+  (OpenAI embeddings only need OPENAI_API_KEY; requests use the standard library)
 
 Usage:
     # Local model (default)
@@ -31,13 +31,20 @@ Usage:
 """
 
 import argparse
-import json
+import hashlib
+import multiprocessing
 import os
+import pickle
 import re
 import sqlite3
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Callable, List, Optional
+from queue import Queue
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 import numpy as np
 
@@ -52,14 +59,23 @@ except ImportError as e:
 
 try:
     import yaml
+    YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)  # libyaml when PyYAML was built with it
 except ImportError:
     yaml = None
+    YAML_LOADER = None
+
+from concept_fields import CONCEPT_FIELDS
+from embedding_cache import EmbeddingCache
+from embedding_metadata import check_compatible, read_metadata, source_version, write_metadata
+from openai_client import OpenAIEmbeddingClient
+from quantization import CALIBRATION_ROWS, DEFAULT_QUANTIZATION, QUANTIZATION_MODES, Quantizer
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_DIR = SCRIPT_DIR.parent.parent  # scripts/embeddings -> scripts -> tbta-ai-framework
 DB_DIR = PROJECT_DIR / "databases"
 EMB_BASE_DIR = PROJECT_DIR / "databases" / "embeddings"
+STRONGS_SNAPSHOT = EMB_BASE_DIR / "strongs_snapshot.pickle"
 
 # Model configs
 PROVIDERS = {
@@ -74,21 +90,56 @@ PROVIDERS = {
 }
 
 BATCH_SIZE = 128
+OPENAI_PIPELINE_BATCH = 2048
 MAX_CHARS = 1000
+STRONGS_SNAPSHOT_VERSION = 1
+YAML_PARSE_CHUNK = 64        # Files per process-pool task
+YAML_POOL_MIN_FILES = 1000   # Fewer files parse faster than worker processes start
+
+
+# Model loaded once per worker process by _init_local_worker
+_worker_model = None
+
+
+def _init_local_worker(model_name: str, threads: int):
+    """Pool initializer: pin the torch thread count and load a CPU model copy."""
+    global _worker_model
+    import torch
+    from sentence_transformers import SentenceTransformer
+    
+    torch.set_num_threads(threads)
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+
+
+def _local_worker_dims() -> int:
+    return _worker_model.get_sentence_embedding_dimension()
 
 
-def float32_to_int8(embeddings: np.ndarray) -> np.ndarray:
-    """Quantize float32 embeddings to int8 for 4x storage reduction."""
-    clipped = np.clip(embeddings, -1.0, 1.0)
-    return (clipped * 127).astype(np.int8)
+def _encode_local_chunk(texts: List[str]) -> np.ndarray:
+    return _worker_model.encode(
+        texts,
+        batch_size=len(texts),
+        normalize_embeddings=True,
+        show_progress_bar=False,
+        convert_to_numpy=True
+    )
 
 
 class LocalEncoder:
-    """Sentence-transformers encoder."""
+    """
+    Sentence-transformers encoder.
+    
+    With workers > 1 on a CPU-only machine, texts are sharded across a pool of
+    spawned processes, each holding its own model copy and using
+    cpu_count // workers torch threads. Texts are sorted by length before
+    being cut into batches, so each batch pads to similar lengths, and the
+    results are put back in input order.
+    """
+    
+    provider = "local"
     
-    def __init__(self, model_name: str, dims: int):
+    def __init__(self, model_name: str, dims: int, workers: int = 1, batch_size: int = BATCH_SIZE):
         import torch
-        from sentence_transformers import SentenceTransformer
         
         device = "cpu"
         if torch.backends.mps.is_available():
@@ -98,75 +149,138 @@ class LocalEncoder:
             device = "cuda"
             print("  Using NVIDIA GPU (CUDA)")
         
-        self.model = SentenceTransformer(model_name, device=device)
-        self.dims = self.model.get_sentence_embedding_dimension()
+        if workers > 1 and device != "cpu":
+            print(f"  ⚠ --workers only applies to CPU encoding, using a single {device} process")
+            workers = 1
+        
+        self.model = None
+        self.model_name = model_name
+        self.pool = None
+        self.workers = workers
+        self.encode_batch_size = batch_size
+        self.cache: Optional[EmbeddingCache] = None
+        
+        if workers > 1:
+            threads = max(1, (os.cpu_count() or workers) // workers)
+            self.pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_local_worker,
+                initargs=(model_name, threads),
+            )
+            self.dims = self.pool.submit(_local_worker_dims).result()
+            # Give every worker several batches per encode() call
+            self.batch_size = batch_size * workers * 4
+            print(f"  {workers} CPU workers x {threads} threads")
+        else:
+            from sentence_transformers import SentenceTransformer
+            self.model = SentenceTransformer(model_name, device=device)
+            self.dims = self.model.get_sentence_embedding_dimension()
+            self.batch_size = batch_size
         print(f"  Model dimensions: {self.dims}")
     
-    def encode(self, texts: List[str], batch_size: int = BATCH_SIZE) -> np.ndarray:
-        all_embeddings = []
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i+batch_size]
-            embeddings = self.model.encode(
-                batch,
-                normalize_embeddings=True,
-                show_progress_bar=False,
-                convert_to_numpy=True
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if self.cache is None:
+            return self.encode_uncached(texts)
+        return self.cache.encode(texts, self.encode_uncached)
+    
+    def encode_uncached(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dims), dtype=np.float32)
+        
+        # Longest first, so the slowest batches start early and padding stays small
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        chunks = [
+            order[i:i + self.encode_batch_size]
+            for i in range(0, len(order), self.encode_batch_size)
+        ]
+        batches = [[texts[i] for i in chunk] for chunk in chunks]
+        
+        if self.pool is not None:
+            results = self.pool.map(_encode_local_chunk, batches)
+        else:
+            results = (
+                self.model.encode(
+                    batch,
+                    batch_size=len(batch),
+                    normalize_embeddings=True,
+                    show_progress_bar=False,
+                    convert_to_numpy=True
+                )
+                for batch in batches
             )
-            all_embeddings.append(embeddings)
-        return np.vstack(all_embeddings) if all_embeddings else np.array([])
+        
+        embeddings = np.empty((len(texts), self.dims), dtype=np.float32)
+        for chunk, chunk_embeddings in zip(chunks, results):
+            embeddings[chunk] = chunk_embeddings
+        return embeddings
+    
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
 
 
 class OpenAIEncoder:
-    """OpenAI API encoder."""
+    """OpenAI API encoder (concurrent requests, retried with backoff)."""
     
-    def __init__(self, model_name: str, dims: int):
-        try:
-            from openai import OpenAI
-        except ImportError:
-            print("Error: pip install openai")
-            sys.exit(1)
-        
+    provider = "openai"
+    batch_size = OPENAI_PIPELINE_BATCH  # Texts per encode() call, split further by token budget
+    
+    def __init__(self, model_name: str, dims: int, base_url: Optional[str] = None,
+                 max_in_flight: int = 4, max_batch_tokens: int = 20000):
         api_key = os.environ.get("OPENAI_API_KEY")
         if not api_key:
             print("Error: Set OPENAI_API_KEY environment variable")
             sys.exit(1)
         
-        self.client = OpenAI(api_key=api_key)
+        self.client = OpenAIEmbeddingClient(
+            api_key, model_name, dims,
+            base_url=base_url,
+            max_in_flight=max_in_flight,
+            max_batch_tokens=max_batch_tokens,
+        )
         self.model = model_name
+        self.model_name = model_name
         self.dims = dims
+        self.cache: Optional[EmbeddingCache] = None
         print(f"  OpenAI model: {model_name}")
         print(f"  Dimensions: {dims}")
+        print(f"  Endpoint: {self.client.base_url} ({max_in_flight} requests in flight)")
     
-    def encode(self, texts: List[str], batch_size: int = 100) -> np.ndarray:
-        """Encode texts using OpenAI API. Batch size limited to avoid rate limits."""
-        all_embeddings = []
-        
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i+batch_size]
-            # OpenAI expects non-empty strings
-            batch = [t if t.strip() else " " for t in batch]
-            
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=batch,
-                dimensions=self.dims  # text-embedding-3 models support dimension reduction
-            )
-            
-            embeddings = np.array([e.embedding for e in response.data])
-            # Normalize (OpenAI embeddings may not be normalized)
-            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-            embeddings = embeddings / norms
-            all_embeddings.append(embeddings)
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if self.cache is None:
+            return self.encode_uncached(texts)
+        # encode_uncached checkpoints each request itself
+        return self.cache.encode(texts, self.encode_uncached, store=False)
+    
+    def encode_uncached(self, texts: List[str]) -> np.ndarray:
+        """Encode texts using the OpenAI API, storing each completed request in the cache."""
+        def checkpoint(indices: List[int], vectors: np.ndarray):
+            if self.cache is not None:
+                self.cache.put_many([texts[i] for i in indices], vectors)
         
-        return np.vstack(all_embeddings) if all_embeddings else np.array([])
+        return self.client.embed(texts, on_batch=checkpoint)
+    
+    def close(self):
+        pass
 
 
-def get_encoder(provider: str, model_name: str, dims: int):
-    """Factory function to get the appropriate encoder."""
+def get_encoder(provider: str, model_name: str, dims: int, use_cache: bool = True, **options):
+    """
+    Factory function to get the appropriate encoder, backed by the embedding cache.
+    
+    options go to the encoder: base_url, max_in_flight and max_batch_tokens
+    for OpenAIEncoder; workers and batch_size for LocalEncoder.
+    """
     if provider == "openai":
-        return OpenAIEncoder(model_name, dims)
+        encoder = OpenAIEncoder(model_name, dims, **options)
     else:
-        return LocalEncoder(model_name, dims)
+        encoder = LocalEncoder(model_name, dims, **options)
+    if use_cache:
+        # Keyed by the encoder's actual dims (local models ignore --dims)
+        encoder.cache = EmbeddingCache(provider, model_name, encoder.dims)
+    return encoder
 
 
 def concat_fields(*fields, max_length: int = MAX_CHARS) -> str:
@@ -180,118 +294,339 @@ def strip_html(text: str) -> str:
     return re.sub(r'<[^>]+>', '', text) if text else ""
 
 
-def create_verse_embeddings(encoder, dims: int, emb_dir: Path):
-    """Create verse embeddings from verses.sqlite."""
-    print("\n[1/3] Creating verse embeddings...")
-    
-    verses_db = DB_DIR / "verses.sqlite"
-    nodes_db = DB_DIR / "nodes.sqlite"
-    niv_db = DB_DIR / "niv.sqlite"
-    output_db = emb_dir / "verse_vectors.sqlite"
+def iter_verse_texts(verses_db: Path, nodes_db: Path, niv_db: Path):
+    """
+    Yield (book, chapter, verse, text) for every verse, in verses.sqlite order.
     
-    if not verses_db.exists():
-        print(f"  ✗ verses.sqlite not found")
-        return False
+    One streaming query over verses.sqlite with nodes and niv attached: the
+    NIV text and the verse's words (in position order) come from correlated
+    subqueries, each a primary-key lookup. Either database may be missing.
+    """
+    conn = sqlite3.connect(verses_db)
+    niv_text = "NULL"
+    words = "NULL"
+    if niv_db.exists():
+        conn.execute("ATTACH DATABASE ? AS niv", (str(niv_db),))
+        niv_text = '''(
+            SELECT text FROM niv.niv
+            WHERE niv.book = v.book AND niv.chapter = v.chapter AND niv.verse = v.verse
+        )'''
+    if nodes_db.exists():
+        conn.execute("ATTACH DATABASE ? AS n", (str(nodes_db),))
+        # The inner ORDER BY follows the nodes primary key, so GROUP_CONCAT sees words in order
+        words = '''(
+            SELECT GROUP_CONCAT(content, ' ') FROM (
+                SELECT content FROM n.nodes
+                WHERE nodes.book = v.book AND nodes.chapter = v.chapter AND nodes.verse = v.verse
+                  AND content != ''
+                ORDER BY position
+            )
+        )'''
     
+    try:
+        for book, chapter, verse_num, verse_text, niv, verse_words in conn.execute(f'''
+            SELECT v.book, v.chapter, v.verse, v.verse_text, {niv_text}, {words}
+            FROM verse_ranges v
+        '''):
+            yield book, chapter, verse_num, concat_fields(verse_text, niv, verse_words)
+    finally:
+        conn.close()
+
+
+# ============================================================================
+# ENCODE / WRITE PIPELINE
+# ============================================================================
+
+# Text hash and vec0 rowid of every embedded source row, for --incremental
+EMBEDDING_ROWS_SQL = """
+    CREATE TABLE embedding_rows (
+        vec_table TEXT NOT NULL,
+        key TEXT NOT NULL,
+        text_hash TEXT NOT NULL,
+        vec_rowid INTEGER NOT NULL,
+        PRIMARY KEY (vec_table, key)
+    ) WITHOUT ROWID
+"""
+
+
+def vector_db_metadata(encoder, dims: int, sources: Iterable[Path]) -> dict:
+    """embedding_metadata values describing how a vector database was built."""
+    return {
+        "provider": encoder.provider,
+        "model": encoder.model_name,
+        "dims": dims,
+        "source_version": source_version(sources),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def open_vector_db(output_db: Path, create_sql: str, quantizer: Quantizer,
+                   metadata: dict) -> "apsw.Connection":
+    """Create a fresh sqlite-vec database with a single vec0 table and its metadata."""
     if output_db.exists():
         output_db.unlink()
+    db = apsw.Connection(str(output_db))
+    db.enable_load_extension(True)
+    sqlite_vec.load(db)
+    db.enable_load_extension(False)
+    db.cursor().execute(create_sql)
+    db.cursor().execute(EMBEDDING_ROWS_SQL)
+    write_metadata(db, metadata)
+    quantizer.save(db)
+    return db
+
+
+def prepare_vector_db(output_db: Path, create_sql: str, quantizer: Quantizer, metadata: dict,
+                      incremental: bool = False):
+    """
+    Open the vector database for writing: (db, quantizer, existing rows).
+    
+    With incremental, an existing database built with the same provider,
+    model, dims and quantization is reused (keeping its calibrated scale),
+    create_sql (CREATE ... IF NOT EXISTS) adds any tables it lacks, and
+    existing is load_embedded_rows(db). Otherwise, or when it can't be
+    reused, it is rebuilt from scratch.
+    """
+    if incremental and output_db.exists():
+        db = apsw.Connection(str(output_db))
+        db.enable_load_extension(True)
+        sqlite_vec.load(db)
+        db.enable_load_extension(False)
+        stored = read_metadata(db)
+        has_rows = any(
+            row[1] == "vec_table" for row in db.cursor().execute("PRAGMA table_info(embedding_rows)")
+        )
+        if not stored or not has_rows:
+            reason = "built before incremental refresh was supported"
+        else:
+            reason = check_compatible(stored, metadata["provider"], metadata["model"], int(metadata["dims"]))
+            if reason is None and stored.get("quantization") != quantizer.mode:
+                reason = f"built with {stored.get('quantization')} quantization"
+        if reason is None:
+            db.cursor().execute(create_sql)
+            write_metadata(db, {
+                "source_version": metadata["source_version"],
+                "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            })
+            return db, Quantizer.from_metadata(stored), load_embedded_rows(db)
+        db.close()
+        print(f"  ⚠ {output_db.name} {reason}, rebuilding")
+    return open_vector_db(output_db, create_sql, quantizer, metadata), quantizer, {}
+
+
+def iter_batches(iterable: Iterable, size: int) -> Iterator[list]:
+    """Yield lists of up to size items."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class WriteStats(NamedTuple):
+    written: int
+    unchanged: int = 0
+    removed: int = 0
+    
+    def __str__(self) -> str:
+        if not (self.unchanged or self.removed):
+            return f"{self.written:,}"
+        return f"{self.written:,} new/changed ({self.unchanged:,} unchanged, {self.removed:,} removed)"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def load_embedded_rows(db) -> Dict[str, Dict[str, Tuple[str, int]]]:
+    """vec0 table -> {key: (text_hash, rowid)} for every embedded source row."""
+    tables: Dict[str, Dict[str, Tuple[str, int]]] = {}
+    for table, key, row_hash, rowid in db.cursor().execute(
+        "SELECT vec_table, key, text_hash, vec_rowid FROM embedding_rows"
+    ):
+        tables.setdefault(table, {})[key] = (row_hash, rowid)
+    return tables
+
+
+def encode_and_write(encoder, rows: Iterable[Tuple[str, str, tuple]], db, table: str,
+                     columns: List[str], quantizer: Quantizer,
+                     existing: Optional[Dict[str, Tuple[str, int]]] = None,
+                     total: Optional[int] = None, batch_size: Optional[int] = None) -> WriteStats:
+    """
+    Encode (key, text, params) rows batch by batch and insert them into table.
     
-    # Connect to source databases
-    verses_conn = sqlite3.connect(verses_db)
-    verses_cur = verses_conn.cursor()
+    params fill columns after the vector. A writer thread commits each batch
+    in one transaction while the next batch is being encoded; the queue
+    holds at most two batches, so memory stays bounded by batch_size rather
+    than by the number of rows. batch_size defaults to the encoder's own
+    batch_size, else BATCH_SIZE.
     
-    nodes_conn = None
-    niv_conn = None
+    Every row's text hash and vec0 rowid are kept in embedding_rows. With
+    existing (this table's entry from load_embedded_rows), rows whose text hash is unchanged
+    are skipped, changed rows replace their old vector, and keys no longer
+    in rows are deleted. Repeated keys (e.g. concepts sharing an id) are
+    told apart by their occurrence number.
     
-    if nodes_db.exists():
-        nodes_conn = sqlite3.connect(nodes_db)
-    if niv_db.exists():
-        niv_conn = sqlite3.connect(niv_db)
+    A quantizer that needs calibration is calibrated on the first
+    CALIBRATION_ROWS vectors (held back until then) and its scale saved
+    to embedding_metadata.
+    """
+    existing = existing or {}
+    batch_size = batch_size or getattr(encoder, "batch_size", BATCH_SIZE)
+    insert_sql = (
+        f"INSERT INTO {table}(rowid, {quantizer.insert_columns}, {', '.join(columns)}) "
+        f"VALUES (?, {quantizer.insert_values}, {', '.join('?' * len(columns))})"
+    )
+    pending: Queue = Queue(maxsize=2)
+    errors: List[BaseException] = []
     
-    # Get verses
-    verses_cur.execute("SELECT book, chapter, verse, verse_text, node_ids FROM verses")
-    verses = verses_cur.fetchall()
+    def writer():
+        while (item := pending.get()) is not None:
+            if errors:
+                continue  # Keep draining so the producer never blocks
+            vectors, records = item
+            try:
+                with db:
+                    cursor = db.cursor()
+                    stale = [(old_rowid,) for _, old_rowid, _, _, _ in records if old_rowid is not None]
+                    if stale:
+                        cursor.executemany(f"DELETE FROM {table} WHERE rowid = ?", stale)
+                    cursor.executemany(insert_sql, (
+                        (rowid, *vector, *params)
+                        for vector, (rowid, _, _, _, params) in zip(vectors, records)
+                    ))
+                    cursor.executemany(
+                        "INSERT OR REPLACE INTO embedding_rows (vec_table, key, text_hash, vec_rowid) "
+                        "VALUES (?, ?, ?, ?)",
+                        [(table, key, row_hash, rowid) for rowid, _, key, row_hash, _ in records],
+                    )
+            except BaseException as e:
+                errors.append(e)
     
-    print(f"  Found {len(verses):,} verses")
+    thread = threading.Thread(target=writer, name="vec-writer", daemon=True)
+    thread.start()
     
-    # Build text for each verse
-    texts = []
-    metadata = []
+    held = []  # (embeddings, records) waiting for calibration
     
-    for book, chapter, verse_num, verse_text, node_ids_json in verses:
-        # Start with verse text
-        parts = [verse_text or ""]
-        
-        # Add NIV text if available
-        if niv_conn:
-            niv_cur = niv_conn.cursor()
-            niv_cur.execute(
-                "SELECT text FROM niv WHERE book=? AND chapter=? AND verse=?",
-                (book, chapter, verse_num)
-            )
-            row = niv_cur.fetchone()
-            if row and row[0]:
-                parts.append(row[0])
-        
-        # Add node content if available
-        if nodes_conn and node_ids_json:
-            node_ids = json.loads(node_ids_json)
-            if node_ids:
-                nodes_cur = nodes_conn.cursor()
-                placeholders = ",".join("?" * len(node_ids))
-                nodes_cur.execute(
-                    f"SELECT content FROM nodes WHERE node_id IN ({placeholders})",
-                    node_ids
-                )
-                words = [row[0] for row in nodes_cur.fetchall() if row[0]]
-                parts.append(" ".join(words))
+    def flush():
+        if quantizer.needs_calibration:
+            quantizer.calibrate(np.vstack([embeddings for embeddings, _ in held]))
+            with db:
+                quantizer.save(db)
+        for embeddings, records in held:
+            pending.put((quantizer.rows(embeddings), records))
+        held.clear()
+    
+    occurrences: Dict[str, int] = {}
+    seen = set()
+    next_rowid = max((rowid for _, rowid in existing.values()), default=0) + 1
+    written = unchanged = 0
+    
+    with tqdm(total=total, desc="  ", unit="row") as progress:
+        def changed_rows():
+            nonlocal unchanged
+            for key, text, params in rows:
+                occurrence = occurrences[key] = occurrences.get(key, 0) + 1
+                if occurrence > 1:
+                    key = f"{key}#{occurrence}"
+                seen.add(key)
+                row_hash = text_hash(text)
+                old = existing.get(key)
+                if old is not None and old[0] == row_hash:
+                    unchanged += 1
+                    progress.update(1)
+                    continue
+                yield key, text, row_hash, (old[1] if old else None), params
         
-        text = concat_fields(*parts)
-        if text:
-            texts.append(text)
-            metadata.append((book, chapter, verse_num))
+        try:
+            for batch in iter_batches(changed_rows(), batch_size):
+                if errors:
+                    break
+                records = []
+                for key, _, row_hash, old_rowid, params in batch:
+                    records.append((next_rowid, old_rowid, key, row_hash, params))
+                    next_rowid += 1
+                held.append((encoder.encode([text for _, text, _, _, _ in batch]), records))
+                if not quantizer.needs_calibration or sum(len(r) for _, r in held) >= CALIBRATION_ROWS:
+                    flush()
+                written += len(batch)
+                progress.update(len(batch))
+            if held and not errors:
+                flush()
+        finally:
+            pending.put(None)
+            thread.join()
     
-    print(f"  Encoding {len(texts):,} verses...")
-    embeddings = encoder.encode(texts)
-    embeddings_int8 = float32_to_int8(embeddings)
+    if errors:
+        raise errors[0]
     
-    # Create output database with vec0
-    print("  Creating vector database...")
-    db = apsw.Connection(str(output_db))
-    db.enable_load_extension(True)
-    sqlite_vec.load(db)
-    db.enable_load_extension(False)
+    removed = [(key, rowid) for key, (_, rowid) in existing.items() if key not in seen]
+    if removed:
+        with db:
+            cursor = db.cursor()
+            cursor.executemany(f"DELETE FROM {table} WHERE rowid = ?", [(rowid,) for _, rowid in removed])
+            cursor.executemany("DELETE FROM embedding_rows WHERE vec_table = ? AND key = ?",
+                               [(table, key) for key, _ in removed])
     
-    cursor = db.cursor()
-    cursor.execute(f'''
-        CREATE VIRTUAL TABLE verse_vectors USING vec0(
-            embedding int8[{dims}],
+    return WriteStats(written, unchanged, len(removed))
+
+
+def create_verse_embeddings(encoder, dims: int, emb_dir: Path, quantization: str = DEFAULT_QUANTIZATION,
+                            incremental: bool = False):
+    """Create verse embeddings from verses.sqlite."""
+    print("\n[1/3] Creating verse embeddings...")
+    
+    verses_db = DB_DIR / "verses.sqlite"
+    nodes_db = DB_DIR / "nodes.sqlite"
+    niv_db = DB_DIR / "niv.sqlite"
+    output_db = emb_dir / "verse_vectors.sqlite"
+    
+    if not verses_db.exists():
+        print(f"  ✗ verses.sqlite not found")
+        return False
+    
+    conn = sqlite3.connect(verses_db)
+    verse_count = conn.execute("SELECT COUNT(*) FROM verse_ranges").fetchone()[0]
+    conn.close()
+    print(f"  Found {verse_count:,} verses")
+    
+    quantizer = Quantizer(quantization)
+    db, quantizer, existing = prepare_vector_db(output_db, f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS verse_vectors USING vec0(
+            {quantizer.vector_columns(dims)},
             +book TEXT,
             +chapter INTEGER,
             +verse INTEGER
         )
-    ''')
+    ''', quantizer, vector_db_metadata(encoder, dims, [verses_db, nodes_db, niv_db]), incremental)
     
-    print("  Inserting embeddings...")
-    for emb, (book, chapter, verse_num) in tqdm(zip(embeddings_int8, metadata), total=len(metadata), desc="  "):
-        cursor.execute(
-            "INSERT INTO verse_vectors(embedding, book, chapter, verse) VALUES (vec_int8(?), ?, ?, ?)",
-            [emb.tobytes(), book, chapter, verse_num]
-        )
+    rows = (
+        (f"{book} {chapter}:{verse_num}", text, (book, chapter, verse_num))
+        for book, chapter, verse_num, text in iter_verse_texts(verses_db, nodes_db, niv_db)
+        if text
+    )
     
-    db.close()
-    verses_conn.close()
-    if nodes_conn:
-        nodes_conn.close()
-    if niv_conn:
-        niv_conn.close()
+    print("  Encoding and inserting verses...")
+    try:
+        stats = encode_and_write(
+            encoder, rows, db, "verse_vectors", ["book", "chapter", "verse"],
+            quantizer, existing.get("verse_vectors"), total=verse_count,
+        )
+    finally:
+        db.close()
     
-    print(f"  ✓ Created {len(texts):,} verse embeddings")
+    print(f"  ✓ Created {stats} verse embeddings")
     return True
 
 
-def create_concept_embeddings(encoder, dims: int, emb_dir: Path):
-    """Create concept embeddings from concepts.sqlite."""
+def create_concept_embeddings(encoder, dims: int, emb_dir: Path, quantization: str = DEFAULT_QUANTIZATION,
+                              incremental: bool = False):
+    """
+    Create concept embeddings from concepts.sqlite.
+    
+    concept_vectors holds one vector per concept for the combined stem,
+    gloss, categorization and examples text. The CONCEPT_FIELDS tables hold
+    separate stem-only, gloss and examples vectors (concepts with an empty
+    field have no row there) for fused word-level lookups (concept_fields.py).
+    """
     print("\n[2/3] Creating concept embeddings...")
     
     concepts_db = DB_DIR / "concepts.sqlite"
@@ -301,71 +636,179 @@ def create_concept_embeddings(encoder, dims: int, emb_dir: Path):
         print(f"  ✗ concepts.sqlite not found")
         return False
     
-    if output_db.exists():
-        output_db.unlink()
-    
-    # Get concepts
     conn = sqlite3.connect(concepts_db)
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id, stem, gloss, categorization, curated_examples 
-        FROM concepts
-    """)
-    concepts = cursor.fetchall()
-    conn.close()
+    concept_count = conn.execute("SELECT COUNT(*) FROM concepts").fetchone()[0]
+    print(f"  Found {concept_count:,} concepts")
     
-    print(f"  Found {len(concepts):,} concepts")
+    quantizer = Quantizer(quantization)
+    create_sql = "".join(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING vec0(
+            {quantizer.vector_columns(dims)},
+            +concept_id INTEGER,
+            +stem TEXT
+        );
+    ''' for table in ["concept_vectors", *CONCEPT_FIELDS.values()])
+    db, quantizer, existing = prepare_vector_db(
+        output_db, create_sql, quantizer, vector_db_metadata(encoder, dims, [concepts_db]), incremental
+    )
     
-    # Build text for each concept
-    texts = []
-    metadata = []
+    def concept_rows(text_fn):
+        for cid, stem, gloss, cat, examples in conn.execute("""
+            SELECT id, stem, gloss, categorization, curated_examples 
+            FROM concepts
+        """):
+            if (text := text_fn(stem, gloss, cat, examples)):
+                yield str(cid), text, (cid, stem)
     
-    for cid, stem, gloss, cat, examples in concepts:
-        text = concat_fields(stem, gloss, cat, examples)
-        if text:
-            texts.append(text)
-            metadata.append((cid, stem))
+    try:
+        print("  Encoding and inserting concepts...")
+        stats = encode_and_write(
+            encoder, concept_rows(lambda stem, gloss, cat, examples: concat_fields(stem, gloss, cat, examples)),
+            db, "concept_vectors", ["concept_id", "stem"],
+            quantizer, existing.get("concept_vectors"), total=concept_count,
+        )
+        print(f"  ✓ Created {stats} concept embeddings")
+        
+        field_texts = {
+            "stem": lambda stem, gloss, cat, examples: concat_fields(stem),
+            "gloss": lambda stem, gloss, cat, examples: concat_fields(gloss),
+            "examples": lambda stem, gloss, cat, examples: concat_fields(examples),
+        }
+        for field, table in CONCEPT_FIELDS.items():
+            print(f"  Encoding and inserting {field} vectors...")
+            stats = encode_and_write(
+                encoder, concept_rows(field_texts[field]), db, table, ["concept_id", "stem"],
+                quantizer, existing.get(table), total=concept_count,
+            )
+            print(f"  ✓ Created {stats} {field} embeddings")
+    finally:
+        db.close()
+        conn.close()
     
-    print(f"  Encoding {len(texts):,} concepts...")
-    embeddings = encoder.encode(texts)
-    embeddings_int8 = float32_to_int8(embeddings)
+    return True
+
+
+def parse_strongs_file(filepath: Path) -> Optional[Tuple[str, dict]]:
+    """(text, entry) for one Strong's YAML file, or None if it is unreadable or empty."""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = yaml.load(f, Loader=YAML_LOADER)
+        
+        # Build text
+        parts = [
+            data.get('strongs_number', ''),
+            data.get('lemma', ''),
+            data.get('transliteration', ''),
+            data.get('definition', ''),
+            data.get('derivation', ''),
+            data.get('kjv_usage', ''),
+        ]
+        
+        ext = data.get('extended_definition', {})
+        if ext:
+            parts.extend([
+                ext.get('gloss', ''),
+                strip_html(ext.get('definition', '')),
+            ])
+        
+        etym = data.get('etymology', {})
+        if etym:
+            parts.append(strip_html(etym.get('lsj_definition', '')))
+        
+        text = concat_fields(*parts)
+        if not text:
+            return None
+        return text, {
+            'strongs_number': data.get('strongs_number', ''),
+            'language': data.get('language', ''),
+            'lemma': data.get('lemma', ''),
+            'definition': data.get('definition', ''),
+            'derivation': data.get('derivation', '')
+        }
+    except Exception:
+        return None
+
+
+def read_strongs_snapshot(path: Path) -> dict:
+    """{file path: ((mtime_ns, size), parse_strongs_file result)} from a previous run."""
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return {}
+    if snapshot.get('version') != STRONGS_SNAPSHOT_VERSION:
+        return {}
+    return snapshot['files']
+
+
+def write_strongs_snapshot(path: Path, files: dict):
+    """Write the snapshot atomically, so an interrupted run never leaves a truncated file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'version': STRONGS_SNAPSHOT_VERSION, 'files': files}, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_strongs_entries(yaml_files: List[Path], workers: int = 1,
+                         snapshot_path: Optional[Path] = STRONGS_SNAPSHOT) -> List[Tuple[str, dict]]:
+    """
+    (text, entry) for each readable Strong's YAML file, in yaml_files order.
     
-    # Create output database
-    print("  Creating vector database...")
-    db = apsw.Connection(str(output_db))
-    db.enable_load_extension(True)
-    sqlite_vec.load(db)
-    db.enable_load_extension(False)
+    Parsed entries are kept in a pickle snapshot keyed by each file's path,
+    mtime and size, so later runs only parse new or modified files (none,
+    usually). Those are parsed in a pool of workers processes when there
+    are at least YAML_POOL_MIN_FILES of them. snapshot_path=None parses
+    everything.
+    """
+    snapshot = read_strongs_snapshot(snapshot_path) if snapshot_path else {}
     
-    cursor = db.cursor()
-    cursor.execute(f'''
-        CREATE VIRTUAL TABLE concept_vectors USING vec0(
-            embedding int8[{dims}],
-            +concept_id INTEGER,
-            +stem TEXT
-        )
-    ''')
+    files = {}
+    to_parse = []
+    for filepath in yaml_files:
+        stat = filepath.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = snapshot.get(str(filepath))
+        if cached is not None and cached[0] == stamp:
+            files[str(filepath)] = cached
+        else:
+            files[str(filepath)] = (stamp, None)
+            to_parse.append(filepath)
     
-    for emb, (cid, stem) in zip(embeddings_int8, metadata):
-        cursor.execute(
-            "INSERT INTO concept_vectors(embedding, concept_id, stem) VALUES (vec_int8(?), ?, ?)",
-            [emb.tobytes(), cid, stem]
-        )
+    if to_parse:
+        print(f"  Parsing {len(to_parse):,} YAML files ({len(yaml_files) - len(to_parse):,} from snapshot)")
+        if workers > 1 and len(to_parse) >= YAML_POOL_MIN_FILES:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                parsed = list(pool.map(parse_strongs_file, to_parse, chunksize=YAML_PARSE_CHUNK))
+        else:
+            parsed = [parse_strongs_file(filepath) for filepath in tqdm(to_parse, desc="  ", unit="file")]
+        for filepath, result in zip(to_parse, parsed):
+            files[str(filepath)] = (files[str(filepath)][0], result)
+    else:
+        print(f"  All {len(yaml_files):,} YAML files unchanged, using snapshot")
     
-    db.close()
-    print(f"  ✓ Created {len(texts):,} concept embeddings")
-    return True
+    if snapshot_path and (to_parse or len(snapshot) != len(files)):
+        write_strongs_snapshot(snapshot_path, files)
+    
+    return [result for _, result in files.values() if result is not None]
 
 
-def create_strongs_embeddings(encoder, dims: int, emb_dir: Path, strongs_dir: Optional[Path] = None):
+def create_strongs_embeddings(encoder, dims: int, emb_dir: Path, strongs_dir: Optional[Path] = None,
+                              quantization: str = DEFAULT_QUANTIZATION, incremental: bool = False,
+                              yaml_workers: int = 1, snapshot_path: Optional[Path] = STRONGS_SNAPSHOT):
     """Create Strong's embeddings from YAML files."""
     print("\n[3/3] Creating Strong's embeddings...")
     
     strongs_db = DB_DIR / "strongs.sqlite"
     output_db = emb_dir / "strongs_vectors.sqlite"
-    
-    if output_db.exists():
-        output_db.unlink()
+    quantizer = Quantizer(quantization)
+    create_sql = f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS strongs_vectors USING vec0(
+            {quantizer.vector_columns(dims)},
+            +strongs_number TEXT
+        )
+    '''
     
     # Try to find Strong's YAML files
     if strongs_dir is None:
@@ -382,78 +825,34 @@ def create_strongs_embeddings(encoder, dims: int, emb_dir: Path, strongs_dir: Op
     if strongs_dir is None or not strongs_dir.exists():
         print("  ⚠ Strong's YAML directory not found")
         print("    Creating empty strongs_vectors.sqlite")
-        
-        db = apsw.Connection(str(output_db))
-        db.enable_load_extension(True)
-        sqlite_vec.load(db)
-        db.enable_load_extension(False)
-        
-        cursor = db.cursor()
-        cursor.execute(f'''
-            CREATE VIRTUAL TABLE strongs_vectors USING vec0(
-                embedding int8[{dims}],
-                +strongs_number TEXT
-            )
-        ''')
-        db.close()
+        open_vector_db(output_db, create_sql, quantizer, vector_db_metadata(encoder, dims, [])).close()
         return True
     
     if yaml is None:
         print("  ⚠ PyYAML not installed, skipping Strong's")
+        if output_db.exists():
+            output_db.unlink()
         return False
     
     # Find YAML files
     yaml_files = list(strongs_dir.glob("*/[GH]*-strongs.strongs.yaml"))
     print(f"  Found {len(yaml_files):,} Strong's YAML files")
     
-    # Load and process
-    texts = []
-    metadata = []
-    strongs_data = []
+    entries = load_strongs_entries(yaml_files, yaml_workers, snapshot_path)
+    strongs_data = [entry for _, entry in entries]
+    rows = ((entry['strongs_number'], text, (entry['strongs_number'],)) for text, entry in entries)
     
-    for filepath in yaml_files:
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-            
-            # Build text
-            parts = [
-                data.get('strongs_number', ''),
-                data.get('lemma', ''),
-                data.get('transliteration', ''),
-                data.get('definition', ''),
-                data.get('derivation', ''),
-                data.get('kjv_usage', ''),
-            ]
-            
-            ext = data.get('extended_definition', {})
-            if ext:
-                parts.extend([
-                    ext.get('gloss', ''),
-                    strip_html(ext.get('definition', '')),
-                ])
-            
-            etym = data.get('etymology', {})
-            if etym:
-                parts.append(strip_html(etym.get('lsj_definition', '')))
-            
-            text = concat_fields(*parts)
-            if text:
-                texts.append(text)
-                metadata.append(data.get('strongs_number', ''))
-                strongs_data.append({
-                    'strongs_number': data.get('strongs_number', ''),
-                    'language': data.get('language', ''),
-                    'lemma': data.get('lemma', ''),
-                    'definition': data.get('definition', ''),
-                    'derivation': data.get('derivation', '')
-                })
-        except Exception:
-            continue
-    
-    print(f"  Encoding {len(texts):,} Strong's entries...")
-    embeddings = encoder.encode(texts)
-    embeddings_int8 = float32_to_int8(embeddings)
+    db, quantizer, existing = prepare_vector_db(
+        output_db, create_sql, quantizer, vector_db_metadata(encoder, dims, sorted(yaml_files)), incremental
+    )
+    print("  Encoding and inserting Strong's entries...")
+    try:
+        stats = encode_and_write(
+            encoder, rows, db, "strongs_vectors", ["strongs_number"],
+            quantizer, existing.get("strongs_vectors"), total=len(entries),
+        )
+    finally:
+        db.close()
     
     # Update strongs.sqlite with data
     if strongs_db.exists():
@@ -469,29 +868,7 @@ def create_strongs_embeddings(encoder, dims: int, emb_dir: Path, strongs_dir: Op
         strongs_conn.close()
         print(f"  ✓ Updated strongs.sqlite with {len(strongs_data):,} entries")
     
-    # Create vector database
-    print("  Creating vector database...")
-    db = apsw.Connection(str(output_db))
-    db.enable_load_extension(True)
-    sqlite_vec.load(db)
-    db.enable_load_extension(False)
-    
-    cursor = db.cursor()
-    cursor.execute(f'''
-        CREATE VIRTUAL TABLE strongs_vectors USING vec0(
-            embedding int8[{dims}],
-            +strongs_number TEXT
-        )
-    ''')
-    
-    for emb, strongs_num in zip(embeddings_int8, metadata):
-        cursor.execute(
-            "INSERT INTO strongs_vectors(embedding, strongs_number) VALUES (vec_int8(?), ?)",
-            [emb.tobytes(), strongs_num]
-        )
-    
-    db.close()
-    print(f"  ✓ Created {len(texts):,} Strong's embeddings")
+    print(f"  ✓ Created {stats} Strong's embeddings")
     return True
 
 
@@ -508,6 +885,25 @@ Examples:
     # OpenAI (requires OPENAI_API_KEY)
     python scripts/create_embeddings.py --provider openai
     python scripts/create_embeddings.py --provider openai --dims 384
+    
+    # Keep another model's vectors side by side (the demo reads model/dims from the databases)
+    python scripts/create_embeddings.py --provider openai --dims 384 --emb-dir databases/embeddings/openai-384
+    
+    # Calibrated int8 scale, or binary vectors (8x less to scan, int8 copy kept for rescoring)
+    python scripts/create_embeddings.py --quantization int8-global
+    python scripts/create_embeddings.py --quantization binary
+    
+    # CPU-only machine: 8 encoder processes
+    python scripts/create_embeddings.py --workers 8
+    
+    # Any OpenAI-compatible endpoint, more requests in flight
+    python scripts/create_embeddings.py --provider openai --base-url http://localhost:8000/v1 --max-in-flight 8
+    
+    # Re-encode everything instead of reusing databases/embeddings/cache.sqlite
+    python scripts/create_embeddings.py --no-cache
+    
+    # After an ontology edit: only re-embed added/changed rows, drop removed ones
+    python scripts/create_embeddings.py --incremental
         """
     )
     parser.add_argument("--provider", choices=["local", "openai"], default="local",
@@ -516,6 +912,27 @@ Examples:
     parser.add_argument("--dims", type=int, help="Embedding dimensions (for OpenAI, can reduce)")
     parser.add_argument("--skip-strongs", action="store_true", help="Skip Strong's embeddings")
     parser.add_argument("--strongs-dir", type=Path, help="Path to Strong's YAML directory")
+    parser.add_argument("--yaml-workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes parsing Strong's YAML files not in the snapshot (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Encode everything, bypassing the embedding cache")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Update existing vector databases in place: encode only new or changed "
+                             "rows and delete removed ones")
+    parser.add_argument("--emb-dir", type=Path,
+                        help="Output directory (default: databases/embeddings/<provider>)")
+    parser.add_argument("--quantization", choices=QUANTIZATION_MODES, default=DEFAULT_QUANTIZATION,
+                        help="Vector storage: legacy int8 (x127), calibrated int8-global / int8-dim, "
+                             "or binary with int8 rescoring (default: int8)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Local provider on CPU: encode in N processes (default: 1)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"Local provider: texts per model batch (default: {BATCH_SIZE})")
+    parser.add_argument("--base-url", help="OpenAI-compatible API base URL (default: $OPENAI_BASE_URL or api.openai.com)")
+    parser.add_argument("--max-in-flight", type=int, default=4,
+                        help="Concurrent OpenAI requests (default: 4)")
+    parser.add_argument("--batch-tokens", type=int, default=20000,
+                        help="Estimated token budget per OpenAI request (default: 20000)")
     args = parser.parse_args()
     
     # Get provider config
@@ -524,7 +941,7 @@ Examples:
     dims = args.dims or provider_config["default_dims"]
     
     # Output directory based on provider
-    emb_dir = EMB_BASE_DIR / args.provider
+    emb_dir = args.emb_dir or EMB_BASE_DIR / args.provider
     
     print("=" * 60)
     print("TBTA Embedding Generator")
@@ -532,6 +949,9 @@ Examples:
     print(f"Provider: {args.provider}")
     print(f"Model: {model_name}")
     print(f"Dimensions: {dims}")
+    print(f"Quantization: {args.quantization}")
+    if args.incremental:
+        print("Mode: incremental")
     print(f"Output: {emb_dir}/")
     
     # Create output directory
@@ -539,22 +959,37 @@ Examples:
     
     # Load encoder
     print("\nLoading encoder...")
-    encoder = get_encoder(args.provider, model_name, dims)
+    if args.provider == "openai":
+        options = dict(base_url=args.base_url, max_in_flight=args.max_in_flight,
+                       max_batch_tokens=args.batch_tokens)
+    else:
+        options = dict(workers=args.workers, batch_size=args.batch_size)
+    encoder = get_encoder(args.provider, model_name, dims, use_cache=not args.no_cache, **options)
     dims = encoder.dims  # Get actual dims from encoder
     print(f"  ✓ Encoder ready")
+    if encoder.cache is not None:
+        print(f"  Cache: {encoder.cache.path}")
     
     # Create embeddings (pass encoder and output dir)
-    create_verse_embeddings(encoder, dims, emb_dir)
-    create_concept_embeddings(encoder, dims, emb_dir)
+    create_verse_embeddings(encoder, dims, emb_dir, args.quantization, args.incremental)
+    create_concept_embeddings(encoder, dims, emb_dir, args.quantization, args.incremental)
     
     if not args.skip_strongs:
-        create_strongs_embeddings(encoder, dims, emb_dir, args.strongs_dir)
+        create_strongs_embeddings(encoder, dims, emb_dir, args.strongs_dir, args.quantization,
+                                  args.incremental, args.yaml_workers)
+    encoder.close()
     
     # Summary
     print("\n" + "=" * 60)
     print("EMBEDDING GENERATION COMPLETE")
     print("=" * 60)
     
+    if encoder.cache is not None:
+        print(f"\nEmbedding cache: {encoder.cache.summary()}")
+        encoder.cache.close()
+    if args.provider == "openai" and encoder.client.retries:
+        print(f"OpenAI requests retried: {encoder.client.retries:,}")
+    
     print(f"\nCreated in {emb_dir}/:")
     for name in ["verse_vectors.sqlite", "concept_vectors.sqlite", "strongs_vectors.sqlite"]:
         path = emb_dir / name
@@ -9,6 +9,7 @@ Usage:
     python scripts/demo_embeddings.py experiment         # Compare stem vs stem+gloss
     python scripts/demo_embeddings.py match              # Concept-to-Strong's matching
     python scripts/demo_embeddings.py search "phrase"    # User text to concept search
+    python scripts/demo_embeddings.py verses "phrase"    # User text to similar verses
 
 Requirements:
     pip install sentence-transformers numpy
@@ -16,6 +17,7 @@ Requirements:
 
 import argparse
 import json
+import re
 import sqlite3
 import sys
 from pathlib import Path
@@ -55,10 +57,23 @@ try:
 except ImportError:
     HAS_SQLITE_VEC = False
 
-# Global embedding directory and provider (set by --provider arg)
+from concept_fields import FusedConceptIndex, has_field_vectors
+from embedding_cache import EmbeddingCache
+from embedding_metadata import VECTOR_DBS, check_compatible, read_metadata, read_metadata_file
+from quantization import Quantizer
+from vector_backend import BACKENDS, DEFAULT_BACKEND, IVFBackend, open_backend, top_k
+
+# Global embedding directory and provider (set by --provider / --emb-dir)
 EMB_DIR: Optional[Path] = None
 CURRENT_PROVIDER: str = DEFAULT_PROVIDER
 
+# Shared with create_embeddings.py; disabled by --no-cache
+USE_CACHE = True
+embedding_cache: Optional[EmbeddingCache] = None
+
+# KNN backend for search, verses and match queries (set by --backend, see vector_backend.py)
+SEARCH_BACKEND = DEFAULT_BACKEND
+
 def get_emb_dir() -> Path:
     """Get the current embedding directory."""
     global EMB_DIR
@@ -74,6 +89,41 @@ def set_provider(provider: str):
     if not EMB_DIR.exists():
         print(f"  Note: {EMB_DIR} does not exist yet")
         print(f"  Run: python scripts/create_embeddings.py --provider {provider}")
+    adopt_metadata()
+
+def set_emb_dir(emb_dir: Path, provider: str = DEFAULT_PROVIDER):
+    """Use a specific embedding directory; provider/model/dims come from its metadata."""
+    global EMB_DIR, CURRENT_PROVIDER
+    EMB_DIR = emb_dir
+    CURRENT_PROVIDER = provider  # Only used if the databases have no metadata
+    if not adopt_metadata():
+        print(f"  Note: no embedding metadata in {emb_dir}, using {CURRENT_PROVIDER} defaults")
+
+def adopt_metadata() -> bool:
+    """Switch the encoder to the provider/model/dims the current embedding directory was built with."""
+    global CURRENT_PROVIDER, MODEL_NAME, OPENAI_MODEL, OPENAI_DIMS
+    for name in VECTOR_DBS:
+        metadata = read_metadata_file(get_emb_dir() / name)
+        if metadata.get("provider"):
+            break
+    else:
+        return False
+    
+    CURRENT_PROVIDER = metadata["provider"]
+    if CURRENT_PROVIDER == "openai":
+        OPENAI_MODEL = metadata["model"]
+        OPENAI_DIMS = int(metadata["dims"])
+    else:
+        MODEL_NAME = metadata["model"]
+    print(f"  Embeddings: {get_emb_dir()} ({CURRENT_PROVIDER}, {metadata['model']}, "
+          f"{metadata['dims']} dims, {metadata.get('quantization', 'int8')})")
+    return True
+
+def encoder_signature() -> Tuple[str, str, int]:
+    """(provider, model, dims) of the encoder queries are embedded with."""
+    if CURRENT_PROVIDER == "openai":
+        return "openai", OPENAI_MODEL, OPENAI_DIMS
+    return "local", MODEL_NAME, get_model().get_sentence_embedding_dimension()
 
 
 def get_model() -> SentenceTransformer:
@@ -114,8 +164,27 @@ def get_openai_client():
     return openai_client
 
 
+def get_cache() -> Optional[EmbeddingCache]:
+    """Lazy-open the embedding cache for the current provider/model."""
+    global embedding_cache
+    if not USE_CACHE:
+        return None
+    signature = encoder_signature()
+    if embedding_cache is None or (embedding_cache.provider, embedding_cache.model, embedding_cache.dims) != signature:
+        embedding_cache = EmbeddingCache(*signature)
+    return embedding_cache
+
+
 def encode(texts: List[str]) -> np.ndarray:
     """Encode texts to normalized embeddings using current provider."""
+    cache = get_cache()
+    if cache is not None:
+        return cache.encode(texts, encode_uncached)
+    return encode_uncached(texts)
+
+
+def encode_uncached(texts: List[str]) -> np.ndarray:
+    """Encode texts with the current provider, bypassing the cache."""
     if CURRENT_PROVIDER == "openai":
         return encode_openai(texts)
     # Local provider
@@ -145,36 +214,24 @@ def encode_openai(texts: List[str]) -> np.ndarray:
     return embeddings
 
 
-def encode_to_int8(texts: List[str]) -> np.ndarray:
-    """Encode texts and quantize to int8 for database queries."""
-    embeddings = encode(texts)
-    return np.clip(embeddings * 127, -127, 127).astype(np.int8)
-
-
-def search_vectors(db_path: Path, table: str, query_int8: np.ndarray, limit: int = 10) -> list:
+def open_vectors(db_path: Path):
     """
-    Search pre-computed vectors using sqlite-vec.
-    Returns list of (rowid, distance, metadata...) tuples.
+    Open a pre-computed vector database and its quantizer.
+    Exits if its metadata shows a different provider, model or dimensionality.
     """
-    if not HAS_SQLITE_VEC:
-        raise RuntimeError("sqlite-vec not installed")
-    
     db = apsw.Connection(str(db_path))
     db.enable_load_extension(True)
     sqlite_vec.load(db)
     db.enable_load_extension(False)
     
-    cursor = db.cursor()
-    results = list(cursor.execute(f"""
-        SELECT rowid, distance, *
-        FROM {table}
-        WHERE embedding MATCH vec_int8(?)
-        ORDER BY distance
-        LIMIT ?
-    """, [query_int8.tobytes(), limit]))
-    
-    db.close()
-    return results
+    metadata = read_metadata(db)
+    problem = check_compatible(metadata, *encoder_signature())
+    if problem:
+        db.close()
+        print(f"✗ {db_path} was {problem}")
+        print("  Regenerate it with create_embeddings.py, or pass --emb-dir for a matching directory")
+        sys.exit(1)
+    return db, Quantizer.from_metadata(metadata)
 
 
 def has_precomputed_embeddings() -> bool:
@@ -197,6 +254,262 @@ def cosine_distance(a: np.ndarray, b: np.ndarray) -> float:
     return 1.0 - cosine_similarity(a, b)
 
 
+# =============================================================================
+# QUERIES - Shared by the demos below and search_server.py
+# =============================================================================
+
+# Stopwords - function words that don't have semantic meaning
+STOPWORDS = {
+    "the", "a", "an", "is", "are", "was", "were", "be", "been", "being",
+    "have", "has", "had", "do", "does", "did", "will", "would", "could",
+    "should", "may", "might", "must", "shall", "can", "need", "dare",
+    "to", "of", "in", "for", "on", "with", "at", "by", "from", "as",
+    "into", "through", "during", "before", "after", "above", "below",
+    "between", "under", "again", "further", "then", "once", "here",
+    "there", "when", "where", "why", "how", "all", "each", "every",
+    "both", "few", "more", "most", "other", "some", "such", "no", "nor",
+    "not", "only", "own", "same", "so", "than", "too", "very", "just",
+    "but", "and", "or", "if", "because", "until", "while", "that",
+    "which", "who", "whom", "this", "these", "those", "am", "it", "its",
+    "us", "we", "our", "you", "your", "he", "him", "his", "she", "her",
+    "they", "them", "their", "what", "any", "also"
+}
+
+# Distance thresholds for analyze - above these, a match is unreliable
+GOOD_MATCH_THRESHOLD = 105
+WEAK_MATCH_THRESHOLD = 115
+
+# Loaded once per process (search_server.py keeps them warm between requests)
+_concept_lookup: Optional[Dict[int, dict]] = None
+_strongs_lookup: Optional[Dict[str, dict]] = None
+_valid_concept_ids: Optional[set] = None
+_vector_dbs: Dict[Path, tuple] = {}
+_concept_indexes: Dict[Path, FusedConceptIndex] = {}
+_backends: Dict[tuple, object] = {}
+
+
+def get_concept_lookup() -> Dict[int, dict]:
+    """concept id -> stem, sense, gloss and Strong's mappings, for every concept."""
+    global _concept_lookup
+    if _concept_lookup is None:
+        conn = sqlite3.connect(DB_DIR / "concepts.sqlite")
+        _concept_lookup = {}
+        for cid, stem, sense, gloss, strongs in conn.execute(
+            "SELECT id, stem, sense, gloss, strongs_mappings FROM concepts"
+        ):
+            _concept_lookup[cid] = {
+                "stem": stem, "sense": sense, "gloss": gloss,
+                "strongs": json.loads(strongs) if strongs else []
+            }
+        conn.close()
+    return _concept_lookup
+
+
+def get_strongs_lookup() -> Dict[str, dict]:
+    """Strong's number -> language, lemma and definition (empty without strongs.sqlite)."""
+    global _strongs_lookup
+    if _strongs_lookup is None:
+        _strongs_lookup = {}
+        strongs_db = DB_DIR / "strongs.sqlite"
+        if strongs_db.exists():
+            conn = sqlite3.connect(strongs_db)
+            for sid, lang, lemma, defn in conn.execute(
+                "SELECT strongs_number, language, lemma, definition FROM strongs"
+            ):
+                _strongs_lookup[sid] = {"lang": lang, "lemma": lemma, "definition": defn}
+            conn.close()
+    return _strongs_lookup
+
+
+def get_valid_concept_ids() -> set:
+    """Ids of concepts analyze may suggest: those with a gloss not marked DELETE."""
+    global _valid_concept_ids
+    if _valid_concept_ids is None:
+        _valid_concept_ids = {
+            cid for cid, c in get_concept_lookup().items()
+            if c["gloss"] is not None and "delete" not in c["gloss"].lower()
+        }
+    return _valid_concept_ids
+
+
+def get_vectors(name: str):
+    """(db, quantizer) for a vector database in the embedding directory, opened once."""
+    db_path = get_emb_dir() / name
+    if db_path not in _vector_dbs:
+        _vector_dbs[db_path] = open_vectors(db_path)
+    return _vector_dbs[db_path]
+
+
+def get_backend(name: str, table: str, columns: List[str]):
+    """SEARCH_BACKEND over a table of a vector database in the embedding directory, opened once."""
+    db_path = get_emb_dir() / name
+    key = (db_path, table, tuple(columns), SEARCH_BACKEND)
+    if key not in _backends:
+        db, quantizer = get_vectors(name)
+        _backends[key] = open_backend(SEARCH_BACKEND, db, table, columns, quantizer, db_path)
+    return _backends[key]
+
+
+def get_concept_index() -> FusedConceptIndex:
+    """
+    In-memory concept index for word lookups: fused stem/gloss/examples
+    vectors, or the blended concept_vectors if the databases predate them.
+    """
+    db_path = get_emb_dir() / "concept_vectors.sqlite"
+    if db_path not in _concept_indexes:
+        db, quantizer = get_vectors("concept_vectors.sqlite")
+        tables = None if has_field_vectors(db) else {"concept": "concept_vectors"}
+        _concept_indexes[db_path] = FusedConceptIndex(db, quantizer, tables=tables)
+    return _concept_indexes[db_path]
+
+
+def search_concepts(query: str, limit: int = 10, strongs_limit: int = 5) -> dict:
+    """Concepts and Strong's entries closest to query, from the pre-computed vectors."""
+    # Encode query (quantized per table by the backend)
+    query_embedding = encode([query])[0]
+    concept_lookup = get_concept_lookup()
+    
+    backend = get_backend("concept_vectors.sqlite", "concept_vectors", ["concept_id", "stem"])
+    concepts = []
+    for cid, stem, dist in backend.search(query_embedding, limit)[0]:
+        c = concept_lookup.get(cid, {"sense": "?", "gloss": "", "strongs": []})
+        concepts.append({
+            "concept_id": cid, "stem": stem, "sense": c["sense"],
+            "gloss": c["gloss"], "strongs": c["strongs"], "distance": dist,
+        })
+    
+    strongs = []
+    strongs_lookup = get_strongs_lookup()
+    if (get_emb_dir() / "strongs_vectors.sqlite").exists() and strongs_lookup:
+        backend = get_backend("strongs_vectors.sqlite", "strongs_vectors", ["strongs_number"])
+        for sid, dist in backend.search(query_embedding, strongs_limit)[0]:
+            s = strongs_lookup.get(sid, {"lang": "?", "lemma": "?", "definition": ""})
+            strongs.append({"strongs": sid, **s, "distance": dist})
+    
+    return {"query": query, "concepts": concepts, "strongs": strongs}
+
+
+def search_verses(query: str, limit: int = 10) -> dict:
+    """
+    Verses closest to query, from verse_vectors.sqlite.
+    
+    With the default auto backend a table this size is searched through its
+    IVF index (approximate; see vector_backend.py).
+    """
+    backend = get_backend("verse_vectors.sqlite", "verse_vectors", ["book", "chapter", "verse"])
+    niv_db = DB_DIR / "niv.sqlite"
+    conn = sqlite3.connect(niv_db) if niv_db.exists() else None
+    
+    verses = []
+    for book, chapter, verse, dist in backend.search(encode([query])[0], limit)[0]:
+        text = None
+        if conn is not None:
+            row = conn.execute(
+                "SELECT text FROM niv WHERE book = ? AND chapter = ? AND verse = ?", (book, chapter, verse)
+            ).fetchone()
+            text = row[0] if row else None
+        verses.append({
+            "reference": f"{book} {chapter}:{verse}", "book": book, "chapter": chapter, "verse": verse,
+            "text": text, "distance": dist,
+        })
+    if conn is not None:
+        conn.close()
+    return {"query": query, "verses": verses}
+
+
+def tokenize_verse(verse: str) -> List[Tuple[str, Optional[str]]]:
+    """(word, reason it is skipped or None) for each word of a verse."""
+    tokens = []
+    for word in re.findall(r"[A-Za-z]+(?:'[a-z]+)?", verse):
+        if len(word) <= 2:
+            tokens.append((word, "too short"))
+        elif word.lower() in STOPWORDS:
+            tokens.append((word, "function word"))
+        else:
+            tokens.append((word, None))
+    return tokens
+
+
+def analyze_verse(verse: str, top_n: int = 3) -> List[dict]:
+    """
+    Match each content word of a verse to concepts, from the pre-computed vectors.
+    
+    Returns one dict per word: word, skipped (reason or None) and matches
+    (closest first, concepts marked DELETE excluded). The distinct content
+    words are encoded in one batch and matched in one pass over the
+    in-memory concept index (get_concept_index), so a whole chapter costs
+    about as much as a verse.
+    """
+    concept_lookup = get_concept_lookup()
+    tokens = tokenize_verse(verse)
+    
+    words = list(dict.fromkeys(word.lower() for word, skipped in tokens if not skipped))
+    matches = {}
+    if words:
+        results = get_concept_index().search(encode(words), top_n, allowed=get_valid_concept_ids())
+        matches = dict(zip(words, results))
+    
+    analysis = []
+    for word, skipped in tokens:
+        entry = {"word": word, "skipped": skipped, "matches": []}
+        analysis.append(entry)
+        if skipped:
+            continue
+        
+        word_lower = word.lower()
+        for cid, stem, dist in matches[word_lower]:
+            c = concept_lookup.get(cid, {"sense": "?", "gloss": "", "strongs": []})
+            entry["matches"].append({
+                "concept_id": cid, "stem": stem, "sense": c["sense"], "gloss": c["gloss"],
+                "strongs": c["strongs"], "distance": dist, "exact": stem.lower() == word_lower,
+            })
+    return analysis
+
+
+def sample_unmapped_concepts(limit: int = 50) -> List[tuple]:
+    """Random (id, stem, sense, gloss, brief_gloss) concepts without Strong's mappings."""
+    conn = sqlite3.connect(DB_DIR / "concepts.sqlite")
+    unmapped = conn.execute("""
+        SELECT id, stem, sense, gloss, brief_gloss 
+        FROM concepts 
+        WHERE (strongs_mappings IS NULL OR strongs_mappings = '[]')
+          AND gloss IS NOT NULL
+          AND gloss != ''
+          AND stem NOT GLOB '[0-9]*'
+          AND stem NOT GLOB '.[0-9]*'
+          AND LENGTH(stem) > 2
+        ORDER BY RANDOM()
+        LIMIT ?
+    """, (limit,)).fetchall()
+    conn.close()
+    return unmapped
+
+
+def match_concepts(concepts: List[tuple], per_concept: int = 3) -> List[dict]:
+    """Strong's suggestions for (id, stem, sense, gloss, brief_gloss) concepts, from the pre-computed vectors."""
+    if not concepts:
+        return []
+    strongs_lookup = get_strongs_lookup()
+    backend = get_backend("strongs_vectors.sqlite", "strongs_vectors", ["strongs_number"])
+    
+    concept_embeddings = encode([f"{stem}: {gloss}" for _, stem, _, gloss, _ in concepts])
+    
+    results = []
+    for (cid, stem, sense, gloss, brief), matches in zip(concepts, backend.search(concept_embeddings, per_concept)):
+        results.append({
+            "concept_id": cid,
+            "stem": stem,
+            "sense": sense,
+            "gloss": gloss,
+            "suggestions": [
+                {"strongs": sid, **strongs_lookup.get(sid, {"lang": "?", "lemma": "?", "definition": ""}),
+                 "distance": dist}
+                for sid, dist in matches
+            ],
+        })
+    return results
+
+
 # =============================================================================
 # DEMO 1: TEACH - What Are Embeddings?
 # =============================================================================
@@ -711,32 +1024,9 @@ def demo_match():
     else:
         print("\n⚠ No pre-computed embeddings. Run: python scripts/create_embeddings.py\n")
     
-    # Load concepts WITHOUT Strong's mappings
-    conn = sqlite3.connect(concepts_db)
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id, stem, sense, gloss, brief_gloss 
-        FROM concepts 
-        WHERE (strongs_mappings IS NULL OR strongs_mappings = '[]')
-          AND gloss IS NOT NULL
-          AND gloss != ''
-          AND stem NOT GLOB '[0-9]*'
-          AND stem NOT GLOB '.[0-9]*'
-          AND LENGTH(stem) > 2
-        ORDER BY RANDOM()
-        LIMIT 50
-    """)
-    unmapped = cursor.fetchall()
-    conn.close()
-    
-    # Load Strong's metadata
-    conn = sqlite3.connect(strongs_db)
-    cursor = conn.cursor()
-    cursor.execute("SELECT strongs_number, language, lemma, definition FROM strongs")
-    strongs_lookup = {}
-    for sid, lang, lemma, defn in cursor.fetchall():
-        strongs_lookup[sid] = {"lang": lang, "lemma": lemma, "definition": defn}
-    conn.close()
+    # Load concepts WITHOUT Strong's mappings, and Strong's metadata
+    unmapped = sample_unmapped_concepts()
+    strongs_lookup = get_strongs_lookup()
     
     print(f"Found {len(unmapped)} concepts without Strong's mappings")
     print(f"Matching against {len(strongs_lookup)} Strong's entries\n")
@@ -749,38 +1039,13 @@ def demo_match():
     
     if use_precomputed:
         # Use pre-computed embeddings
-        db = apsw.Connection(str(strongs_vec_db))
-        db.enable_load_extension(True)
-        sqlite_vec.load(db)
+        results = match_concepts(unmapped[:20])
         
-        for cid, stem, sense, gloss, brief in unmapped[:20]:
-            # Encode just this concept
-            concept_text = f"{stem}: {gloss}"
-            concept_int8 = encode_to_int8([concept_text])[0]
-            
-            # Search Strong's vectors
-            matches = list(db.cursor().execute("""
-                SELECT strongs_number, distance
-                FROM strongs_vectors
-                WHERE embedding MATCH vec_int8(?)
-                ORDER BY distance
-                LIMIT 3
-            """, [concept_int8.tobytes()]))
-            
-            print(f"\n{stem} ({sense}): {(gloss or '')[:50]}...")
-            for sid, dist in matches:
-                s = strongs_lookup.get(sid, {"lang": "?", "lemma": "?", "definition": ""})
+        for r in results:
+            print(f"\n{r['stem']} ({r['sense']}): {(r['gloss'] or '')[:50]}...")
+            for s in r["suggestions"]:
                 lang_emoji = "🇮🇱" if s["lang"] == "hebrew" else "🇬🇷"
-                print(f"  {lang_emoji} {sid}: {s['lemma']} - {(s['definition'] or '')[:35]}... ({dist:.1f})")
-            
-            results.append({
-                "concept_id": cid,
-                "stem": stem,
-                "sense": sense,
-                "suggestions": [{"strongs": sid, "distance": dist} for sid, dist in matches]
-            })
-        
-        db.close()
+                print(f"  {lang_emoji} {s['strongs']}: {s['lemma']} - {(s['definition'] or '')[:35]}... ({s['distance']:.1f})")
     else:
         # Fall back to on-the-fly encoding
         strongs_data = []
@@ -798,10 +1063,12 @@ def demo_match():
         print("Encoding unmapped concepts...")
         concept_embeddings = encode(concept_texts)
         
-        for i, (cid, stem, sense, gloss, brief) in enumerate(unmapped[:20]):
-            distances = [cosine_distance(concept_embeddings[i], se) for se in strongs_embeddings]
-            sorted_idx = np.argsort(distances)
-            top3 = [(strongs_data[j], distances[j]) for j in sorted_idx[:3]]
+        # All concepts against all Strong's entries in one pass
+        shown = unmapped[:20]
+        indices, distances = top_k(concept_embeddings[:len(shown)], strongs_embeddings, 3)
+        
+        for (cid, stem, sense, gloss, brief), row_indices, row_distances in zip(shown, indices, distances):
+            top3 = [(strongs_data[j], float(dist)) for j, dist in zip(row_indices, row_distances)]
             
             print(f"\n{stem} ({sense}): {(gloss or '')[:50]}...")
             for data, dist in top3:
@@ -848,91 +1115,35 @@ def demo_search(query: str):
 
 def _search_with_precomputed(query: str):
     """Search using pre-computed sqlite-vec embeddings."""
-    concepts_db = DB_DIR / "concepts.sqlite"
-    strongs_db = DB_DIR / "strongs.sqlite"
-    concept_vec_db = get_emb_dir() / "concept_vectors.sqlite"
-    strongs_vec_db = get_emb_dir() / "strongs_vectors.sqlite"
-    
-    # Load concept metadata for display
-    conn = sqlite3.connect(concepts_db)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, stem, sense, gloss, strongs_mappings FROM concepts")
-    concept_lookup = {}
-    for cid, stem, sense, gloss, strongs in cursor.fetchall():
-        concept_lookup[cid] = {
-            "stem": stem, "sense": sense, "gloss": gloss,
-            "strongs": json.loads(strongs) if strongs else []
-        }
-    conn.close()
-    
-    # Load Strong's metadata
-    strongs_lookup = {}
-    if strongs_db.exists():
-        conn = sqlite3.connect(strongs_db)
-        cursor = conn.cursor()
-        cursor.execute("SELECT strongs_number, language, lemma, definition FROM strongs")
-        for sid, lang, lemma, defn in cursor.fetchall():
-            strongs_lookup[sid] = {"lang": lang, "lemma": lemma, "definition": defn}
-        conn.close()
-    
-    # Encode query to int8
     print("Encoding query...")
-    query_int8 = encode_to_int8([query])[0]
+    results = search_concepts(query, limit=10, strongs_limit=5)
     
     # Search concepts
     print("\n" + "-" * 70)
     print("CONCEPT MATCHES (from pre-computed embeddings)")
     print("-" * 70)
     
-    db = apsw.Connection(str(concept_vec_db))
-    db.enable_load_extension(True)
-    sqlite_vec.load(db)
-    
-    results = list(db.cursor().execute("""
-        SELECT concept_id, stem, distance
-        FROM concept_vectors
-        WHERE embedding MATCH vec_int8(?)
-        ORDER BY distance
-        LIMIT 10
-    """, [query_int8.tobytes()]))
-    db.close()
-    
     print(f"\nTop 10 concepts matching \"{query}\":\n")
-    for rank, (cid, stem, dist) in enumerate(results, 1):
-        c = concept_lookup.get(cid, {"sense": "?", "gloss": "", "strongs": []})
+    for rank, c in enumerate(results["concepts"], 1):
         strongs_str = ", ".join(c["strongs"][:3]) if c["strongs"] else "none"
-        print(f"  {rank:2}. {stem} ({c['sense']})")
+        print(f"  {rank:2}. {c['stem']} ({c['sense']})")
         print(f"      Gloss: {(c['gloss'] or '')[:50]}...")
         print(f"      Strong's: {strongs_str}")
-        print(f"      Distance: {dist:.3f}")
+        print(f"      Distance: {c['distance']:.3f}")
         print()
     
     # Search Strong's
-    if strongs_vec_db.exists() and strongs_lookup:
+    if results["strongs"]:
         print("-" * 70)
         print("STRONG'S MATCHES (from pre-computed embeddings)")
         print("-" * 70)
         
-        db = apsw.Connection(str(strongs_vec_db))
-        db.enable_load_extension(True)
-        sqlite_vec.load(db)
-        
-        results = list(db.cursor().execute("""
-            SELECT strongs_number, distance
-            FROM strongs_vectors
-            WHERE embedding MATCH vec_int8(?)
-            ORDER BY distance
-            LIMIT 5
-        """, [query_int8.tobytes()]))
-        db.close()
-        
         print(f"\nTop 5 Strong's entries matching \"{query}\":\n")
-        for sid, dist in results:
-            s = strongs_lookup.get(sid, {"lang": "?", "lemma": "?", "definition": ""})
+        for s in results["strongs"]:
             lang_emoji = "🇮🇱" if s["lang"] == "hebrew" else "🇬🇷"
-            print(f"  {lang_emoji} {sid}: {s['lemma']}")
+            print(f"  {lang_emoji} {s['strongs']}: {s['lemma']}")
             print(f"     {(s['definition'] or '')[:60]}...")
-            print(f"     Distance: {dist:.3f}")
+            print(f"     Distance: {s['distance']:.3f}")
             print()
 
 
@@ -976,13 +1187,11 @@ def _search_on_the_fly(query: str):
     print("-" * 70)
     
     query_embedding = encode([query])[0]
-    distances = [cosine_distance(query_embedding, ce) for ce in concept_embeddings]
-    sorted_idx = np.argsort(distances)
+    indices, distances = top_k(query_embedding, concept_embeddings, 10)
     
     print(f"\nTop 10 concepts matching \"{query}\":\n")
-    for rank, i in enumerate(sorted_idx[:10], 1):
+    for rank, (i, dist) in enumerate(zip(indices[0], distances[0]), 1):
         c = concept_data[i]
-        dist = distances[i]
         strongs_str = ", ".join(c["strongs"][:3]) if c["strongs"] else "none"
         print(f"  {rank:2}. {c['stem']} ({c['sense']})")
         print(f"      Gloss: {(c['gloss'] or '')[:50]}...")
@@ -991,6 +1200,35 @@ def _search_on_the_fly(query: str):
         print()
 
 
+# =============================================================================
+# DEMO 5: VERSES - User Text to Similar Verses
+# =============================================================================
+
+def demo_verses(query: str, limit: int = 10):
+    """
+    Find verses similar to user text.
+    Needs pre-computed verse embeddings (verse_vectors.sqlite).
+    """
+    print("=" * 70)
+    print(f"SIMILAR VERSES: \"{query}\"")
+    print("=" * 70)
+    
+    if not (HAS_SQLITE_VEC and (get_emb_dir() / "verse_vectors.sqlite").exists()):
+        print("\n⚠ No pre-computed verse embeddings.")
+        print("  Run: python scripts/create_embeddings.py")
+        return
+    
+    backend = get_backend("verse_vectors.sqlite", "verse_vectors", ["book", "chapter", "verse"])
+    kind = "IVF index" if isinstance(backend, IVFBackend) else "exact search"
+    print(f"\n✓ Searching {len(backend):,} verses ({kind})\n")
+    
+    results = search_verses(query, limit)
+    for rank, v in enumerate(results["verses"], 1):
+        print(f"  {rank:2}. {v['reference']} ({v['distance']:.1f})")
+        if v["text"]:
+            print(f"      {v['text'][:100]}")
+
+
 # =============================================================================
 # DEMO 6: ANALYZE - Word-by-word verse analysis
 # =============================================================================
@@ -1014,105 +1252,45 @@ def demo_analyze(verse: str, top_n: int = 3):
     else:
         print("⚠ No pre-computed embeddings. Run: python scripts/create_embeddings.py\n")
     
-    # Load concept metadata - EXCLUDE concepts marked DELETE
-    conn = sqlite3.connect(concepts_db)
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id, stem, sense, gloss, strongs_mappings 
-        FROM concepts 
-        WHERE gloss NOT LIKE '%DELETE%' 
-          AND gloss NOT LIKE '%delete%'
-          AND gloss IS NOT NULL
-    """)
-    concept_lookup = {}
-    valid_concept_ids = set()
-    for cid, stem, sense, gloss, strongs in cursor.fetchall():
-        concept_lookup[cid] = {
-            "stem": stem, "sense": sense, "gloss": gloss,
-            "strongs": json.loads(strongs) if strongs else []
-        }
-        valid_concept_ids.add(cid)
-    conn.close()
-    
-    # Stopwords - function words that don't have semantic meaning
-    STOPWORDS = {
-        "the", "a", "an", "is", "are", "was", "were", "be", "been", "being",
-        "have", "has", "had", "do", "does", "did", "will", "would", "could",
-        "should", "may", "might", "must", "shall", "can", "need", "dare",
-        "to", "of", "in", "for", "on", "with", "at", "by", "from", "as",
-        "into", "through", "during", "before", "after", "above", "below",
-        "between", "under", "again", "further", "then", "once", "here",
-        "there", "when", "where", "why", "how", "all", "each", "every",
-        "both", "few", "more", "most", "other", "some", "such", "no", "nor",
-        "not", "only", "own", "same", "so", "than", "too", "very", "just",
-        "but", "and", "or", "if", "because", "until", "while", "that",
-        "which", "who", "whom", "this", "these", "those", "am", "it", "its",
-        "us", "we", "our", "you", "your", "he", "him", "his", "she", "her",
-        "they", "them", "their", "what", "any", "also"
-    }
+    # Concept metadata, for Strong's mappings
+    concept_lookup = get_concept_lookup()
     
     # Tokenize verse
-    import re
-    words = re.findall(r"[A-Za-z]+(?:'[a-z]+)?", verse)
+    tokens = tokenize_verse(verse)
     
     print("-" * 70)
-    print(f"Analyzing {len(words)} words...")
+    print(f"Analyzing {len(tokens)} words...")
     print("-" * 70)
     
-    # Distance threshold - above this, match is unreliable
-    GOOD_MATCH_THRESHOLD = 105
-    WEAK_MATCH_THRESHOLD = 115
-    
     if use_precomputed:
-        db = apsw.Connection(str(concept_vec_db))
-        db.enable_load_extension(True)
-        sqlite_vec.load(db)
+        index = get_concept_index()
+        fields = ", ".join(index.tables) if len(index.tables) > 1 else "blended"
+        print(f"Matching against {fields} vectors of {len(index):,} concepts")
         
-        for word in words:
-            word_lower = word.lower()
-            
-            # Skip very short words
-            if len(word) <= 2:
-                print(f"\n\033[90m{word}\033[0m")
-                print("  \033[90m(skipped - too short)\033[0m")
-                continue
+        for entry in analyze_verse(verse, top_n):
+            word = entry["word"]
             
-            # Skip stopwords/function words
-            if word_lower in STOPWORDS:
+            # Skipped: very short words and stopwords/function words
+            if entry["skipped"]:
                 print(f"\n\033[90m{word}\033[0m")
-                print("  \033[90m(skipped - function word)\033[0m")
+                print(f"  \033[90m(skipped - {entry['skipped']})\033[0m")
                 continue
             
-            # Encode this word
-            word_int8 = encode_to_int8([word_lower])[0]
-            
-            # Search concepts - get more than needed to filter DELETE
-            results = list(db.cursor().execute("""
-                SELECT concept_id, stem, distance
-                FROM concept_vectors
-                WHERE embedding MATCH vec_int8(?)
-                ORDER BY distance
-                LIMIT ?
-            """, [word_int8.tobytes(), top_n * 3]))
-            
-            # Filter to valid concepts only
-            filtered = [(cid, stem, dist) for cid, stem, dist in results if cid in valid_concept_ids][:top_n]
-            
             print(f"\n\033[1m{word}\033[0m")
             
-            if not filtered:
+            if not entry["matches"]:
                 print("  \033[91m(no matches found)\033[0m")
                 continue
             
-            for rank, (cid, stem, dist) in enumerate(filtered, 1):
-                c = concept_lookup.get(cid, {"sense": "?", "gloss": "", "strongs": []})
-                strongs_str = ", ".join(c["strongs"][:2]) if c["strongs"] else ""
-                gloss_short = (c["gloss"] or "")[:45]
+            for m in entry["matches"]:
+                strongs_str = ", ".join(m["strongs"][:2]) if m["strongs"] else ""
+                gloss_short = (m["gloss"] or "")[:45]
                 
                 # Highlight if stem matches word
-                match_marker = "→" if stem.lower() == word_lower else " "
+                match_marker = "→" if m["exact"] else " "
                 
                 # Color code by distance
+                dist = m["distance"]
                 if dist < GOOD_MATCH_THRESHOLD:
                     color = "\033[92m"  # Green - good match
                 elif dist < WEAK_MATCH_THRESHOLD:
@@ -1120,12 +1298,10 @@ def demo_analyze(verse: str, top_n: int = 3):
                 else:
                     color = "\033[91m"  # Red - weak match
                 
-                print(f"  {match_marker} {color}{stem}_{c['sense']}\033[0m: {gloss_short}...")
+                print(f"  {match_marker} {color}{m['stem']}_{m['sense']}\033[0m: {gloss_short}...")
                 if strongs_str:
                     print(f"      Strong's: {strongs_str}")
                 print(f"      Distance: {dist:.1f}")
-        
-        db.close()
     else:
         # Fallback: load all concepts and encode on the fly
         conn = sqlite3.connect(concepts_db)
@@ -1142,32 +1318,30 @@ def demo_analyze(verse: str, top_n: int = 3):
         print(f"Encoding {len(concepts)} concepts (slow)...")
         concept_embeddings = encode(concept_texts)
         
-        for word in words:
+        # All content words in one batch, matched in one pass
+        words = list(dict.fromkeys(word.lower() for word, skipped in tokens if not skipped))
+        matches = {}
+        if words:
+            indices, distances = top_k(encode(words), concept_embeddings, top_n)
+            matches = {word: list(zip(row_indices, row_distances))
+                       for word, row_indices, row_distances in zip(words, indices, distances)}
+        
+        for word, skipped in tokens:
             word_lower = word.lower()
             
-            if len(word) <= 2:
-                print(f"\n\033[90m{word}\033[0m")
-                print("  \033[90m(skipped - too short)\033[0m")
-                continue
-            
-            if word_lower in STOPWORDS:
+            if skipped:
                 print(f"\n\033[90m{word}\033[0m")
-                print("  \033[90m(skipped - function word)\033[0m")
+                print(f"  \033[90m(skipped - {skipped})\033[0m")
                 continue
             
-            word_embedding = encode([word_lower])[0]
-            distances = [cosine_distance(word_embedding, ce) for ce in concept_embeddings]
-            sorted_idx = np.argsort(distances)
-            
             print(f"\n\033[1m{word}\033[0m")
-            for rank, i in enumerate(sorted_idx[:top_n], 1):
+            for i, dist in matches[word_lower]:
                 cid, stem, sense, gloss = concepts[i]
                 c = concept_lookup.get(cid, {"strongs": []})
                 strongs_str = ", ".join(c["strongs"][:2]) if c.get("strongs") else ""
                 gloss_short = (gloss or "")[:45]
                 match_marker = "→" if stem.lower() == word_lower else " "
                 
-                dist = distances[i]
                 if dist < 0.4:
                     color = "\033[92m"  # Green
                 elif dist < 0.6:
@@ -1203,16 +1377,29 @@ Examples:
     # Default (local embeddings)
     python scripts/demo_embeddings.py teach
     python scripts/demo_embeddings.py search "God loved the world"
+    python scripts/demo_embeddings.py verses "God loved the world"
     
     # Use OpenAI embeddings
     python scripts/demo_embeddings.py --provider openai search "God loved"
     python scripts/demo_embeddings.py --provider openai analyze "The Lord is my shepherd"
+    
+    # A specific embedding directory (model and dims come from its metadata)
+    python scripts/demo_embeddings.py --emb-dir databases/embeddings/openai-384 search "grace"
+    
+    # Brute-force KNN in NumPy instead of sqlite-vec queries
+    python scripts/demo_embeddings.py --backend numpy search "grace"
         """
     )
     
     # Global provider argument
     parser.add_argument("--provider", choices=["local", "openai"], default="openai",
                         help="Which embeddings to use (default: openai)")
+    parser.add_argument("--emb-dir", type=Path,
+                        help="Embedding directory to use; provider/model/dims are read from its metadata")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Don't read or write the embedding cache")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help=f"KNN backend for search/verses/match (default: {DEFAULT_BACKEND})")
     
     subparsers = parser.add_subparsers(dest="command", help="Demo mode")
     
@@ -1233,6 +1420,11 @@ Examples:
     search_parser = subparsers.add_parser("search", help="Search concepts by text")
     search_parser.add_argument("query", help="Text to search for")
     
+    # Similar verses
+    verses_parser = subparsers.add_parser("verses", help="Find verses similar to text")
+    verses_parser.add_argument("query", help="Text to search for")
+    verses_parser.add_argument("--limit", type=int, default=10, help="Number of verses")
+    
     # Analyze verse word-by-word
     analyze_parser = subparsers.add_parser("analyze", help="Analyze verse word-by-word")
     analyze_parser.add_argument("verse", help="Verse text to analyze")
@@ -1240,8 +1432,14 @@ Examples:
     
     args = parser.parse_args()
     
-    # Set embedding provider
-    set_provider(args.provider)
+    # Set embedding provider (or a specific directory, which picks its own provider)
+    if args.emb_dir:
+        set_emb_dir(args.emb_dir, args.provider)
+    else:
+        set_provider(args.provider)
+    global USE_CACHE, SEARCH_BACKEND
+    USE_CACHE = not args.no_cache
+    SEARCH_BACKEND = args.backend
     
     if args.command == "teach":
         demo_teach()
@@ -1253,6 +1451,8 @@ Examples:
         demo_match()
     elif args.command == "search":
         demo_search(args.query)
+    elif args.command == "verses":
+        demo_verses(args.query, limit=args.limit)
     elif args.command == "analyze":
         demo_analyze(args.verse, top_n=args.top)
     else:
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Persistent embedding cache shared by create_embeddings.py and demo_embeddings.py.
+
+Vectors are stored as float32 blobs in databases/embeddings/cache.sqlite,
+keyed by sha256(provider, model, dims, normalized text). Re-running a build
+after a small ontology edit, or repeating a demo query, only encodes texts
+the cache has not seen for that provider/model/dims.
+
+Usage:
+    python scripts/embeddings/embedding_cache.py              # Show cache contents
+    python scripts/embeddings/embedding_cache.py --clear      # Delete all cached vectors
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_DIR = SCRIPT_DIR.parent.parent  # scripts/embeddings -> scripts -> tbta-ai-framework
+DEFAULT_CACHE_PATH = PROJECT_DIR / "databases" / "embeddings" / "cache.sqlite"
+
+LOOKUP_CHUNK = 500  # Keys per SELECT, below SQLite's bound-parameter limit
+
+
+def normalize_text(text: str) -> str:
+    """NFC-normalize and collapse whitespace, so trivially different texts share an entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """Float32 vectors for one (provider, model, dims), stored in a shared SQLite file."""
+
+    def __init__(self, provider: str, model: str, dims: int, path: Path = DEFAULT_CACHE_PATH):
+        self.provider = provider
+        self.model = model
+        self.dims = dims
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key BLOB PRIMARY KEY,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                dims INTEGER NOT NULL,
+                vector BLOB NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def key(self, text: str) -> bytes:
+        prefix = f"{self.provider}\0{self.model}\0{self.dims}\0"
+        return hashlib.sha256((prefix + normalize_text(text)).encode("utf-8")).digest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached vector for each text, or None where there is none."""
+        keys = [self.key(text) for text in texts]
+        found: Dict[bytes, np.ndarray] = {}
+        with self._lock:
+            unique = list(dict.fromkeys(keys))
+            for i in range(0, len(unique), LOOKUP_CHUNK):
+                chunk = unique[i:i + LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                for key, blob in self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ):
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return [found.get(key) for key in keys]
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """Store one vector per text (committed immediately)."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        rows = [
+            (self.key(text), self.provider, self.model, self.dims, vector.tobytes())
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, provider, model, dims, vector) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+
+    def encode(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray],
+               store: bool = True) -> np.ndarray:
+        """
+        Return float32 vectors for texts, calling encode_fn only for cache misses.
+
+        Misses are de-duplicated before encoding and stored right after, so an
+        interrupted run keeps everything encoded so far. Pass store=False when
+        encode_fn already calls put_many itself (e.g. per API request).
+        """
+        if not texts:
+            return np.zeros((0, self.dims), dtype=np.float32)
+
+        cached = self.get_many(texts)
+        missing: Dict[bytes, str] = {}
+        for text, vector in zip(texts, cached):
+            if vector is None:
+                missing.setdefault(self.key(text), text)
+
+        self.hits += len(texts) - sum(1 for vector in cached if vector is None)
+        self.misses += len(missing)
+
+        if missing:
+            miss_texts = list(missing.values())
+            miss_vectors = np.asarray(encode_fn(miss_texts), dtype=np.float32)
+            if store:
+                self.put_many(miss_texts, miss_vectors)
+            encoded = dict(zip(missing, miss_vectors))
+            cached = [
+                vector if vector is not None else encoded[self.key(text)]
+                for text, vector in zip(texts, cached)
+            ]
+
+        return np.vstack(cached)
+
+    def summary(self) -> str:
+        return f"{self.hits:,} cached, {self.misses:,} encoded"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the embedding cache")
+    parser.add_argument("--cache", type=Path, default=DEFAULT_CACHE_PATH, help="Cache database path")
+    parser.add_argument("--clear", action="store_true", help="Delete all cached vectors")
+    args = parser.parse_args()
+
+    if not args.cache.exists():
+        print(f"No cache at {args.cache}")
+        return
+
+    conn = sqlite3.connect(args.cache)
+    if args.clear:
+        conn.execute("DELETE FROM embeddings")
+        conn.commit()
+        conn.execute("VACUUM")
+        print(f"✓ Cleared {args.cache}")
+    else:
+        print(f"Cache: {args.cache} ({args.cache.stat().st_size / 1024 / 1024:.1f} MB)")
+        for provider, model, dims, count in conn.execute("""
+            SELECT provider, model, dims, COUNT(*) FROM embeddings
+            GROUP BY provider, model, dims ORDER BY provider, model, dims
+        """):
+            print(f"  {provider:<8} {model:<45} {dims:>5} dims  {count:>8,} vectors")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
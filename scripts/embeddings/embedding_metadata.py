@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Metadata stored in every vector database built by create_embeddings.py.
+
+Each vec0 database carries an embedding_metadata(key, value) table:
+
+    provider          local / openai
+    model             Encoder model name
+    dims              Vector dimensions
+    quantization      int8 / int8-global / int8-dim / binary (see quantization.py)
+    quantization_scale  Calibrated scale(s), JSON list (calibrated modes only)
+    source_version    Hash of the source databases' manifests
+    created_at        UTC build time
+
+demo_embeddings.py reads it to pick the matching encoder and quantizer and
+refuses databases built with a different model or dimensionality.
+Databases built before the table existed have no metadata and are assumed
+to match the demo's defaults.
+
+Usage:
+    python scripts/embeddings/embedding_metadata.py databases/embeddings/local
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+METADATA_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS embedding_metadata (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    )
+"""
+
+VECTOR_DBS = ["verse_vectors.sqlite", "concept_vectors.sqlite", "strongs_vectors.sqlite"]
+
+
+def read_metadata(db) -> Dict[str, str]:
+    """embedding_metadata as a dict (empty for databases built before it existed)."""
+    exists = list(db.cursor().execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'embedding_metadata'"
+    ))
+    if not exists:
+        return {}
+    return dict(db.cursor().execute("SELECT key, value FROM embedding_metadata"))
+
+
+def read_metadata_file(path: Path) -> Dict[str, str]:
+    """read_metadata for a database file, without loading sqlite-vec."""
+    if not path.exists():
+        return {}
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return read_metadata(conn)
+    finally:
+        conn.close()
+
+
+def write_metadata(db, values: Dict[str, object]):
+    """Upsert keys into embedding_metadata."""
+    cursor = db.cursor()
+    cursor.execute(METADATA_TABLE_SQL)
+    cursor.executemany(
+        "INSERT OR REPLACE INTO embedding_metadata (key, value) VALUES (?, ?)",
+        [(key, str(value)) for key, value in values.items()],
+    )
+
+
+def source_version(paths: Iterable[Path]) -> str:
+    """
+    Short hash identifying the source data.
+
+    Uses each database's manifest table (written by convert_db.py) when it
+    has one, else the file's size and mtime; missing files are skipped.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        if not path.exists():
+            continue
+        digest.update(path.name.encode())
+        entries = []
+        if path.suffix == ".sqlite":
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                entries = sorted(conn.execute("SELECT source, content_hash FROM manifest"))
+            except sqlite3.OperationalError:
+                pass
+            finally:
+                conn.close()
+        if not entries:
+            stat = path.stat()
+            entries = [(str(stat.st_size), str(stat.st_mtime_ns))]
+        for source, content_hash in entries:
+            digest.update(f"{source}={content_hash};".encode())
+    return digest.hexdigest()[:16]
+
+
+def check_compatible(metadata: Dict[str, str], provider: str, model: str, dims: int) -> Optional[str]:
+    """Why vectors with this metadata can't be queried with the given encoder, or None."""
+    if not metadata:
+        return None  # Built before metadata was recorded
+    problems = []
+    if metadata.get("provider") not in (None, provider):
+        problems.append(f"provider {metadata['provider']} (querying with {provider})")
+    if metadata.get("model") not in (None, model):
+        problems.append(f"model {metadata['model']} (querying with {model})")
+    if "dims" in metadata and int(metadata["dims"]) != dims:
+        problems.append(f"{metadata['dims']} dims (querying with {dims})")
+    return "built with " + ", ".join(problems) if problems else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the metadata of embedding databases")
+    parser.add_argument("emb_dir", type=Path, help="Embedding directory, e.g. databases/embeddings/local")
+    args = parser.parse_args()
+
+    found = False
+    for name in VECTOR_DBS:
+        path = args.emb_dir / name
+        if not path.exists():
+            continue
+        found = True
+        metadata = read_metadata_file(path)
+        print(f"{name}:")
+        if not metadata:
+            print("  (no metadata - built before it was recorded)")
+        for key, value in sorted(metadata.items()):
+            if key == "quantization_scale" and len(value) > 60:
+                value = value[:57] + "..."
+            print(f"  {key:<20} {value}")
+    if not found:
+        print(f"✗ No vector databases in {args.emb_dir}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Concurrent, rate-limit-aware client for the OpenAI embeddings endpoint.
+
+Texts are packed into requests by an estimated token budget rather than a
+fixed item count, up to max_in_flight requests run at once on a thread
+pool, and 429 / 5xx / timeouts are retried with exponential backoff and
+full jitter (honouring Retry-After). Each completed request is handed to
+an on_batch callback as soon as it arrives, which create_embeddings.py uses
+to checkpoint vectors into the embedding cache, so an interrupted run
+resumes where it stopped.
+
+Only the standard library is used. base_url (or OPENAI_BASE_URL) can point
+at any server speaking the same POST /embeddings protocol, e.g. a local
+fake for testing.
+"""
+
+import json
+import os
+import random
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterator, List, Optional
+
+import numpy as np
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+MAX_INPUTS_PER_REQUEST = 2048   # API limit
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class EmbeddingRequestError(RuntimeError):
+    """A request failed permanently (non-retryable status or retries exhausted)."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token estimate (~3 UTF-8 bytes per token; Greek/Hebrew use more bytes)."""
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def pack_batches(texts: List[str], max_tokens: int,
+                 max_items: int = MAX_INPUTS_PER_REQUEST) -> Iterator[List[int]]:
+    """Yield lists of indices into texts, each within the token and item budget."""
+    batch: List[int] = []
+    batch_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_items):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(i)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+class OpenAIEmbeddingClient:
+    """Embeds lists of texts with several requests in flight."""
+
+    def __init__(self, api_key: str, model: str, dims: Optional[int] = None,
+                 base_url: Optional[str] = None, max_in_flight: int = 4,
+                 max_batch_tokens: int = 20000, max_retries: int = 8,
+                 timeout: float = 60.0, backoff_base: float = 1.0, backoff_cap: float = 60.0):
+        self.api_key = api_key
+        self.model = model
+        self.dims = dims
+        self.base_url = (base_url or os.environ.get("OPENAI_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.max_in_flight = max_in_flight
+        self.max_batch_tokens = max_batch_tokens
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retries = 0  # Total retried requests, for reporting
+        self._retries_lock = threading.Lock()  # _request runs on pool threads
+
+    def _post(self, inputs: List[str]) -> np.ndarray:
+        payload = {"model": self.model, "input": inputs, "encoding_format": "float"}
+        if self.dims:
+            payload["dimensions"] = self.dims  # text-embedding-3 models support dimension reduction
+        request = urllib.request.Request(
+            f"{self.base_url}/embeddings",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            },
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            body = json.load(response)
+        data = sorted(body["data"], key=lambda item: item["index"])
+        if len(data) != len(inputs):
+            raise EmbeddingRequestError(f"Expected {len(inputs)} embeddings, got {len(data)}")
+        return np.array([item["embedding"] for item in data], dtype=np.float32)
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return delay
+
+    def _request(self, inputs: List[str]) -> np.ndarray:
+        """POST one batch, retrying transient failures."""
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                return self._post(inputs)
+            except urllib.error.HTTPError as e:
+                if e.code not in RETRY_STATUS:
+                    detail = e.read().decode("utf-8", "replace")[:500]
+                    raise EmbeddingRequestError(f"HTTP {e.code}: {detail}") from e
+                retry_after = e.headers.get("Retry-After") if e.headers else None
+                error = e
+            except (urllib.error.URLError, socket.timeout, TimeoutError, ConnectionError) as e:
+                error = e
+            if attempt == self.max_retries:
+                raise EmbeddingRequestError(f"Giving up after {attempt + 1} attempts: {error}") from error
+            with self._retries_lock:
+                self.retries += 1
+            time.sleep(self._backoff(attempt, retry_after))
+
+    def embed(self, texts: List[str],
+              on_batch: Optional[Callable[[List[int], np.ndarray], None]] = None) -> np.ndarray:
+        """
+        Return L2-normalized float32 embeddings for texts, in input order.
+
+        on_batch(indices, vectors) is called from the calling thread as each
+        request completes.
+        """
+        if not texts:
+            return np.zeros((0, self.dims or 0), dtype=np.float32)
+
+        # The API rejects empty strings
+        inputs = [text if text.strip() else " " for text in texts]
+        batches = list(pack_batches(inputs, self.max_batch_tokens))
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            pending = {}
+            queued = iter(batches)
+
+            def submit_next() -> bool:
+                indices = next(queued, None)
+                if indices is None:
+                    return False
+                pending[pool.submit(self._request, [inputs[i] for i in indices])] = indices
+                return True
+
+            # Only max_in_flight requests are queued at a time, so a failure
+            # stops the run without firing the remaining batches
+            for _ in range(self.max_in_flight):
+                if not submit_next():
+                    break
+
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        indices = pending.pop(future)
+                        vectors = future.result()
+                        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+                        for i, vector in zip(indices, vectors):
+                            results[i] = vector
+                        if on_batch is not None:
+                            on_batch(indices, vectors)
+                        submit_next()
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+        return np.vstack(results)
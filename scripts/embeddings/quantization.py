@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Vector quantization shared by create_embeddings.py and demo_embeddings.py.
+
+Modes (stored per vector database in the embedding_metadata table, so
+queries are quantized exactly like the stored vectors):
+
+    int8         Legacy: clip to [-1, 1] and scale by 127 (the default)
+    int8-global  One scale for all dimensions, calibrated so the 99.9th
+                 percentile |component| maps to 127
+    int8-dim     One calibrated scale per dimension (distances become a
+                 per-dimension weighted L2)
+    binary       Sign bits in a vec0 bit[] column (Hamming KNN), plus a
+                 legacy int8 copy in an auxiliary column used to rescore
+                 the candidates. The KNN scan reads 8x fewer vector bytes,
+                 but the database stores both copies, so it is about 10%
+                 larger than an int8 one: binary trades disk for scan speed
+
+Normalized MiniLM/OpenAI components rarely exceed ±0.3, so the calibrated
+modes use far more of the int8 range than the legacy ×127.
+
+knn() reports distances in legacy int8 units (L2 between ×127 vectors)
+for every mode, so thresholds tuned on the legacy tables keep working;
+for int8-dim this is an approximation.
+"""
+
+import json
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from embedding_metadata import read_metadata, write_metadata
+
+QUANTIZATION_MODES = ("int8", "int8-global", "int8-dim", "binary")
+DEFAULT_QUANTIZATION = "int8"
+
+CALIBRATION_ROWS = 4096       # Vectors sampled before calibrated modes start writing
+CALIBRATION_PERCENTILE = 99.9
+RERANK_FACTOR = 4             # binary: candidates fetched per requested result
+
+
+def float32_to_int8(embeddings: np.ndarray) -> np.ndarray:
+    """Quantize float32 embeddings to int8 for 4x storage reduction (legacy ×127)."""
+    clipped = np.clip(embeddings, -1.0, 1.0)
+    return (clipped * 127).astype(np.int8)
+
+
+class Quantizer:
+    """Turns float embeddings into vec0 column values for one quantization mode."""
+
+    def __init__(self, mode: str = DEFAULT_QUANTIZATION, scale: Optional[np.ndarray] = None):
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization {mode!r} (choose from {', '.join(QUANTIZATION_MODES)})")
+        self.mode = mode
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float32)
+
+    # -- Calibration -------------------------------------------------------
+
+    @property
+    def needs_calibration(self) -> bool:
+        return self.mode in ("int8-global", "int8-dim") and self.scale is None
+
+    def calibrate(self, sample: np.ndarray):
+        """Pick the scale(s) so the CALIBRATION_PERCENTILE |component| maps to 127."""
+        magnitudes = np.abs(np.asarray(sample, dtype=np.float32))
+        axis = 0 if self.mode == "int8-dim" else None
+        bound = np.percentile(magnitudes, CALIBRATION_PERCENTILE, axis=axis)
+        self.scale = np.atleast_1d(127.0 / np.maximum(bound, 1e-6)).astype(np.float32)
+
+    # -- Storage -----------------------------------------------------------
+
+    def vector_columns(self, dims: int) -> str:
+        """vec0 column definitions for the vector itself."""
+        if self.mode == "binary":
+            if dims % 8:
+                raise ValueError(f"binary quantization needs a multiple of 8 dimensions, got {dims}")
+            return f"embedding bit[{dims}],\n            +rerank BLOB"
+        return f"embedding int8[{dims}]"
+
+    @property
+    def insert_columns(self) -> str:
+        return "embedding, rerank" if self.mode == "binary" else "embedding"
+
+    @property
+    def insert_values(self) -> str:
+        return "vec_bit(?), ?" if self.mode == "binary" else "vec_int8(?)"
+
+    def quantize(self, embeddings: np.ndarray) -> np.ndarray:
+        """int8 vectors (packed sign bits as uint8 for binary)."""
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if self.mode == "binary":
+            return np.packbits(embeddings > 0, axis=1)
+        if self.mode == "int8":
+            return float32_to_int8(embeddings)
+        if self.scale is None:
+            raise RuntimeError(f"{self.mode} quantizer used before calibration")
+        return np.clip(np.rint(embeddings * self.scale), -127, 127).astype(np.int8)
+
+    def rows(self, embeddings: np.ndarray) -> List[tuple]:
+        """Per-row parameters matching insert_values."""
+        if self.mode == "binary":
+            bits = self.quantize(embeddings)
+            rerank = float32_to_int8(embeddings)
+            return [(b.tobytes(), r.tobytes()) for b, r in zip(bits, rerank)]
+        return [(v.tobytes(),) for v in self.quantize(embeddings)]
+
+    def metadata(self) -> dict:
+        values = {"quantization": self.mode}
+        if self.scale is not None:
+            values["quantization_scale"] = json.dumps([round(float(s), 6) for s in self.scale])
+        return values
+
+    def save(self, db):
+        write_metadata(db, self.metadata())
+
+    @classmethod
+    def from_metadata(cls, metadata: dict) -> "Quantizer":
+        scale = metadata.get("quantization_scale")
+        return cls(metadata.get("quantization", DEFAULT_QUANTIZATION),
+                   json.loads(scale) if scale else None)
+
+    @classmethod
+    def load(cls, db) -> "Quantizer":
+        """The quantizer a vector database was built with (legacy int8 if unrecorded)."""
+        return cls.from_metadata(read_metadata(db))
+
+    # -- Reading back ------------------------------------------------------
+
+    @property
+    def legacy_column(self) -> str:
+        """Column whose stored vectors legacy_vectors() can decode."""
+        return "rerank" if self.mode == "binary" else "embedding"
+
+    def legacy_vectors(self, blobs: Sequence[bytes], dims: int) -> np.ndarray:
+        """Stored legacy_column blobs as float32 vectors in legacy ×127 units."""
+        if not blobs:
+            return np.zeros((0, dims), dtype=np.float32)
+        stored = np.frombuffer(b"".join(blobs), dtype=np.int8).reshape(len(blobs), dims).astype(np.float32)
+        if self.mode == "binary" or self.scale is None:
+            return stored  # binary rescoring copies are legacy int8
+        return stored * (127.0 / self.scale)
+
+    # -- Querying ----------------------------------------------------------
+
+    def to_legacy_distance(self, distance: float) -> float:
+        """Convert an int8 L2 distance from this mode to legacy ×127 units."""
+        if self.scale is None:
+            return distance
+        return distance * 127.0 / float(np.sqrt(np.mean(self.scale ** 2)))
+
+
+def knn(db, table: str, columns: Sequence[str], query: np.ndarray, limit: int,
+        quantizer: Optional[Quantizer] = None) -> List[tuple]:
+    """
+    Nearest rows of a vec0 table to one float query vector.
+
+    Returns (*columns, distance) tuples, closest first, with distance in
+    legacy int8 units. In binary mode RERANK_FACTOR * limit candidates are
+    taken by Hamming distance and rescored against their int8 copies.
+    """
+    quantizer = quantizer or Quantizer.load(db)
+    select = ", ".join(columns)
+
+    if quantizer.mode == "binary":
+        bits = quantizer.quantize(query)[0]
+        candidates = list(db.cursor().execute(f"""
+            SELECT {select}, rerank
+            FROM {table}
+            WHERE embedding MATCH vec_bit(?)
+            ORDER BY distance
+            LIMIT ?
+        """, [bits.tobytes(), limit * RERANK_FACTOR]))
+        query_int8 = float32_to_int8(np.atleast_2d(query))[0].astype(np.float32)
+        rescored = []
+        for row in candidates:
+            stored = np.frombuffer(row[-1], dtype=np.int8).astype(np.float32)
+            rescored.append((*row[:-1], float(np.linalg.norm(stored - query_int8))))
+        rescored.sort(key=lambda row: row[-1])
+        return rescored[:limit]
+
+    query_int8 = quantizer.quantize(query)[0]
+    return [
+        (*row[:-1], quantizer.to_legacy_distance(row[-1]))
+        for row in db.cursor().execute(f"""
+            SELECT {select}, distance
+            FROM {table}
+            WHERE embedding MATCH vec_int8(?)
+            ORDER BY distance
+            LIMIT ?
+        """, [query_int8.tobytes(), limit])
+    ]
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Long-running semantic search service over the vec0 embedding databases.
+
+Every demo_embeddings.py run reloads the model, reopens the vector databases
+and rebuilds the concept/Strong's lookups, so each query costs seconds of
+startup. This server does all of that once and then answers JSON requests
+with the same functions the demos use (search_concepts, analyze_verse,
+match_concepts), so a query only costs encoding and KNN.
+
+Endpoints (GET query parameters or a POST JSON body with the same keys):
+    /search?q=God's+mercy&limit=10&strongs_limit=5
+    /verses?q=God's+mercy&limit=10      Similar verses
+    /analyze?verse=The+Lord+is+my+shepherd&top=3
+    /match?limit=20                     Random unmapped concepts
+    /health
+
+Usage:
+    python scripts/embeddings/search_server.py                     # localhost:5100, local embeddings
+    python scripts/embeddings/search_server.py --port 8080 --provider openai
+    python scripts/embeddings/search_server.py --emb-dir databases/embeddings/openai-384
+    python scripts/embeddings/search_server.py --backend numpy        # in-memory KNN (vector_backend.py)
+
+    curl "http://localhost:5100/search?q=grace"
+    curl -X POST localhost:5100/analyze -d '{"verse": "For God so loved the world"}'
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict
+from urllib.parse import parse_qs, urlparse
+
+import demo_embeddings as demo
+
+DEFAULT_PORT = 5100
+MAX_RESULTS = 100   # Cap on limit, strongs_limit, top and per_concept
+
+# Requests are handled on their own threads, but share one model and one
+# connection per database, so the queries themselves run one at a time
+query_lock = threading.Lock()
+
+
+def _required(params: dict, *names: str) -> str:
+    for name in names:
+        if params.get(name):
+            return str(params[name])
+    raise ValueError(f"Missing parameter: {names[0]}")
+
+
+def _count(params: dict, name: str, default: int) -> int:
+    """A result count parameter: at least 1, capped at MAX_RESULTS."""
+    try:
+        value = int(params.get(name, default))
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer") from None
+    if value < 1:
+        raise ValueError(f"{name} must be at least 1")
+    return min(value, MAX_RESULTS)
+
+
+def run_search(params: dict) -> dict:
+    query = _required(params, "q", "query")
+    return demo.search_concepts(query, _count(params, "limit", 10), _count(params, "strongs_limit", 5))
+
+
+def run_verses(params: dict) -> dict:
+    if not (demo.get_emb_dir() / "verse_vectors.sqlite").exists():
+        raise ValueError("No verse_vectors.sqlite in the embedding directory")
+    query = _required(params, "q", "query")
+    return demo.search_verses(query, _count(params, "limit", 10))
+
+
+def run_analyze(params: dict) -> dict:
+    verse = _required(params, "verse", "text")
+    return {"verse": verse, "words": demo.analyze_verse(verse, _count(params, "top", 3))}
+
+
+def run_match(params: dict) -> dict:
+    if not (demo.get_emb_dir() / "strongs_vectors.sqlite").exists():
+        raise ValueError("No strongs_vectors.sqlite in the embedding directory")
+    concepts = demo.sample_unmapped_concepts(_count(params, "limit", 20))
+    return {"results": demo.match_concepts(concepts, _count(params, "per_concept", 3))}
+
+
+def run_health(params: dict) -> dict:
+    provider, model, dims = demo.encoder_signature()
+    return {
+        "status": "ok",
+        "emb_dir": str(demo.get_emb_dir()),
+        "provider": provider,
+        "model": model,
+        "dims": dims,
+        "backend": demo.SEARCH_BACKEND,
+        "concept_fields": list(demo.get_concept_index().tables),
+    }
+
+
+ENDPOINTS: Dict[str, Callable[[dict], dict]] = {
+    "/search": run_search,
+    "/verses": run_verses,
+    "/analyze": run_analyze,
+    "/match": run_match,
+    "/health": run_health,
+}
+
+
+def warm_up():
+    """Load the model, lookups and vector databases before the first request."""
+    print("Warming up...")
+    demo.encode(["warm up"])
+    demo.get_concept_lookup()
+    demo.get_strongs_lookup()
+    demo.get_backend("concept_vectors.sqlite", "concept_vectors", ["concept_id", "stem"])
+    if (demo.get_emb_dir() / "strongs_vectors.sqlite").exists():
+        demo.get_backend("strongs_vectors.sqlite", "strongs_vectors", ["strongs_number"])
+    if (demo.get_emb_dir() / "verse_vectors.sqlite").exists():
+        verses = demo.get_backend("verse_vectors.sqlite", "verse_vectors", ["book", "chapter", "verse"])
+        print(f"  ✓ {len(verses):,} verses ({type(verses).__name__})")
+    demo.get_valid_concept_ids()
+    index = demo.get_concept_index()
+    print(f"  ✓ {len(demo.get_concept_lookup()):,} concepts, {len(demo.get_strongs_lookup()):,} Strong's entries, "
+          f"{'/'.join(index.tables)} concept index over {len(index):,} concepts")
+
+
+class SearchHandler(BaseHTTPRequestHandler):
+    """JSON API over the demo query functions."""
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False, default=lambda o: o.item()).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, params: dict):
+        path = urlparse(self.path).path.rstrip("/") or "/"
+        endpoint = ENDPOINTS.get(path)
+        if endpoint is None:
+            self._send_json(404, {"error": f"Unknown endpoint: {path}", "endpoints": sorted(ENDPOINTS)})
+            return
+
+        start = time.perf_counter()
+        try:
+            with query_lock:
+                result = endpoint(params)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        self._send_json(200, result)
+
+    def do_GET(self):
+        """Handle GET requests with query parameters."""
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        self._handle(params)
+
+    def do_POST(self):
+        """Handle POST requests with a JSON object body."""
+        content_length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(content_length).decode("utf-8")
+        try:
+            params = json.loads(body) if body.strip() else {}
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "Body must be a JSON object"})
+            return
+        if not isinstance(params, dict):
+            self._send_json(400, {"error": "Body must be a JSON object"})
+            return
+        self._handle(params)
+
+    def log_message(self, format, *args):
+        """Custom log format."""
+        print(f"[{self.log_date_time_string()}] {args[0]}")
+
+
+def run_server(host: str = "localhost", port: int = DEFAULT_PORT):
+    """Warm up and serve until interrupted."""
+    warm_up()
+    server = ThreadingHTTPServer((host, port), SearchHandler)
+    server.daemon_threads = True
+    print(f"Search API running on http://{host}:{port} ({', '.join(sorted(ENDPOINTS))})")
+    print("Press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent semantic search service over the embedding databases")
+    parser.add_argument("--host", default="localhost", help="Interface to bind (default: localhost)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--provider", choices=["local", "openai"], default="local",
+                        help="Which embeddings to use (default: local)")
+    parser.add_argument("--emb-dir", type=Path,
+                        help="Embedding directory to use; provider/model/dims are read from its metadata")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the embedding cache")
+    parser.add_argument("--backend", choices=demo.BACKENDS, default=demo.DEFAULT_BACKEND,
+                        help=f"KNN backend for /search, /verses and /match (default: {demo.DEFAULT_BACKEND})")
+    args = parser.parse_args()
+
+    if args.emb_dir:
+        demo.set_emb_dir(args.emb_dir, args.provider)
+    else:
+        demo.set_provider(args.provider)
+    demo.USE_CACHE = not args.no_cache
+    demo.SEARCH_BACKEND = args.backend
+
+    if not (demo.HAS_SQLITE_VEC and (demo.get_emb_dir() / "concept_vectors.sqlite").exists()):
+        print(f"✗ No concept_vectors.sqlite in {demo.get_emb_dir()} (or sqlite-vec not installed)")
+        print("  Run: python scripts/embeddings/create_embeddings.py")
+        sys.exit(1)
+
+    run_server(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""
+Pluggable KNN backends over the vec0 vector tables.
+
+    auto   ivf for tables of ANN_MIN_ROWS rows or more, else numpy (default)
+    vec0   One sqlite-vec query per query vector (quantization.knn)
+    numpy  Brute force in memory over the stored int8 matrix: one matrix
+           product per chunk of rows for a whole batch of queries, and
+           argpartition for the top k
+    ivf    Approximate: an inverted file index (k-means lists) over the
+           same matrix; each query scans only its IVF_PROBES closest lists
+
+All answer search(queries, limit) with one list of (*columns, distance)
+tuples per query, closest first, distances in legacy int8 units, so they
+can be swapped freely (demo_embeddings.py --backend, search_server.py
+--backend). The concept and Strong's tables are a few MB of int8, small
+enough that a scan in NumPy beats the virtual table and needs no SQL per
+query; verse tables (31k rows, more with more translations) are where an
+exact scan becomes the latency floor and ivf takes over.
+
+The numpy backend exports each table once to {table}.int8.npy (memory-
+mapped on later loads) and {table}.rows.json (the column values) next to
+its database, and re-exports them when the database file changes. NumPy's
+integer matmul does not use BLAS, so int8 rows are upcast a chunk at a
+time and multiplied in float32, which is exact for int8 dot products up
+to 1,040 dims (127² × dims < 2²⁴); wider vectors use float64. In binary
+mode it scans the int8 rescoring copy, i.e. exact L2 where vec0 ranks by
+Hamming distance first.
+
+The ivf backend trains about sqrt(rows) centroids with k-means on a sample
+of the int8 vectors and saves them, with each row's list, to
+{table}.ivf.npz next to the database (rebuilt when the database changes).
+Distances of the rows it does scan are exact, so only recall is traded.
+
+top_k() is the chunked matrix product + argpartition behind the numpy
+backend; demo_embeddings.py's fallbacks (no pre-computed vectors) use it
+on float embeddings with cosine distance.
+
+Benchmark against vec0 (latency and agreement) and IVF recall@k against
+exact search, using stored vectors plus noise as queries so no encoder
+is needed:
+    python scripts/embeddings/vector_backend.py databases/embeddings/local
+    python scripts/embeddings/vector_backend.py databases/embeddings/local --table concept_vectors --queries 500
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embedding_metadata import VECTOR_DBS
+from quantization import Quantizer, float32_to_int8, knn
+
+BACKENDS = ("auto", "vec0", "numpy", "ivf")
+DEFAULT_BACKEND = "auto"
+
+CHUNK_ROWS = 8192             # Rows upcast and multiplied at a time
+EXPORT_VERSION = 1
+
+ANN_MIN_ROWS = 20000          # auto: tables this large use the IVF index
+IVF_PROBES = 16               # Lists scanned per query
+IVF_TRAIN_ROWS_PER_LIST = 64  # k-means sample size per centroid
+IVF_ITERATIONS = 20
+IVF_VERSION = 1
+IVF_BENCHMARK_PROBES = (1, 2, 4, 8, 16, 32)
+
+
+# =============================================================================
+# Top-k
+# =============================================================================
+
+def exact_dtype(dims: int):
+    """Float type in which int8 dot products over dims dimensions are exact."""
+    return np.float32 if 127 * 127 * dims < 2 ** 24 else np.float64
+
+
+def row_norms(matrix: np.ndarray, dtype=np.float32) -> np.ndarray:
+    """Squared norm of each row, computed CHUNK_ROWS rows at a time."""
+    norms = np.zeros(len(matrix), dtype=dtype)
+    for start in range(0, len(matrix), CHUNK_ROWS):
+        chunk = np.asarray(matrix[start:start + CHUNK_ROWS], dtype=dtype)
+        norms[start:start + len(chunk)] = np.einsum("ij,ij->i", chunk, chunk)
+    return norms
+
+
+def top_k(queries: np.ndarray, matrix: np.ndarray, limit: int, metric: str = "cosine",
+          norms: Optional[np.ndarray] = None, dtype=np.float32) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (indices, distances) of the limit rows of matrix closest to each query.
+
+    Both are (queries, limit) arrays, closest first (ties in row order).
+    metric is "cosine" (1 - dot product, for normalized vectors) or "l2"
+    (norms: precomputed row_norms, else computed here). The matrix, which
+    may be int8 or memory-mapped, is upcast to dtype CHUNK_ROWS rows at a
+    time, and each chunk is one matrix product for all queries followed by
+    an argpartition, so memory stays at queries × CHUNK_ROWS.
+    """
+    if metric not in ("cosine", "l2"):
+        raise ValueError(f"Unknown metric {metric!r} (choose from cosine, l2)")
+    queries = np.atleast_2d(np.asarray(queries, dtype=dtype))
+    limit = max(0, min(limit, len(matrix)))
+    if metric == "l2":
+        norms = row_norms(matrix, dtype) if norms is None else norms
+        query_norms = np.einsum("ij,ij->i", queries, queries)[:, None]
+
+    best_distances = np.zeros((len(queries), 0), dtype=dtype)
+    best_indices = np.zeros((len(queries), 0), dtype=np.int64)
+    for start in range(0, len(matrix) if limit else 0, CHUNK_ROWS):
+        chunk = np.asarray(matrix[start:start + CHUNK_ROWS], dtype=dtype)
+        products = queries @ chunk.T
+        if metric == "cosine":
+            distances = 1.0 - products
+        else:
+            distances = query_norms + norms[None, start:start + len(chunk)] - 2 * products
+        indices = np.broadcast_to(np.arange(start, start + len(chunk)), distances.shape)
+
+        # Merge with the candidates so far, keeping the best limit per query
+        best_distances = np.concatenate([best_distances, distances], axis=1)
+        best_indices = np.concatenate([best_indices, indices], axis=1)
+        if best_distances.shape[1] > limit:
+            keep = np.argpartition(best_distances, limit - 1, axis=1)[:, :limit]
+            best_distances = np.take_along_axis(best_distances, keep, axis=1)
+            best_indices = np.take_along_axis(best_indices, keep, axis=1)
+
+    order = np.lexsort((best_indices, best_distances))
+    best_distances = np.take_along_axis(best_distances, order, axis=1)
+    best_indices = np.take_along_axis(best_indices, order, axis=1)
+    if metric == "l2":
+        best_distances = np.sqrt(np.maximum(best_distances, 0))
+    return best_indices, best_distances
+
+
+class Vec0Backend:
+    """KNN through the sqlite-vec virtual table, one query at a time."""
+
+    def __init__(self, db, table: str, columns: Sequence[str], quantizer: Optional[Quantizer] = None):
+        self.db = db
+        self.table = table
+        self.columns = list(columns)
+        self.quantizer = quantizer or Quantizer.load(db)
+
+    def __len__(self) -> int:
+        return next(self.db.cursor().execute(f"SELECT COUNT(*) FROM {self.table}"))[0]
+
+    def search(self, queries: np.ndarray, limit: int) -> List[List[tuple]]:
+        return [knn(self.db, self.table, self.columns, query, limit, self.quantizer)
+                for query in np.atleast_2d(queries)]
+
+
+class NumpyBackend:
+    """Brute-force KNN over a vec0 table's int8 vectors, held (memory-mapped) in NumPy."""
+
+    def __init__(self, db, table: str, columns: Sequence[str], quantizer: Optional[Quantizer] = None,
+                 db_path: Optional[Path] = None):
+        self.table = table
+        self.columns = list(columns)
+        self.quantizer = quantizer or Quantizer.load(db)
+        self.binary = self.quantizer.mode == "binary"
+        # The binary rescoring copy is legacy int8; other modes convert linearly
+        self.distance_scale = 1.0 if self.binary else self.quantizer.to_legacy_distance(1.0)
+
+        exported = read_export(db_path, table, self.columns) if db_path else None
+        if exported is None:
+            self.rows, self.matrix = self._read_table(db)
+            if db_path:
+                self.matrix = write_export(db_path, table, self.columns, self.rows, self.matrix)
+        else:
+            self.rows, self.matrix = exported
+
+        self.dot_dtype = exact_dtype(self.matrix.shape[1])
+        self.norms = row_norms(self.matrix, self.dot_dtype)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _read_table(self, db):
+        select = ", ".join(self.columns)
+        result = list(db.cursor().execute(
+            f"SELECT {select}, {self.quantizer.legacy_column} FROM {self.table} ORDER BY rowid"
+        ))
+        rows = [tuple(row[:-1]) for row in result]
+        dims = len(result[0][-1]) if result else 0
+        matrix = np.frombuffer(b"".join(bytes(row[-1]) for row in result), dtype=np.int8)
+        return rows, matrix.reshape(len(rows), dims)
+
+    def quantize(self, queries: np.ndarray) -> np.ndarray:
+        """Queries quantized like the stored matrix."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        return float32_to_int8(queries) if self.binary else self.quantizer.quantize(queries)
+
+    def search(self, queries: np.ndarray, limit: int) -> List[List[tuple]]:
+        indices, distances = top_k(self.quantize(queries), self.matrix, limit, "l2", self.norms, self.dot_dtype)
+        return [
+            [(*self.rows[i], float(d) * self.distance_scale) for i, d in zip(row_indices, row_distances)]
+            for row_indices, row_distances in zip(indices, distances)
+        ]
+
+
+class IVFIndex:
+    """Inverted file index: k-means centroids and the matrix rows in each one's list."""
+
+    def __init__(self, centroids: np.ndarray, order: np.ndarray, offsets: np.ndarray):
+        self.centroids = centroids    # (lists, dims) float32, in stored units
+        self.order = order            # Row numbers grouped by list
+        self.offsets = offsets        # List i is order[offsets[i]:offsets[i + 1]]
+
+    def __len__(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, lists: Optional[int] = None, iterations: int = IVF_ITERATIONS,
+              seed: int = 0) -> "IVFIndex":
+        """k-means on a sample of matrix's rows (about sqrt(rows) lists), then every row assigned."""
+        rng = np.random.default_rng(seed)
+        lists = max(1, min(lists or int(round(np.sqrt(len(matrix)))), len(matrix)))
+        sample_size = min(len(matrix), lists * IVF_TRAIN_ROWS_PER_LIST)
+        sample = np.asarray(matrix[np.sort(rng.choice(len(matrix), size=sample_size, replace=False))],
+                            dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), size=lists, replace=False)]
+
+        for _ in range(iterations):
+            assignment = cls.nearest(sample, centroids)
+            counts = np.bincount(assignment, minlength=lists)
+            filled = counts > 0
+            # Lists are contiguous once sorted, and empty ones have no rows
+            grouped = sample[np.argsort(assignment, kind="stable")]
+            starts = np.cumsum(counts) - counts
+            centroids[filled] = np.add.reduceat(grouped, starts[filled]) / counts[filled, None]
+            # Reseed empty lists with random sample rows
+            centroids[~filled] = sample[rng.choice(len(sample), size=int((~filled).sum()), replace=False)]
+
+        assignment = cls.nearest(matrix, centroids)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=lists))])
+        return cls(centroids, order, offsets)
+
+    @staticmethod
+    def nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """Closest centroid of each row, CHUNK_ROWS rows at a time."""
+        centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+        return np.concatenate([
+            np.argmin(centroid_norms[None, :] - 2 * (np.asarray(vectors[start:start + CHUNK_ROWS],
+                                                                 dtype=np.float32) @ centroids.T), axis=1)
+            for start in range(0, len(vectors), CHUNK_ROWS)
+        ]) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+    def candidates(self, lists: Sequence[int]) -> np.ndarray:
+        """Row numbers in the given lists, in row order."""
+        return np.sort(np.concatenate([self.order[self.offsets[i]:self.offsets[i + 1]] for i in lists]))
+
+
+class IVFBackend(NumpyBackend):
+    """Approximate KNN: exact distances, but only over the rows in each query's closest IVF lists."""
+
+    def __init__(self, db, table: str, columns: Sequence[str], quantizer: Optional[Quantizer] = None,
+                 db_path: Optional[Path] = None, probes: int = IVF_PROBES, index: Optional[IVFIndex] = None):
+        super().__init__(db, table, columns, quantizer, db_path)
+        self.probes = probes
+        self.index = index
+        if self.index is None and db_path:
+            self.index = read_ivf(db_path, table, len(self))
+        if self.index is None:
+            self.index = IVFIndex.build(self.matrix)
+            if db_path:
+                write_ivf(db_path, table, self.index)
+
+    def search(self, queries: np.ndarray, limit: int, probes: Optional[int] = None) -> List[List[tuple]]:
+        query_int8 = self.quantize(queries).astype(self.dot_dtype)
+        closest_lists, _ = top_k(query_int8, self.index.centroids, probes or self.probes, "l2", dtype=self.dot_dtype)
+        results = []
+        for query, lists in zip(query_int8, closest_lists):
+            candidates = self.index.candidates(lists)
+            indices, distances = top_k(query, self.matrix[candidates], limit, "l2",
+                                       self.norms[candidates], self.dot_dtype)
+            results.append([(*self.rows[candidates[i]], float(d) * self.distance_scale)
+                            for i, d in zip(indices[0], distances[0])])
+        return results
+
+
+def open_backend(kind: str, db, table: str, columns: Sequence[str], quantizer: Optional[Quantizer] = None,
+                 db_path: Optional[Path] = None):
+    """A search backend by name (see BACKENDS)."""
+    if kind == "auto":
+        rows = next(db.cursor().execute(f"SELECT COUNT(*) FROM {table}"))[0]
+        kind = "ivf" if rows >= ANN_MIN_ROWS else "numpy"
+    if kind == "vec0":
+        return Vec0Backend(db, table, columns, quantizer)
+    if kind == "numpy":
+        return NumpyBackend(db, table, columns, quantizer, db_path)
+    if kind == "ivf":
+        return IVFBackend(db, table, columns, quantizer, db_path)
+    raise ValueError(f"Unknown backend {kind!r} (choose from {', '.join(BACKENDS)})")
+
+
+# =============================================================================
+# Export files
+# =============================================================================
+
+def export_paths(db_path: Path, table: str):
+    """(matrix .npy, rows .json) exported next to a vector database."""
+    return db_path.with_name(f"{table}.int8.npy"), db_path.with_name(f"{table}.rows.json")
+
+
+def _db_stamp(db_path: Path) -> list:
+    stat = db_path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def read_export(db_path: Path, table: str, columns: Sequence[str]):
+    """(rows, memory-mapped matrix) if an export matches the database as it is now, else None."""
+    matrix_path, rows_path = export_paths(db_path, table)
+    try:
+        with open(rows_path) as f:
+            exported = json.load(f)
+        if (exported.get("version") != EXPORT_VERSION or exported.get("stamp") != _db_stamp(db_path)
+                or exported.get("columns") != list(columns)):
+            return None
+        matrix = np.load(matrix_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    rows = [tuple(row) for row in exported["rows"]]
+    if matrix.ndim != 2 or len(matrix) != len(rows):
+        return None
+    return rows, matrix
+
+
+def write_export(db_path: Path, table: str, columns: Sequence[str], rows: List[tuple],
+                 matrix: np.ndarray) -> np.ndarray:
+    """Write the export atomically and return the matrix memory-mapped (as is if it can't be written)."""
+    matrix_path, rows_path = export_paths(db_path, table)
+    try:
+        stamp = _db_stamp(db_path)
+        tmp_matrix = matrix_path.with_name(matrix_path.name + ".tmp")
+        with open(tmp_matrix, "wb") as f:
+            np.save(f, matrix)
+        os.replace(tmp_matrix, matrix_path)
+        tmp_rows = rows_path.with_name(rows_path.name + ".tmp")
+        with open(tmp_rows, "w") as f:
+            json.dump({"version": EXPORT_VERSION, "stamp": stamp, "columns": list(columns),
+                       "rows": rows}, f)
+        os.replace(tmp_rows, rows_path)
+        return np.load(matrix_path, mmap_mode="r")
+    except OSError:
+        return matrix
+
+
+def ivf_path(db_path: Path, table: str) -> Path:
+    return db_path.with_name(f"{table}.ivf.npz")
+
+
+def read_ivf(db_path: Path, table: str, rows: int) -> Optional[IVFIndex]:
+    """The saved IVF index if it was built from the database as it is now, else None."""
+    try:
+        with np.load(ivf_path(db_path, table)) as saved:
+            if (int(saved["version"]) != IVF_VERSION or saved["stamp"].tolist() != _db_stamp(db_path)
+                    or len(saved["order"]) != rows):
+                return None
+            return IVFIndex(saved["centroids"], saved["order"], saved["offsets"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_ivf(db_path: Path, table: str, index: IVFIndex):
+    """Save the IVF index atomically (skipped if the directory isn't writable)."""
+    path = ivf_path(db_path, table)
+    try:
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, version=IVF_VERSION, stamp=np.array(_db_stamp(db_path)),
+                     centroids=index.centroids, order=index.order, offsets=index.offsets)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def vec0_tables(db) -> List[str]:
+    """Names of the vec0 virtual tables in a database."""
+    return [name for name, sql in db.cursor().execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%'"
+    ) if "vec0" in sql]
+
+
+def sample_queries(backend: NumpyBackend, count: int, noise: float, seed: int = 0) -> np.ndarray:
+    """Float queries near stored vectors: decoded rows plus Gaussian noise, normalized."""
+    rng = np.random.default_rng(seed)
+    picked = np.sort(rng.choice(len(backend), size=min(count, len(backend)), replace=False))
+    vectors = np.asarray(backend.matrix[picked], dtype=np.float32)
+    if backend.binary or backend.quantizer.scale is None:
+        vectors /= 127.0
+    else:
+        vectors /= backend.quantizer.scale
+    vectors += rng.normal(0.0, noise, vectors.shape).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def benchmark_table(db, table: str, queries: int, limit: int, noise: float):
+    quantizer = Quantizer.load(db)
+
+    # Compared by rowid; not exported, so the demo's exports are left alone
+    start = time.perf_counter()
+    numpy_backend = NumpyBackend(db, table, ["rowid"], quantizer)
+    load_ms = (time.perf_counter() - start) * 1000
+    vec0_backend = Vec0Backend(db, table, ["rowid"], quantizer)
+
+    query_vectors = sample_queries(numpy_backend, queries, noise)
+
+    start = time.perf_counter()
+    expected = vec0_backend.search(query_vectors, limit)
+    vec0_ms = (time.perf_counter() - start) * 1000 / len(query_vectors)
+
+    start = time.perf_counter()
+    for query in query_vectors:
+        numpy_backend.search(query, limit)
+    single_ms = (time.perf_counter() - start) * 1000 / len(query_vectors)
+
+    start = time.perf_counter()
+    found = numpy_backend.search(query_vectors, limit)
+    batch_ms = (time.perf_counter() - start) * 1000 / len(query_vectors)
+
+    # Equal distances may come back in a different order, so the rows can
+    # differ at ties while the distance lists agree
+    same_rows = []
+    same_distances = []
+    max_diff = 0.0
+    for want, got in zip(expected, found):
+        same_rows.append(len({row for row, _ in want} & {row for row, _ in got}) / max(len(want), 1))
+        diffs = [abs(w - g) for (_, w), (_, g) in zip(want, got)]
+        same_distances.append(sum(diff < 1e-3 for diff in diffs) / max(len(want), 1))
+        max_diff = max([max_diff, *diffs])
+
+    print(f"\n{table} ({len(numpy_backend):,} rows × {numpy_backend.matrix.shape[1]} dims, "
+          f"{quantizer.mode}, {len(query_vectors)} queries, top {limit})")
+    print(f"  numpy load:      {load_ms:8.1f} ms")
+    print(f"  vec0:            {vec0_ms:8.2f} ms/query")
+    print(f"  numpy:           {single_ms:8.2f} ms/query  ({vec0_ms / single_ms:.1f}x)")
+    print(f"  numpy batched:   {batch_ms:8.2f} ms/query  ({vec0_ms / batch_ms:.1f}x)")
+    print(f"  same rows:       {np.mean(same_rows):8.1%} of vec0's top {limit}")
+    print(f"  same distances:  {np.mean(same_distances):8.1%}  (max difference {max_diff:.4f})")
+    if quantizer.mode == "binary":
+        print("  (binary: vec0 ranks by Hamming distance before rescoring, numpy is exact L2)")
+
+    start = time.perf_counter()
+    index = IVFIndex.build(numpy_backend.matrix)
+    build_s = time.perf_counter() - start
+    ivf_backend = IVFBackend(db, table, ["rowid"], quantizer, index=index)
+    print(f"  ivf build:       {build_s:8.2f} s  ({len(index)} lists, default {IVF_PROBES} probes)")
+    for probes in IVF_BENCHMARK_PROBES:
+        if probes > len(index):
+            break
+        start = time.perf_counter()
+        approximate = ivf_backend.search(query_vectors, limit, probes)
+        ivf_ms = (time.perf_counter() - start) * 1000 / len(query_vectors)
+        # A result counts if it is as close as the exact k-th (so ties don't count as misses)
+        recall = [
+            sum(dist <= exact[-1][-1] + 1e-3 for _, dist in approx) / max(len(exact), 1)
+            for approx, exact in zip(approximate, found) if exact
+        ]
+        print(f"  ivf {probes:2} probes:  {ivf_ms:8.2f} ms/query  recall@{limit} {np.mean(recall):6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the numpy KNN backend against sqlite-vec")
+    parser.add_argument("emb_dir", type=Path, help="Embedding directory with *_vectors.sqlite")
+    parser.add_argument("--table", help="Only this vec0 table (default: all)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per table (default: 200)")
+    parser.add_argument("--limit", type=int, default=10, help="Results per query (default: 10)")
+    parser.add_argument("--noise", type=float, default=0.03,
+                        help="Std dev of the noise added to sampled vectors (default: 0.03)")
+    args = parser.parse_args()
+
+    try:
+        import apsw
+        import sqlite_vec
+    except ImportError:
+        print("Missing: pip install apsw sqlite-vec")
+        sys.exit(1)
+
+    benchmarked = 0
+    for name in VECTOR_DBS:
+        db_path = args.emb_dir / name
+        if not db_path.exists():
+            continue
+        db = apsw.Connection(str(db_path))
+        db.enable_load_extension(True)
+        sqlite_vec.load(db)
+        db.enable_load_extension(False)
+        for table in vec0_tables(db):
+            if args.table in (None, table):
+                benchmark_table(db, table, args.queries, args.limit, args.noise)
+                benchmarked += 1
+        db.close()
+
+    if not benchmarked:
+        print(f"✗ No matching vec0 tables in {args.emb_dir}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
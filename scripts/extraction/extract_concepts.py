@@ -35,6 +35,9 @@ from collections import Counter, defaultdict
 from pathlib import Path
 from typing import Dict, List, Set, Tuple
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from tbta_tokenizer import tokenize
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -82,35 +85,19 @@ def parse_tbta_tags(analyzed_verse: str, include_metadata: bool = False) -> List
     
     constituents = []
     
-    # Split by ~\wd which marks word boundaries
-    word_sections = analyzed_verse.split('~\\wd')
-    
-    for section in word_sections:
-        if not section.strip():
-            continue
-            
-        # Look for ~\lu which precedes the actual word
-        if '~\\lu' not in section:
-            continue
-        
-        # Extract the tag (between ~\tg and ~\lu)
-        tag_match = re.search(r'~\\tg\s+([^~]+?)~\\lu', section)
-        if not tag_match:
-            continue
-        
-        tag = tag_match.group(1).strip()
+    for token in tokenize(analyzed_verse):
+        tag = token.tag
         
         # Only process word-level tags (uppercase first letter: N-, V-, A-, etc.)
         # Skip phrase-level (lowercase: n-, v-, c-) and empty tags
         if not tag or not re.match(r'[A-Z]-', tag):
             continue
         
-        # Extract constituent (after ~\lu, before next ~\wd or ~\tg or ~\lu)
-        constituent_match = re.search(r'~\\lu\s+([^~]+)', section)
-        if not constituent_match:
+        # Entries without ~\lu text carry no constituent
+        if not token.constituent:
             continue
         
-        constituent = constituent_match.group(1).strip()
+        constituent = token.constituent
         
         # Clean up constituent - remove trailing markers and parentheses
         constituent = constituent.rstrip('()')
@@ -12,7 +12,6 @@ Usage:
 
 import json
 import re
-import sqlite3
 import ssl
 import sys
 import urllib.parse
@@ -22,6 +21,8 @@ from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 from typing import Optional, Tuple
 
+from tbta_db import get_corpus
+
 SCRIPT_DIR = Path(__file__).parent
 WORKSPACE_ROOT = SCRIPT_DIR.parent.parent.parent.parent
 NIV_DB = WORKSPACE_ROOT / "tbta-ai-framework/databases/niv.sqlite"
@@ -58,25 +59,8 @@ def fetch_niv_verses(book: str, chapter: int, verse_start: int, verse_end: Optio
         return None
 
     try:
-        conn = sqlite3.connect(NIV_DB)
-        cursor = conn.cursor()
-
-        if verse_end:
-            cursor.execute(
-                "SELECT text FROM niv WHERE book = ? AND chapter = ? AND verse >= ? AND verse <= ? ORDER BY verse",
-                (book, chapter, verse_start, verse_end)
-            )
-            rows = cursor.fetchall()
-            conn.close()
-            return ' '.join(row[0] for row in rows) if rows else None
-        else:
-            cursor.execute(
-                "SELECT text FROM niv WHERE book = ? AND chapter = ? AND verse = ?",
-                (book, chapter, verse_start)
-            )
-            row = cursor.fetchone()
-            conn.close()
-            return row[0] if row else None
+        verses = get_corpus(NIV_DB.parent).get_niv(book, chapter, verse_start, verse_end)
+        return ' '.join(verses.values()) if verses else None
     except Exception:
         return None
 
@@ -15,12 +15,12 @@ Usage:
 
 import json
 import re
-import sqlite3
 import sys
 from pathlib import Path
 from typing import Optional, Tuple
 
 from lint_check import check_linter, generate_report
+from tbta_db import get_corpus
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent
@@ -151,15 +151,7 @@ def fetch_niv_verse(book: str, chapter: int, verse: int) -> Optional[str]:
         return None
     
     try:
-        conn = sqlite3.connect(NIV_DB)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT text FROM niv WHERE book = ? AND chapter = ? AND verse = ?",
-            (book, chapter, verse)
-        )
-        row = cursor.fetchone()
-        conn.close()
-        return row[0] if row else None
+        return get_corpus(NIV_DB.parent).get_niv(book, chapter, verse).get(verse)
     except Exception as e:
         print(f"ERROR fetching NIV verse: {e}")
         return None
@@ -172,66 +164,41 @@ def get_chapter_verses(book: str, chapter: int) -> list[int]:
         return []
     
     try:
-        conn = sqlite3.connect(NIV_DB)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT verse FROM niv WHERE book = ? AND chapter = ? ORDER BY verse",
-            (book, chapter)
-        )
-        verses = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return verses
+        return list(get_corpus(NIV_DB.parent).get_niv(book, chapter))
     except Exception as e:
         print(f"ERROR fetching chapter verses: {e}")
         return []
 
 
-def fetch_reference_solution(book: str, chapter: int, verse: int) -> Optional[dict]:
+def fetch_reference_solutions(book: str, chapter: int, verses: list[int]) -> dict[int, dict]:
     """
-    Fetch reference verse_text and concatenated node content from databases.
+    Fetch reference verse_text and concatenated node content for verses of one chapter.
+    
+    The whole span is read in a single range scan of the verse-clustered nodes.
     
-    Returns dict with:
+    Returns {verse: dict} with:
         - verse_text: str
         - node_content: str (concatenated with spaces)
+    Verses without nodes are missing from the result.
     """
     if not VERSES_DB.exists() or not NODES_DB.exists():
         print(f"ERROR: Database not found")
         print(f"  Verses: {VERSES_DB.exists()}")
         print(f"  Nodes: {NODES_DB.exists()}")
-        return None
+        return {}
     
     try:
-        # Connect to verses database
-        verses_conn = sqlite3.connect(VERSES_DB)
-        verses_conn.execute(f"ATTACH DATABASE '{NODES_DB}' AS n")
-        cursor = verses_conn.cursor()
-        
-        # Query with JOIN to get verse_text and concatenated node content
-        cursor.execute("""
-            SELECT 
-                v.verse_text,
-                GROUP_CONCAT(n.nodes.content, ' ') as node_content
-            FROM verses v
-            JOIN json_each(v.node_ids) AS je
-            JOIN n.nodes ON n.nodes.node_id = je.value
-            WHERE v.book = ? AND v.chapter = ? AND v.verse = ?
-            GROUP BY v.book, v.chapter, v.verse
-        """, (book, chapter, verse))
-        
-        row = cursor.fetchone()
-        verses_conn.close()
-        
-        if row:
-            return {
-                "verse_text": row[0],
-                "node_content": row[1]
-            }
-        return None
+        return get_corpus(VERSES_DB.parent).get_reference_solutions(book, chapter, verses)
     except Exception as e:
-        print(f"ERROR fetching reference solution: {e}")
+        print(f"ERROR fetching reference solutions: {e}")
         import traceback
         traceback.print_exc()
-        return None
+        return {}
+
+
+def fetch_reference_solution(book: str, chapter: int, verse: int) -> Optional[dict]:
+    """Fetch the reference solution of a single verse (see fetch_reference_solutions)."""
+    return fetch_reference_solutions(book, chapter, [verse]).get(verse)
 
 
 def write_section_data(book: str, chapter: int, verses: list[int],
@@ -344,8 +311,9 @@ def process_section(book: str, chapter: int, verses: list[int], output_dir: Path
     # Step 4: Fetch reference solutions for all verses
     print("4. Fetching reference solutions from verses.sqlite + nodes.sqlite...")
     solutions = []
+    found = fetch_reference_solutions(book, chapter, verses)
     for verse in verses:
-        solution = fetch_reference_solution(book, chapter, verse)
+        solution = found.get(verse)
         if not solution:
             print(f"   WARNING: Could not fetch solution for verse {verse}")
             solutions.append({'verse_text': 'N/A', 'node_content': 'N/A'})
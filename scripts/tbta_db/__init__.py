@@ -0,0 +1,13 @@
+"""
+Read-only access to the converted TBTA databases.
+
+    from tbta_db import get_corpus
+
+    corpus = get_corpus()                      # databases/ next to scripts/
+    corpus.get_niv("JHN", 3, 16)               # {16: "For God so loved..."}
+    corpus.get_chapter("RUT", 1)               # verses with their nodes
+"""
+
+from .corpus import DEFAULT_DB_DIR, Corpus, get_corpus
+
+__all__ = ["DEFAULT_DB_DIR", "Corpus", "get_corpus"]
@@ -0,0 +1,222 @@
+"""
+Corpus: pooled, read-only connections to verses/nodes/concepts/niv/strongs.
+
+Every database is opened once per thread with mode=ro&immutable=1 and memory
+mapping, and attached to one connection under its own schema name (verses,
+nodes, concepts, niv, strongs), so lookups across databases are plain joins.
+Queries are module constants and reuse sqlite3's prepared statement cache.
+
+immutable=1 skips locking and change detection. convert_db.py replaces
+databases by renaming new files over old ones, which open connections don't
+see; restart long-running processes after a rebuild.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_DB_DIR = Path(__file__).parent.parent.parent / "databases"
+
+# schema name -> file name
+DATABASES = {
+    "verses": "verses.sqlite",
+    "nodes": "nodes.sqlite",
+    "concepts": "concepts.sqlite",
+    "niv": "niv.sqlite",
+    "strongs": "strongs.sqlite",
+}
+
+MMAP_SIZE = 256 * 1024 * 1024
+CACHED_STATEMENTS = 256
+REFS_PER_QUERY = 500
+
+NODE_COLUMNS = ("node_id", "category", "content", "stem", "sense",
+                "part_of_speech", "feature_codes", "concept_id")
+
+VERSE_COLUMNS = "v.book, v.chapter, v.verse, v.reference, v.verse_text, v.first_node_id, v.node_count"
+
+VERSE_SQL = f'''
+    SELECT {VERSE_COLUMNS} FROM verses.verse_ranges v
+'''
+
+REFS_SQL = f'''
+    SELECT {VERSE_COLUMNS}
+    FROM (VALUES {{values}}) AS refs
+    JOIN verses.verse_ranges v
+        ON v.book = refs.column1 AND v.chapter = refs.column2 AND v.verse = refs.column3
+'''
+
+CHAPTER_NODES_SQL = f'''
+    SELECT verse, {", ".join(NODE_COLUMNS)}
+    FROM nodes.nodes
+    WHERE book = ? AND chapter = ? AND verse BETWEEN ? AND ?
+    ORDER BY verse, position
+'''
+
+NIV_SQL = '''
+    SELECT verse, text FROM niv.niv
+    WHERE book = ? AND chapter = ? AND verse BETWEEN ? AND ?
+    ORDER BY verse
+'''
+
+ALL_VERSES = (0, 1 << 30)
+
+
+def _verse_dict(row: tuple) -> Dict:
+    book, chapter, verse, reference, verse_text, first_node_id, node_count = row
+    return {
+        "book": book,
+        "chapter": chapter,
+        "verse": verse,
+        "reference": reference,
+        "text": verse_text,
+        "first_node_id": first_node_id,
+        "node_count": node_count,
+    }
+
+
+class Corpus:
+    """Read-only view of the converted databases in one directory."""
+
+    def __init__(self, db_dir: Path = DEFAULT_DB_DIR):
+        self.db_dir = Path(db_dir)
+        self.available = {
+            name: self.db_dir / filename
+            for name, filename in DATABASES.items()
+            if (self.db_dir / filename).exists()
+        }
+        self._local = threading.local()
+
+    def has(self, name: str) -> bool:
+        """Whether the database (schema name, e.g. "niv") exists."""
+        return name in self.available
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """This thread's connection, with all available databases attached."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(":memory:", uri=True, cached_statements=CACHED_STATEMENTS)
+            for name, path in self.available.items():
+                conn.execute(f"ATTACH DATABASE ? AS {name}", (f"{path.resolve().as_uri()}?mode=ro&immutable=1",))
+                conn.execute(f"PRAGMA {name}.mmap_size = {MMAP_SIZE}")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ------------------------------------------------------------------
+    # Verses and nodes
+    # ------------------------------------------------------------------
+
+    def get_verses(self, refs: Iterable[Tuple[str, int, int]]) -> Dict[Tuple[str, int, int], Dict]:
+        """
+        Look up many (book, chapter, verse) refs at once.
+
+        Returns {ref: verse dict} with keys book, chapter, verse, reference,
+        text, first_node_id, node_count. Missing verses are left out.
+        """
+        refs = list(refs)
+        found = {}
+        for start in range(0, len(refs), REFS_PER_QUERY):
+            chunk = refs[start:start + REFS_PER_QUERY]
+            values = ", ".join(["(?, ?, ?)"] * len(chunk))
+            params = [value for ref in chunk for value in ref]
+            for row in self.conn.execute(REFS_SQL.format(values=values), params):
+                found[row[:3]] = _verse_dict(row)
+        return found
+
+    def get_verse(self, book: str, chapter: int, verse: int) -> Optional[Dict]:
+        """Look up a single verse (see get_verses)."""
+        return self.get_verses([(book, chapter, verse)]).get((book, chapter, verse))
+
+    def get_nodes(self, book: str, chapter: int, verse: int) -> List[Dict]:
+        """A verse's nodes in word order."""
+        return self._chapter_nodes(book, chapter, verse, verse).get(verse, [])
+
+    def get_chapter(self, book: str, chapter: int,
+                    verse_start: Optional[int] = None, verse_end: Optional[int] = None) -> List[Dict]:
+        """
+        Verses of a chapter (optionally only verse_start..verse_end), in order.
+
+        Each verse dict (see get_verses) also has 'nodes', read together with
+        the rest of the chapter in one range scan.
+        """
+        low, high = self._span(verse_start, verse_end)
+        nodes = self._chapter_nodes(book, chapter, low, high)
+        verses = []
+        for row in self.conn.execute(
+            f"{VERSE_SQL} WHERE book = ? AND chapter = ? AND verse BETWEEN ? AND ? ORDER BY verse",
+            (book, chapter, low, high)
+        ):
+            verse = _verse_dict(row)
+            verse["nodes"] = nodes.get(verse["verse"], [])
+            verses.append(verse)
+        return verses
+
+    def get_reference_solutions(self, book: str, chapter: int, verses: List[int]) -> Dict[int, Dict]:
+        """
+        Reference verse_text and space-joined node content per verse.
+
+        Returns {verse: {"verse_text", "node_content"}}; verses without nodes
+        are left out.
+        """
+        if not verses:
+            return {}
+        wanted = set(verses)
+        solutions = {}
+        for verse in self.get_chapter(book, chapter, min(verses), max(verses)):
+            if verse["verse"] in wanted and verse["nodes"]:
+                words = [node["content"] for node in verse["nodes"] if node["content"] is not None]
+                solutions[verse["verse"]] = {
+                    "verse_text": verse["text"],
+                    "node_content": " ".join(words) or None,
+                }
+        return solutions
+
+    def _chapter_nodes(self, book: str, chapter: int, low: int, high: int) -> Dict[int, List[Dict]]:
+        nodes = {}
+        for row in self.conn.execute(CHAPTER_NODES_SQL, (book, chapter, low, high)):
+            nodes.setdefault(row[0], []).append(dict(zip(NODE_COLUMNS, row[1:])))
+        return nodes
+
+    # ------------------------------------------------------------------
+    # NIV
+    # ------------------------------------------------------------------
+
+    def get_niv(self, book: str, chapter: int,
+                verse_start: Optional[int] = None, verse_end: Optional[int] = None) -> Dict[int, str]:
+        """
+        NIV text by verse number, in verse order.
+
+        With only verse_start, a single verse; with neither, the whole chapter.
+        """
+        if verse_start is not None and verse_end is None:
+            verse_end = verse_start
+        low, high = self._span(verse_start, verse_end)
+        return dict(self.conn.execute(NIV_SQL, (book, chapter, low, high)))
+
+    @staticmethod
+    def _span(verse_start: Optional[int], verse_end: Optional[int]) -> Tuple[int, int]:
+        low = ALL_VERSES[0] if verse_start is None else verse_start
+        high = ALL_VERSES[1] if verse_end is None else verse_end
+        return low, high
+
+
+_corpora: Dict[Path, Corpus] = {}
+_corpora_lock = threading.Lock()
+
+
+def get_corpus(db_dir: Path = DEFAULT_DB_DIR) -> Corpus:
+    """Shared Corpus for a database directory."""
+    key = Path(db_dir).resolve()
+    with _corpora_lock:
+        if key not in _corpora:
+            _corpora[key] = Corpus(key)
+        return _corpora[key]
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Shared tokenizer for the TBTA AnalyzedVerse format.
+
+AnalyzedVerse is a flat stream of word entries:
+
+    ~\\wd ~\\tg N-1A1SDAnK3NN........~\\lu God~\\wd ~\\tg V-1ArUINAN...........~\\lu make/Acreate
+
+tokenize() walks it with a single precompiled regex and yields one
+Token(tag, constituent, offset) per entry, without splitting the verse into
+per-word substrings first. Callers apply their own filtering (word-level tags
+only, structural markers, compound constituents, ...).
+
+Usage:
+    python tbta_tokenizer.py                         # Verify + benchmark on databases/original/Bible.sqlite
+    python tbta_tokenizer.py --db path/Bible.sqlite
+    python tbta_tokenizer.py --repeat 5
+    python tbta_tokenizer.py --cases-only            # Verify on tbta_tokenizer_cases.txt only (no corpus needed)
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+# One entry: an optional ~\tg followed by an optional ~\lu, or a bare ~\lu.
+# [^~]* stops at the next marker, so a match never crosses into the next ~\wd.
+TOKEN_RE = re.compile(
+    r'~\\tg(?:\s+([^~]*))?(?:~\\lu(?:\s+([^~]*))?)?'
+    r'|~\\lu(?:\s+([^~]*))?'
+)
+
+
+class Token(NamedTuple):
+    """One ~\\wd entry. Empty tag/constituent are None."""
+    tag: Optional[str]
+    constituent: Optional[str]
+    offset: int  # Index of the entry's first marker in the verse string
+
+
+def tokenize(analyzed_verse: str) -> Iterator[Token]:
+    """Yield the entries of an AnalyzedVerse string in order."""
+    if not analyzed_verse:
+        return
+
+    for match in TOKEN_RE.finditer(analyzed_verse):
+        tag, constituent, bare_constituent = match.groups()
+        if constituent is None:
+            constituent = bare_constituent
+
+        tag = tag.strip() if tag else None
+        constituent = constituent.strip() if constituent else None
+        if tag or constituent:
+            yield Token(tag or None, constituent or None, match.start())
+
+
+# ============================================================================
+# VERIFY / BENCHMARK
+# ============================================================================
+# Reference implementations of the split-then-search approach the parsers
+# used before, kept to check tokenize() against the edge cases in
+# tbta_tokenizer_cases.txt and against real data.
+
+CASES_FILE = Path(__file__).parent / "tbta_tokenizer_cases.txt"
+
+def _legacy_tagged(analyzed_verse: str) -> List[Tuple[str, str]]:
+    """(tag, constituent) pairs as convert_db / extract_concepts extracted them."""
+    pairs = []
+    for section in analyzed_verse.split('~\\wd'):
+        if not section.strip() or '~\\lu' not in section:
+            continue
+        tag_match = re.search(r'~\\tg\s+([^~]+?)~\\lu', section)
+        constituent_match = re.search(r'~\\lu\s+([^~]+)', section)
+        if not tag_match or not constituent_match:
+            continue
+        tag = tag_match.group(1).strip()
+        constituent = constituent_match.group(1).strip()
+        if tag and constituent:
+            pairs.append((tag, constituent))
+    return pairs
+
+
+def _legacy_elements(analyzed_verse: str) -> List[Tuple[str, str]]:
+    """(tag, constituent) pairs as TBTAParser._tokenize extracted them."""
+    pairs = []
+    for part in analyzed_verse.split('~\\wd'):
+        if not part.strip():
+            continue
+        tag_match = re.search(r'~\\tg\s+([^\s~]+)', part)
+        lu_match = re.search(r'~\\lu\s+([^~]*)', part)
+        tag = tag_match.group(1) if tag_match else ''
+        constituent = lu_match.group(1).strip() if lu_match else ''
+        if tag or constituent:
+            pairs.append((tag, constituent))
+    return pairs
+
+
+def _tagged(analyzed_verse: str) -> List[Tuple[str, str]]:
+    return [(t.tag, t.constituent) for t in tokenize(analyzed_verse) if t.tag and t.constituent]
+
+
+def _elements(analyzed_verse: str) -> List[Tuple[str, str]]:
+    return [(t.tag.split()[0] if t.tag else '', t.constituent or '') for t in tokenize(analyzed_verse)]
+
+
+def load_cases(path: Path = CASES_FILE) -> List[Tuple[str, str]]:
+    """Load (case name, AnalyzedVerse) pairs from a tab-separated cases file."""
+    cases = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line and not line.startswith("#"):
+            name, _, analyzed_verse = line.partition("\t")
+            cases.append((name, analyzed_verse))
+    return cases
+
+
+def check_equivalence(verses: List[Tuple[str, str]], label: str) -> int:
+    """Compare tokenize() with both legacy parsers; returns the number of mismatches."""
+    mismatches = 0
+    for name, legacy, current in [("tagged", _legacy_tagged, _tagged),
+                                  ("elements", _legacy_elements, _elements)]:
+        bad = [ref for ref, text in verses if legacy(text) != current(text)]
+        mismatches += len(bad)
+        if bad:
+            print(f"  ✗ {name}: {len(bad):,} {label} differ (first: {', '.join(bad[:5])})")
+        else:
+            print(f"  ✓ {name}: identical on all {label}")
+    return mismatches
+
+
+def load_analyzed_verses(bible_db: Path) -> List[Tuple[str, str]]:
+    """Load (reference, AnalyzedVerse) for every book table."""
+    conn = sqlite3.connect(bible_db)
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name != 'Version' ORDER BY name"
+    )]
+    verses = []
+    for table_name in tables:
+        verses.extend(conn.execute(
+            f'SELECT Reference, AnalyzedVerse FROM "{table_name}" WHERE AnalyzedVerse IS NOT NULL'
+        ))
+    conn.close()
+    return verses
+
+
+def main():
+    default_db = Path(__file__).parent.parent / "databases" / "original" / "Bible.sqlite"
+
+    parser = argparse.ArgumentParser(description="Verify and benchmark the AnalyzedVerse tokenizer")
+    parser.add_argument("--db", type=Path, default=default_db, help="Source Bible.sqlite")
+    parser.add_argument("--repeat", type=int, default=3, help="Benchmark passes (best is reported)")
+    parser.add_argument("--cases-only", action="store_true",
+                        help="Only check the edge cases in tbta_tokenizer_cases.txt")
+    args = parser.parse_args()
+
+    # Equivalence with the previous parsers
+    cases = load_cases()
+    print(f"Loaded {len(cases)} edge cases from {CASES_FILE.name}")
+    mismatches = check_equivalence(cases, "cases")
+    if args.cases_only:
+        sys.exit(1 if mismatches else 0)
+
+    if not args.db.exists():
+        print(f"✗ Bible database not found: {args.db}")
+        sys.exit(1)
+
+    verses = load_analyzed_verses(args.db)
+    texts = [text for _, text in verses]
+    print(f"\nLoaded {len(texts):,} analyzed verses ({sum(map(len, texts)) / 1e6:.1f} MB)")
+    mismatches += check_equivalence(verses, "verses")
+
+    # Throughput
+    def best_of(fn) -> float:
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for text in texts:
+                fn(text)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    legacy_time = best_of(_legacy_tagged)
+    token_time = best_of(lambda text: sum(1 for _ in tokenize(text)))
+    print(f"\nsplit + re.search: {legacy_time:.3f}s")
+    print(f"tokenize():        {token_time:.3f}s ({legacy_time / token_time:.1f}x)")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()